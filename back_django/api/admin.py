@@ -3,14 +3,31 @@ from django.contrib import admin
 from django.contrib.auth import get_user_model
 from .models import (
     Tower, Apartment, Facility, ParkingSpot,
-    ShiftAssignment, LeaveRequest, Reservation
+    ShiftAssignment, LeaveRequest, Reservation, OutboxEmail
 )
+from .search import ranked
 
 # Register your models here.
 CustomUser = get_user_model()
 
+
+class FullTextSearchAdminMixin:
+    """
+    Búsqueda del admin sobre el índice de texto completo en lugar de
+    ``icontains``. ``search_fields`` solo habilita la caja de búsqueda;
+    ``search_documents`` indica qué documentos se consultan (ver api.search.ranked).
+    """
+    search_documents = ()
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return queryset, False
+        # el changelist aplica después su propio orden
+        return ranked(queryset, self.search_documents, search_term, order=False), False
+
+
 @admin.register(CustomUser)
-class CustomUserAdmin(admin.ModelAdmin):
+class CustomUserAdmin(FullTextSearchAdminMixin, admin.ModelAdmin):
     """
     Configuración del panel de administración para el modelo CustomUser.
     """
@@ -20,6 +37,7 @@ class CustomUserAdmin(admin.ModelAdmin):
     )
     list_filter = ('role', 'subrole', 'registration_status', 'is_active')
     search_fields = ('email', 'first_name', 'last_name')
+    search_documents = (('user', 'pk'),)
     actions = ['approve_users','reject_users']
 
     def approve_users(self, request, queryset):
@@ -52,17 +70,19 @@ class ApartmentAdmin(admin.ModelAdmin):
     Configuración del panel de administración para el modelo Apartment
     """
     list_display = ('number', 'tower', 'floor', 'owner')
+    list_select_related = ('tower', 'owner')
     list_filter = ('tower', 'floor')
     search_fields = ('number',)
 
 @admin.register(Facility)
-class FacilityAdmin(admin.ModelAdmin):
+class FacilityAdmin(FullTextSearchAdminMixin, admin.ModelAdmin):
     """
     Configuración del panel de administración para el modelo Facility.
     """
     list_display = ('name', 'is_reserved')
     list_filter = ('is_reserved',)
     search_fields = ('name',)
+    search_documents = (('facility', 'pk'),)
 
 @admin.register(ParkingSpot)
 class ParkingSpotAdmin(admin.ModelAdmin):
@@ -70,30 +90,46 @@ class ParkingSpotAdmin(admin.ModelAdmin):
     Configuración del panel de administración para el modelo Parking
     """
     list_display = ('identifier', 'apartment')
+    list_select_related = ('apartment',)
     search_fields = ('identifier',)
 
 @admin.register(ShiftAssignment)
-class ShiftAssignmentAdmin(admin.ModelAdmin):
+class ShiftAssignmentAdmin(FullTextSearchAdminMixin, admin.ModelAdmin):
     """
     Configuración del panel de administración para el modelo ShiftAssignment."""
     list_display = ('employee', 'area', 'start_datetime', 'end_datetime', 'tower', 'facility')
+    list_select_related = ('employee', 'tower', 'facility')
     list_filter = ('area', 'tower', 'facility')
     search_fields = ('employee__first_name', 'employee__last_name')
+    search_documents = (('user', 'employee'),)
 
 @admin.register(LeaveRequest)
-class LeaveRequestAdmin(admin.ModelAdmin):
+class LeaveRequestAdmin(FullTextSearchAdminMixin, admin.ModelAdmin):
     """
     Configuración del panel de administración para el modelo LeaveRequest.
     """
     list_display = ('employee', 'type', 'status', 'start_date', 'end_date')
+    list_select_related = ('employee',)
     list_filter = ('type', 'status')
     search_fields = ('employee__first_name', 'employee__last_name')
+    search_documents = (('leave', 'pk'), ('user', 'employee'))
 
 @admin.register(Reservation)
-class ReservationAdmin(admin.ModelAdmin):
+class ReservationAdmin(FullTextSearchAdminMixin, admin.ModelAdmin):
     """
     Configuración del panel de administración para el modelo Reservation.
     """
     list_display = ('facility', 'user', 'status', 'start_datetime', 'end_datetime')
+    list_select_related = ('facility', 'user')
     list_filter = ('status', 'facility')
     search_fields = ('user__first_name', 'user__last_name', 'facility__name')
+    search_documents = (('user', 'user'), ('facility', 'facility'))
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    """
+    Configuración del panel de administración para el modelo OutboxEmail.
+    """
+    list_display = ('subject', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('status',)
+    search_fields = ('subject',)
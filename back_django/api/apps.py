@@ -9,3 +9,7 @@ class ApiConfig(AppConfig):
     """
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        # conectar las señales de la aplicación
+        from . import signals  # pylint: disable=import-outside-toplevel,unused-import
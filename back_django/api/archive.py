@@ -0,0 +1,102 @@
+"""
+Histórico de reservas, turnos y permisos. Las filas que terminaron antes del
+horizonte se copian a las tablas ``Archived*`` y se borran de las tablas en
+uso, por lotes en transacciones cortas, para que las consultas de solapes y
+los listados recorran siempre un volumen acotado. El borrado pasa por el
+ORM: las señales registran las lápidas de ``/api/sync/`` y quitan los
+documentos de búsqueda.
+"""
+from collections import namedtuple
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import (Reservation, ShiftAssignment, LeaveRequest, ArchivedReservation,
+                     ArchivedShiftAssignment, ArchivedLeaveRequest)
+
+_archive_settings = getattr(settings, 'ARCHIVE', {})
+
+ARCHIVE_HORIZON = timedelta(days=_archive_settings.get('HORIZON_DAYS', 365))
+ARCHIVE_BATCH_SIZE = _archive_settings.get('BATCH_SIZE', 500)
+
+# expired: filtro de las filas archivables dado el instante de corte
+ArchiveModel = namedtuple('ArchiveModel', 'key model archive expired')
+
+ARCHIVE_MODELS = (
+    ArchiveModel('reservations', Reservation, ArchivedReservation,
+                 lambda cutoff: Q(end_datetime__lt=cutoff)),
+    ArchiveModel('shifts', ShiftAssignment, ArchivedShiftAssignment,
+                 lambda cutoff: Q(end_datetime__lt=cutoff)),
+    # las pendientes se quedan hasta que se revisen
+    ArchiveModel('leaves', LeaveRequest, ArchivedLeaveRequest,
+                 lambda cutoff: Q(end_date__lt=timezone.localdate(cutoff))
+                 & ~Q(status='pendiente')),
+)
+
+ARCHIVE_KEYS = tuple(spec.key for spec in ARCHIVE_MODELS)
+
+
+def archived_fields(spec):
+    """Columnas copiadas tal cual de la tabla en uso al histórico."""
+    return [field.attname for field in spec.archive._meta.concrete_fields
+            if field.name != 'archived_at']
+
+
+def expired(spec, cutoff):
+    return spec.model.objects.filter(spec.expired(cutoff))
+
+
+def archive_batch(spec, cutoff, batch_size=ARCHIVE_BATCH_SIZE):
+    """
+    Mueve al histórico hasta ``batch_size`` filas vencidas de ``spec`` en
+    una transacción. Devuelve cuántas movió (0 si no quedan).
+    """
+    fields = archived_fields(spec)
+    archived_at = timezone.now()
+    with transaction.atomic():
+        rows = list(expired(spec, cutoff).order_by('pk').values(*fields)[:batch_size])
+        if not rows:
+            return 0
+        spec.archive.objects.bulk_create([
+            spec.archive(archived_at=archived_at, **row) for row in rows
+        ])
+        spec.model.objects.filter(pk__in=[row['id'] for row in rows]).delete()
+    return len(rows)
+
+
+def archive(cutoff, keys=None, batch_size=ARCHIVE_BATCH_SIZE):
+    """
+    Archiva todas las filas terminadas antes de ``cutoff`` de los modelos
+    ``keys`` (todos por defecto). Devuelve la cantidad movida por modelo.
+    """
+    counts = {}
+    for spec in ARCHIVE_MODELS:
+        if keys and spec.key not in keys:
+            continue
+        counts[spec.key] = 0
+        while True:
+            moved = archive_batch(spec, cutoff, batch_size)
+            counts[spec.key] += moved
+            if moved < batch_size:
+                break
+    return counts
+
+
+def compact(keys=None):
+    """
+    Devuelve al sistema el espacio que dejaron las filas archivadas y
+    actualiza las estadísticas del planificador. En SQLite compacta todo el
+    archivo; no puede correr dentro de una transacción.
+    """
+    tables = [spec.model._meta.db_table for spec in ARCHIVE_MODELS
+              if not keys or spec.key in keys]
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute('VACUUM')
+            cursor.execute('ANALYZE')
+        elif connection.vendor == 'postgresql':
+            for table in tables:
+                cursor.execute(f'VACUUM ANALYZE {connection.ops.quote_name(table)}')
@@ -0,0 +1,98 @@
+"""
+Autenticación por token con caché en memoria.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from rest_framework.authentication import TokenAuthentication
+
+
+class TokenCache:
+    """
+    Caché LRU acotada con expiración (TTL) para las credenciales de token.
+    Es local a cada proceso: las señales la invalidan en el proceso que hace
+    el cambio y el TTL acota cuánto puede tardar en enterarse el resto.
+    """
+    def __init__(self, max_size=1024, ttl=60):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key):
+        """Devuelve (user, token) o None si no está o expiró."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def invalidate_user(self, user_id):
+        """Elimina todas las entradas de un usuario."""
+        with self._lock:
+            stale = [key for key, (_, (user, _)) in self._entries.items() if user.pk == user_id]
+            for key in stale:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+
+_cache_settings = getattr(settings, 'TOKEN_AUTH_CACHE', {})
+token_cache = TokenCache(
+    max_size=_cache_settings.get('MAX_SIZE', 1024),
+    ttl=_cache_settings.get('TTL', 60),
+)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication que evita la consulta Token + CustomUser en cada
+    petición guardando el resultado en ``token_cache``. Se invalida al borrar
+    o regenerar el token y al guardar el usuario (ver api/signals.py).
+    """
+    def authenticate_credentials(self, key):
+        cached = token_cache.get(key)
+        if cached is None:
+            cached = super().authenticate_credentials(key)
+            token_cache.set(key, cached)
+        # copias para que la vista no modifique la instancia compartida
+        user, token = copy.copy(cached[0]), copy.copy(cached[1])
+        token.user = user
+        return (user, token)
@@ -0,0 +1,173 @@
+"""
+Caché de lectura para los catálogos que cambian poco (torres, apartamentos,
+instalaciones y parqueaderos).
+Las respuestas serializadas de list/retrieve se guardan en la caché de
+Django bajo una clave que incluye la versión del modelo; las señales
+post_save/post_delete suben la versión, así que las entradas viejas dejan
+de usarse sin tener que borrarlas una por una.
+"""
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import models, transaction
+from rest_framework import status
+from rest_framework.response import Response
+
+from .conditional import make_etag, not_modified
+
+_catalog_settings = getattr(settings, 'CATALOG_CACHE', {})
+
+
+class CatalogCache:
+    """
+    Caché de respuestas versionada por modelo, con contadores de aciertos
+    y fallos por modelo (del proceso actual).
+    """
+    def __init__(self, alias='default', ttl=300):
+        self.alias = alias
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._counters = {}
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    @staticmethod
+    def _version_key(model):
+        return f'catalog:version:{model._meta.label_lower}'
+
+    def version(self, model):
+        """
+        Versión actual del modelo. Si la clave no existe (primer uso o
+        desalojada por la caché) se inicia con un valor que no repite
+        versiones anteriores, para no servir respuestas viejas.
+        """
+        key = self._version_key(model)
+        self.cache.add(key, time.time_ns(), None)
+        return self.cache.get(key)
+
+    def bump(self, model):
+        """Invalida todas las respuestas cacheadas del modelo."""
+        key = self._version_key(model)
+        try:
+            self.cache.incr(key)
+        except ValueError:
+            self.cache.set(key, time.time_ns(), None)
+
+    def invalidate(self, model):
+        """
+        Sube la versión ya y otra vez al confirmar la transacción: una lectura
+        concurrente que vea los datos anteriores al commit no queda
+        cacheada bajo la versión nueva.
+        """
+        self.bump(model)
+        transaction.on_commit(lambda: self.bump(model))
+
+    def key(self, model, request):
+        path = hashlib.md5(request.get_full_path().encode('utf-8')).hexdigest()
+        return f'catalog:{model._meta.label_lower}:{self.version(model)}:{path}'
+
+    def _count(self, model, outcome):
+        with self._lock:
+            counters = self._counters.setdefault(model._meta.label_lower,
+                                                 {'hits': 0, 'misses': 0})
+            counters[outcome] += 1
+
+    def get(self, model, key):
+        data = self.cache.get(key)
+        self._count(model, 'misses' if data is None else 'hits')
+        return data
+
+    def set(self, key, data):
+        self.cache.set(key, data, self.ttl)
+
+    def cached(self, model, name, build):
+        """
+        Datos guardados bajo ``name`` para la versión actual del modelo;
+        si no están, los calcula con ``build()`` y los guarda.
+        """
+        key = f'catalog:{model._meta.label_lower}:{self.version(model)}:{name}'
+        data = self.get(model, key)
+        if data is None:
+            data = build()
+            self.set(key, data)
+        return data
+
+    def clear(self):
+        """Vacía la caché configurada y los contadores."""
+        self.cache.clear()
+        with self._lock:
+            self._counters.clear()
+
+    def stats(self):
+        with self._lock:
+            by_model = {label: dict(counters) for label, counters in self._counters.items()}
+        hits = sum(c['hits'] for c in by_model.values())
+        misses = sum(c['misses'] for c in by_model.values())
+        for counters in by_model.values():
+            lookups = counters['hits'] + counters['misses']
+            counters['hit_rate'] = counters['hits'] / lookups if lookups else 0.0
+        return {
+            'backend': self.cache.__class__.__name__,
+            'ttl': self.ttl,
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / (hits + misses) if hits + misses else 0.0,
+            'models': by_model,
+        }
+
+
+catalog_cache = CatalogCache(
+    alias=_catalog_settings.get('ALIAS', 'default'),
+    ttl=_catalog_settings.get('TTL', 300),
+)
+
+
+def set_null_targets(model):
+    """
+    Modelos a los que ``model`` apunta con una FK SET_NULL: al borrar una
+    de sus filas, las de ``model`` cambian con un UPDATE que no emite
+    post_save, así que ese borrado también debe invalidar ``model``.
+    """
+    return [
+        field.related_model
+        for field in model._meta.get_fields()
+        if field.many_to_one and field.remote_field.on_delete is models.SET_NULL
+    ]
+
+
+class CachedCatalogMixin:
+    """
+    Sirve list y retrieve desde ``catalog_cache``. Los permisos se siguen
+    verificando en cada petición; solo se cachean respuestas 200, cuyo
+    contenido no depende del usuario. El ETag sale de la clave de la caché
+    (versión del modelo y URL), así que revalidar tampoco consulta la base.
+    """
+    def _cached(self, request, handler):
+        model = self.queryset.model
+        key = catalog_cache.key(model, request)
+        etag = make_etag(key)
+        data = catalog_cache.get(model, key)
+        if data is None:
+            response = handler()
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            catalog_cache.set(key, response.data)
+        else:
+            response = Response(data)
+        if not_modified(request, etag):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+        response['ETag'] = etag
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self._cached(request, lambda: super(CachedCatalogMixin, self).list(
+            request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._cached(request, lambda: super(CachedCatalogMixin, self).retrieve(
+            request, *args, **kwargs))
@@ -0,0 +1,92 @@
+"""
+GET condicional (ETag / If-None-Match) para la API.
+El ETag se deriva de una huella barata de los datos (cantidad de filas y
+máximo ``updated_at`` del queryset filtrado), no del cuerpo renderizado: si
+el recurso no cambió se responde 304 sin serializar nada.
+"""
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def make_etag(*parts):
+    """ETag débil a partir de las partes de la huella."""
+    digest = hashlib.md5('|'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+    return f'W/"{digest}"'
+
+
+def not_modified(request, etag):
+    """Indica si el cliente ya tiene la representación de ``etag``."""
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if not header:
+        return False
+    etags = parse_etags(header)
+    # la comparación de If-None-Match es débil: se ignora el prefijo W/
+    return '*' in etags or etag.removeprefix('W/') in {e.removeprefix('W/') for e in etags}
+
+
+def conditional(request, etag, handler):
+    """
+    Responde 304 si el ETag coincide; si no, ejecuta ``handler`` y agrega
+    el ETag a la respuesta 200.
+    """
+    if not_modified(request, etag):
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+    response = handler()
+    if response.status_code == status.HTTP_200_OK:
+        response['ETag'] = etag
+    return response
+
+
+class ConditionalGetMixin:
+    """
+    Agrega ETag a list y retrieve de un ModelViewSet cuyo modelo tiene
+    ``updated_at``. La huella incluye la URL completa (filtros, página) y el
+    usuario, porque los querysets pueden depender de quién consulta.
+    Los borrados cambian la cantidad de filas y las ediciones el máximo
+    ``updated_at``; los ``update()`` masivos deben fijar ``updated_at``.
+    ``etag_related`` lista las relaciones cuyos datos también se serializan
+    (p. ej. el nombre de la instalación de una reserva).
+    Las páginas por cursor no llevan ETag: la huella recorre todo el
+    queryset filtrado, justo lo que la paginación por cursor evita.
+    """
+    etag_related = ()
+
+    def _etag_fields(self):
+        return ['updated_at'] + [f'{related}__updated_at' for related in self.etag_related]
+
+    def _cursor_page(self, request):
+        use_cursor = getattr(self.paginator, 'use_cursor', None)
+        return use_cursor is not None and use_cursor(request)
+
+    def list(self, request, *args, **kwargs):
+        if self._cursor_page(request):
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset()).order_by()
+        fingerprint = queryset.aggregate(
+            count=Count('pk'),
+            **{f'last_{i}': Max(field) for i, field in enumerate(self._etag_fields())}
+        )
+        etag = make_etag(self.basename, 'list', request.get_full_path(), request.user.pk,
+                         *(value and str(value) for value in fingerprint.values()))
+
+        def handler():
+            return super(ConditionalGetMixin, self).list(request, *args, **kwargs)
+        return conditional(request, etag, handler)
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup = {self.lookup_field: kwargs[self.lookup_url_kwarg or self.lookup_field]}
+        fingerprint = (self.filter_queryset(self.get_queryset()).filter(**lookup)
+                       .values_list(*self._etag_fields()).first())
+
+        def handler():
+            return super(ConditionalGetMixin, self).retrieve(request, *args, **kwargs)
+        if fingerprint is None:
+            # no existe o no es visible: la vista responde 404
+            return handler()
+        etag = make_etag(self.basename, 'detail', request.get_full_path(), request.user.pk,
+                         *fingerprint)
+        return conditional(request, etag, handler)
@@ -0,0 +1,86 @@
+"""
+Restricciones de solape en la base de datos. En PostgreSQL, las reservas
+vigentes de una instalación y los turnos de un empleado no pueden cruzarse
+gracias a restricciones de exclusión (``btree_gist`` sobre ``tstzrange``,
+declaradas en ``Meta.constraints``), así que no hace falta consultar antes
+de guardar. En otros motores los modelos siguen verificando el solape con
+una consulta.
+"""
+from contextlib import contextmanager, nullcontext
+
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, models, transaction
+
+EXCLUSION_VIOLATION = '23P01'
+
+RESERVATION_OVERLAP = "Ya existe una reserva para este rango horario."
+SHIFT_OVERLAP = "El empleado ya tiene un turno asignado en este horario."
+
+
+class TsTzRange(models.Func):
+    """Rango semiabierto ``[inicio, fin)`` de PostgreSQL."""
+    function = 'TSTZRANGE'
+    template = "%(function)s(%(expressions)s, '[)')"
+    # solo se usa para generar el DDL de la restricción
+    output_field = models.Field()
+
+
+class OverlapConstraint(ExclusionConstraint):
+    """
+    Restricción de exclusión que solo existe en PostgreSQL: en otros motores
+    no genera DDL y el modelo verifica el solape con una consulta. Tampoco
+    se valida en ``full_clean``: ``clean()`` ya lo hace donde hace falta y
+    al guardar ``overlap_guard`` traduce la violación.
+    """
+    def constraint_sql(self, model, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return None
+        return super().constraint_sql(model, schema_editor)
+
+    def create_sql(self, model, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return None
+        return super().create_sql(model, schema_editor)
+
+    def remove_sql(self, model, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return None
+        return super().remove_sql(model, schema_editor)
+
+    def validate(self, model, instance, exclude=None, using=None):
+        pass
+
+
+def overlaps_enforced(using=None):
+    """True si la base de ``using`` rechaza los solapes por sí misma."""
+    return transaction.get_connection(using).vendor == 'postgresql'
+
+
+def is_exclusion_violation(exc):
+    cause = exc.__cause__
+    code = getattr(cause, 'sqlstate', None) or getattr(cause, 'pgcode', None)
+    return code == EXCLUSION_VIOLATION
+
+
+@contextmanager
+def _translate_violation(message):
+    try:
+        # punto de guardado: la transacción externa sigue usable
+        with transaction.atomic():
+            yield
+    except IntegrityError as exc:
+        if not is_exclusion_violation(exc):
+            raise
+        raise ValidationError(message) from exc
+
+
+def overlap_guard(message, using=None):
+    """
+    Contexto para el INSERT/UPDATE de una fila con rango: si la restricción
+    de exclusión lo rechaza, lanza ``ValidationError(message)`` como lo
+    haría la verificación en Python. Donde no hay restricción no hace nada.
+    """
+    if overlaps_enforced(using):
+        return _translate_violation(message)
+    return nullcontext()
@@ -0,0 +1,120 @@
+"""
+Análisis de cobertura de turnos por ubicación y área.
+Cada ubicación se representa como un arreglo de NumPy con el número de
+empleados en turno por minuto de la ventana analizada.
+"""
+from datetime import datetime, timedelta
+
+import numpy as np
+from django.utils import timezone
+
+from .intervals import local_day_bounds
+from .models import ShiftAssignment
+
+
+def minute_offsets(values, origin):
+    """Minutos enteros transcurridos desde ``origin`` para cada fecha-hora."""
+    base = origin.timestamp()
+    return np.fromiter(((value.timestamp() - base) // 60 for value in values),
+                       dtype=np.int64, count=len(values))
+
+
+def timeline(starts, ends, minutes):
+    """
+    Número de turnos activos en cada minuto de [0, minutes), a partir de
+    los minutos de inicio y fin de los turnos (suma acumulada de un arreglo
+    de diferencias). Los turnos se recortan a la ventana.
+    """
+    diff = np.zeros(minutes + 1, dtype=np.int32)
+    np.add.at(diff, np.clip(starts, 0, minutes), 1)
+    np.add.at(diff, np.clip(ends, 0, minutes), -1)
+    return np.cumsum(diff[:-1])
+
+
+def daily_mask(first_day, last_day, origin, minutes, daily_start=None, daily_end=None):
+    """
+    Máscara de los minutos de la ventana que caen en la franja diaria
+    [daily_start, daily_end) en hora local; si daily_end no es posterior a
+    daily_start, la franja cruza la medianoche. Sin franja, toda la ventana.
+    """
+    if daily_start is None or daily_end is None:
+        return np.ones(minutes, dtype=bool)
+    mask = np.zeros(minutes, dtype=bool)
+    tz = timezone.get_current_timezone()
+    # se incluye el día anterior por las franjas que cruzan la medianoche
+    for offset in range(-1, (last_day - first_day).days + 1):
+        day = first_day + timedelta(days=offset)
+        end_day = day if daily_end > daily_start else day + timedelta(days=1)
+        start = timezone.make_aware(datetime.combine(day, daily_start), tz)
+        end = timezone.make_aware(datetime.combine(end_day, daily_end), tz)
+        lo = int(max(0, (start - origin).total_seconds() // 60))
+        hi = int(min(minutes, (end - origin).total_seconds() // 60))
+        if lo < hi:
+            mask[lo:hi] = True
+    return mask
+
+
+def runs(flags):
+    """Pares (inicio, fin) de los tramos consecutivos en True de ``flags``."""
+    edges = np.diff(np.concatenate(([0], flags.astype(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def coverage_report(first_day, last_day, locations, areas, min_staff=1,
+                    daily_start=None, daily_end=None, max_windows=None):
+    """
+    Calcula huecos (nadie en turno) y ventanas con personal insuficiente
+    (menos de ``min_staff``) para cada ubicación y área en los días
+    [first_day, last_day]. ``locations`` es una lista de (tipo, id, nombre)
+    con tipo 'tower' o 'facility'. Los turnos se cargan con una sola consulta.
+    """
+    origin, window_end = local_day_bounds(first_day, last_day)
+    minutes = int((window_end - origin).total_seconds() // 60)
+    mask = daily_mask(first_day, last_day, origin, minutes, daily_start, daily_end)
+    observed = int(mask.sum())
+
+    groups = {}
+    for tower_id, facility_id, area, start, end in ShiftAssignment.objects.filter(
+        area__in=areas, start_datetime__lt=window_end, end_datetime__gt=origin
+    ).values_list('tower_id', 'facility_id', 'area', 'start_datetime', 'end_datetime'):
+        key = ('tower', tower_id) if tower_id is not None else ('facility', facility_id)
+        group = groups.setdefault((key, area), ([], []))
+        group[0].append(start)
+        group[1].append(end)
+
+    def windows(starts, ends, counts):
+        if max_windows:
+            starts, ends = starts[:max_windows], ends[:max_windows]
+        return [
+            {
+                'start': origin + timedelta(minutes=int(lo)),
+                'end': origin + timedelta(minutes=int(hi)),
+                'staff': int(counts[lo:hi].min()),
+            }
+            for lo, hi in zip(starts, ends)
+        ]
+
+    report = []
+    for kind, pk, name in locations:
+        for area in areas:
+            starts, ends = groups.get(((kind, pk), area), ([], []))
+            counts = timeline(minute_offsets(starts, origin), minute_offsets(ends, origin),
+                              minutes)
+            gap = mask & (counts == 0)
+            low = mask & (counts > 0) & (counts < min_staff)
+            gap_starts, gap_ends = runs(gap)
+            low_starts, low_ends = runs(low)
+            report.append({
+                'location': kind,
+                'id': pk,
+                'name': name,
+                'area': area,
+                'observed_minutes': observed,
+                'uncovered_minutes': int(gap.sum()),
+                'understaffed_minutes': int(low.sum()),
+                'gap_count': len(gap_starts),
+                'understaffed_count': len(low_starts),
+                'gaps': windows(gap_starts, gap_ends, counts),
+                'understaffed': windows(low_starts, low_ends, counts),
+            })
+    return report
@@ -0,0 +1,114 @@
+"""
+Fábricas de factory_boy para sembrar datos sintéticos de Domus.
+"""
+from datetime import timedelta
+
+import factory
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from .models import (Tower, Apartment, Facility, ParkingSpot,
+                    ShiftAssignment, LeaveRequest, Reservation)
+
+CustomUser = get_user_model()
+
+# Contraseña de todos los usuarios sembrados; se hashea una sola vez
+SEED_PASSWORD = 'domus1234'
+
+
+class UserFactory(factory.django.DjangoModelFactory):
+    """Usuario aprobado y activo; por defecto propietario."""
+    class Meta:
+        model = CustomUser
+
+    first_name = factory.Faker('first_name', locale='es_CO')
+    last_name = factory.Faker('last_name', locale='es_CO')
+    username = factory.Sequence(lambda n: f'usuario{n}')
+    email = factory.Sequence(lambda n: f'usuario{n}@domus.local')
+    telefono = factory.Faker('numerify', text='3#########')
+    role = CustomUser.PROPIETARIO
+    registration_status = CustomUser.APROBADO
+    is_active = True
+
+
+class EmployeeFactory(UserFactory):
+    """Empleado con subrol aleatorio."""
+    role = CustomUser.EMPLEADO
+    subrole = factory.Iterator([CustomUser.LIMPIEZA, CustomUser.SEGURIDAD,
+                                CustomUser.MANTENIMIENTO])
+
+
+class TowerFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Tower
+
+    name = factory.Sequence(lambda n: f'Torre {n + 1}')
+    num_floors = factory.Faker('random_int', min=5, max=30)
+
+
+class ApartmentFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Apartment
+
+    tower = factory.SubFactory(TowerFactory)
+    floor = factory.Faker('random_int', min=1, max=20)
+    number = factory.Sequence(lambda n: str(101 + n))
+    rooms = factory.Faker('random_int', min=1, max=4)
+    bathrooms = factory.Faker('random_int', min=1, max=3)
+    rent_price = factory.Faker('pydecimal', left_digits=7, right_digits=2, positive=True)
+    parking_slots = factory.Faker('random_int', min=0, max=2)
+
+
+class ParkingSpotFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = ParkingSpot
+
+    apartment = factory.SubFactory(ApartmentFactory)
+    identifier = factory.Sequence(lambda n: f'P-{n + 1}')
+
+
+class FacilityFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Facility
+
+    name = factory.Iterator(['Gimnasio', 'Piscina', 'Salón social', 'BBQ', 'Cancha',
+                             'Sala de juegos', 'Coworking', 'Sauna'])
+    is_reserved = True
+
+
+class ReservationFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Reservation
+
+    facility = factory.SubFactory(FacilityFactory)
+    user = factory.SubFactory(UserFactory)
+    start_datetime = factory.LazyFunction(timezone.now)
+    end_datetime = factory.LazyAttribute(lambda o: o.start_datetime + timedelta(hours=1))
+    status = factory.Iterator(['pendiente', 'aprobada', 'aprobada', 'rechazada'])
+
+
+class ShiftAssignmentFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = ShiftAssignment
+
+    employee = factory.SubFactory(EmployeeFactory)
+    area = factory.LazyAttribute(
+        lambda o: 'aseo' if o.employee.subrole == CustomUser.LIMPIEZA else 'seguridad'
+    )
+    start_datetime = factory.LazyFunction(timezone.now)
+    end_datetime = factory.LazyAttribute(lambda o: o.start_datetime + timedelta(hours=8))
+    tower = factory.SubFactory(TowerFactory)
+    facility = None
+
+
+class LeaveRequestFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = LeaveRequest
+
+    employee = factory.SubFactory(EmployeeFactory)
+    type = factory.Iterator(['permiso', 'incapacidad'])
+    start_date = factory.LazyFunction(lambda: timezone.localdate())
+    end_date = factory.LazyAttribute(lambda o: o.start_date + timedelta(days=2))
+    reason = factory.Faker('sentence', locale='es_ES')
+    document = 'leave_docs/seed.txt'
+    status = factory.Iterator(['pendiente', 'aprobada', 'rechazada'])
@@ -0,0 +1,78 @@
+"""
+Generación de feeds iCalendar (RFC 5545) línea por línea.
+Los eventos se producen desde un iterador, de modo que un feed con años
+de turnos o reservas se envía sin cargarse completo en memoria.
+"""
+from datetime import timezone as dt_timezone
+
+CRLF = '\r\n'
+
+# Estado de la reserva → STATUS del evento
+RESERVATION_STATUS = {
+    'pendiente': 'TENTATIVE',
+    'aprobada': 'CONFIRMED',
+    'rechazada': 'CANCELLED',
+}
+
+
+def escape(text):
+    """Escapa un valor de texto (barra invertida, punto y coma, coma y saltos de línea)."""
+    return (str(text).replace('\\', '\\\\').replace(';', '\\;')
+            .replace(',', '\\,').replace('\n', '\\n'))
+
+
+def fold(line):
+    """Parte una línea en tramos de 75 octetos como exige el formato."""
+    encoded = line.encode('utf-8')
+    if len(encoded) <= 75:
+        return line + CRLF
+    parts, current, size = [], '', 0
+    for char in line:
+        width = len(char.encode('utf-8'))
+        # las líneas de continuación empiezan con un espacio
+        if size + width > (75 if not parts else 74):
+            parts.append(current)
+            current, size = '', 0
+        current += char
+        size += width
+    parts.append(current)
+    return CRLF.join([parts[0]] + [' ' + part for part in parts[1:]]) + CRLF
+
+
+def utc(value):
+    """Fecha-hora en UTC con el formato AAAAMMDDTHHMMSSZ."""
+    return value.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def calendar(name, events):
+    """
+    Genera el calendario como fragmentos de texto. ``events`` es un iterable
+    de diccionarios con uid, start, end, stamp, summary y, opcionales,
+    location, description y status.
+    """
+    yield ''.join(fold(line) for line in (
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        'PRODID:-//Domus//Domus//ES',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        f'X-WR-CALNAME:{escape(name)}',
+    ))
+    for event in events:
+        lines = [
+            'BEGIN:VEVENT',
+            f"UID:{event['uid']}",
+            f"DTSTAMP:{utc(event['stamp'])}",
+            f"LAST-MODIFIED:{utc(event['stamp'])}",
+            f"DTSTART:{utc(event['start'])}",
+            f"DTEND:{utc(event['end'])}",
+            f"SUMMARY:{escape(event['summary'])}",
+        ]
+        for key in ('location', 'description'):
+            if event.get(key):
+                lines.append(f'{key.upper()}:{escape(event[key])}')
+        if event.get('status'):
+            lines.append(f"STATUS:{event['status']}")
+        lines.append('END:VEVENT')
+        yield ''.join(fold(line) for line in lines)
+    yield fold('END:VCALENDAR')
@@ -0,0 +1,120 @@
+"""
+Utilidades de intervalos de tiempo para reservas y turnos.
+Todos los intervalos son semiabiertos [inicio, fin).
+"""
+from bisect import bisect_left, bisect_right
+from datetime import datetime, time, timedelta
+
+from django.utils import timezone
+
+
+def merge_intervals(intervals):
+    """
+    Fusiona intervalos solapados o contiguos con un barrido ordenado por inicio.
+    Devuelve una lista de tuplas (inicio, fin) disjuntas y ordenadas.
+    """
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def free_intervals(busy, window_start, window_end):
+    """
+    Devuelve los huecos libres dentro de [window_start, window_end)
+    dados los intervalos ocupados (no necesitan estar ordenados ni fusionados).
+    """
+    free = []
+    cursor = window_start
+    for start, end in merge_intervals(busy):
+        if end <= window_start or start >= window_end:
+            continue
+        if start > cursor:
+            free.append((cursor, start))
+        cursor = max(cursor, end)
+    if cursor < window_end:
+        free.append((cursor, window_end))
+    return free
+
+
+def free_slots(free, window_start, slot):
+    """
+    Parte los huecos libres en franjas de duración ``slot`` alineadas
+    con ``window_start``. Solo se devuelven franjas completamente libres.
+    """
+    slots = []
+    for start, end in free:
+        steps = -((window_start - start) // slot)  # techo de (start - window_start) / slot
+        cursor = window_start + steps * slot
+        while cursor + slot <= end:
+            slots.append((cursor, cursor + slot))
+            cursor += slot
+    return slots
+
+
+class IntervalIndex:
+    """
+    Índice en memoria de intervalos ocupados.
+    Guarda los intervalos fusionados y ordenados, de modo que consultar o
+    agregar un intervalo cuesta una búsqueda binaria.
+    """
+    def __init__(self, intervals=()):
+        merged = merge_intervals(intervals)
+        self._starts = [start for start, _ in merged]
+        self._ends = [end for _, end in merged]
+
+    def __len__(self):
+        return len(self._starts)
+
+    def __iter__(self):
+        return iter(zip(self._starts, self._ends))
+
+    def overlaps(self, start, end):
+        """Indica si [start, end) se cruza con algún intervalo del índice."""
+        i = bisect_right(self._ends, start)
+        return i < len(self._starts) and self._starts[i] < end
+
+    def add(self, start, end):
+        """Agrega [start, end) fusionándolo con los intervalos que toca."""
+        i = bisect_left(self._ends, start)
+        j = bisect_right(self._starts, end)
+        if i < j:
+            start = min(start, self._starts[i])
+            end = max(end, self._ends[j - 1])
+        self._starts[i:j] = [start]
+        self._ends[i:j] = [end]
+
+
+def local_day_bounds(first_day, last_day):
+    """
+    Rango semiabierto [inicio de first_day, inicio del día siguiente a last_day)
+    en la zona horaria del proyecto. Reemplaza los filtros ``__date`` (que
+    impiden usar índices) por comparaciones directas sobre la columna.
+    """
+    tz = timezone.get_current_timezone()
+    start = timezone.make_aware(datetime.combine(first_day, time.min), tz)
+    end = timezone.make_aware(datetime.combine(last_day + timedelta(days=1), time.min), tz)
+    return start, end
+
+
+def weekly_blocks(first_day, last_day, blocks):
+    """
+    Expande bloques semanales ({weekdays, start, end, ...}) sobre los días
+    [first_day, last_day] y genera tuplas (bloque, inicio, fin) ordenadas por
+    día. Las horas se interpretan en la zona del proyecto; si la hora de fin
+    no es posterior a la de inicio, el bloque termina al día siguiente.
+    """
+    tz = timezone.get_current_timezone()
+    for offset in range((last_day - first_day).days + 1):
+        day = first_day + timedelta(days=offset)
+        for block in blocks:
+            if day.weekday() not in block['weekdays']:
+                continue
+            end_day = day if block['end'] > block['start'] else day + timedelta(days=1)
+            yield (block,
+                   timezone.make_aware(datetime.combine(day, block['start']), tz),
+                   timezone.make_aware(datetime.combine(end_day, block['end']), tz))
@@ -0,0 +1,44 @@
+"""
+Comando para mover al histórico las reservas, turnos y permisos viejos.
+"""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api.archive import (ARCHIVE_BATCH_SIZE, ARCHIVE_HORIZON, ARCHIVE_KEYS, ARCHIVE_MODELS,
+                         archive, compact, expired)
+
+
+class Command(BaseCommand):
+    """
+    Mueve a las tablas de histórico las filas que terminaron hace más de
+    ``--days`` días (ARCHIVE["HORIZON_DAYS"] por defecto), en lotes de
+    ``--batch-size`` filas con una transacción por lote. Con ``--vacuum``
+    además compacta las tablas al terminar.
+    """
+    help = 'Mueve al histórico las reservas, turnos y permisos terminados.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=ARCHIVE_HORIZON.days,
+                            help='Antigüedad mínima (días desde el fin) de las filas a archivar.')
+        parser.add_argument('--batch-size', type=int, default=ARCHIVE_BATCH_SIZE)
+        parser.add_argument('--only', choices=ARCHIVE_KEYS, action='append',
+                            help='Modelo a archivar (por defecto todos).')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Solo contar las filas archivables.')
+        parser.add_argument('--vacuum', action='store_true',
+                            help='Compactar las tablas y actualizar estadísticas al terminar.')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        keys = options['only']
+        if options['dry_run']:
+            counts = {spec.key: expired(spec, cutoff).count() for spec in ARCHIVE_MODELS
+                      if not keys or spec.key in keys}
+        else:
+            counts = archive(cutoff, keys, options['batch_size'])
+        for key, count in counts.items():
+            self.stdout.write(f'{key}: {count}')
+        if options['vacuum'] and not options['dry_run']:
+            compact(keys)
@@ -0,0 +1,164 @@
+"""
+Comando para medir latencia y consultas por endpoint de la API.
+"""
+import json
+import platform
+import statistics
+import subprocess
+import time
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from api.authentication import token_cache
+from api.models import Facility, LeaveRequest, Reservation, ShiftAssignment
+
+CustomUser = get_user_model()
+
+
+def percentile(values, pct):
+    """Percentil por rango más cercano sobre una lista no vacía."""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    """
+    Ejecuta cada escenario varias veces con el cliente de pruebas de Django,
+    autenticado por token como administrador, propietario o empleado, y
+    registra latencia p50/p95/p99 y número de consultas SQL por endpoint.
+    Pensado para correr sobre una base sembrada con ``seed_domus``.
+    El resultado se escribe en JSON para comparar corridas entre commits.
+    """
+    help = 'Mide latencia (p50/p95/p99) y consultas por endpoint de la API.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=30)
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument('--output', default='bench_output.json',
+                            help='Archivo JSON de resultados ("-" para la salida estándar).')
+        parser.add_argument('--only', nargs='*', default=None,
+                            help='Nombres de escenarios a ejecutar.')
+
+    def users(self):
+        def first(**filters):
+            return (CustomUser.objects.filter(is_active=True, **filters)
+                    .order_by('id').first())
+        users = {
+            'admin': first(role=CustomUser.ADMIN, is_staff=True),
+            'propietario': first(role=CustomUser.PROPIETARIO, reservations__isnull=False),
+            'empleado': first(role=CustomUser.EMPLEADO, shiftassignment__isnull=False),
+        }
+        missing = [role for role, user in users.items() if user is None]
+        if missing:
+            raise CommandError(
+                f"Faltan usuarios para: {', '.join(missing)}. Ejecute primero seed_domus."
+            )
+        return users
+
+    def scenarios(self):
+        """Lista de (nombre, rol, url, parámetros)."""
+        today = timezone.localdate()
+        week = {'start': today.isoformat(), 'end': (today + timezone.timedelta(days=6)).isoformat()}
+        facility = Facility.objects.order_by('id').first()
+        scenarios = [
+            ('users-me', 'propietario', '/api/users/me/', {}),
+            ('facilities', 'propietario', '/api/facilities/', {}),
+            ('towers', 'admin', '/api/towers/', {}),
+            ('apartments', 'admin', '/api/apartments/', {}),
+            ('users', 'admin', '/api/users/', {}),
+            ('reservations-admin', 'admin', '/api/reservations/', {}),
+            ('reservations-admin-deep-page', 'admin', '/api/reservations/', {'page': 50}),
+            ('reservations-admin-cursor', 'admin', '/api/reservations/', {'pagination': 'cursor'}),
+            ('reservations-owner', 'propietario', '/api/reservations/', {}),
+            ('shifts-admin-week', 'admin', '/api/shifts/', week),
+            ('shifts-employee-week', 'empleado', '/api/shifts/', week),
+            ('leaves-admin', 'admin', '/api/leaves/', {}),
+            ('leaves-admin-pending', 'admin', '/api/leaves/', {'status': 'pendiente'}),
+        ]
+        if facility is not None:
+            scenarios.append((
+                'facility-availability', 'propietario',
+                f'/api/facilities/{facility.id}/availability/',
+                {'from': today.isoformat(), 'to': (today + timezone.timedelta(days=7)).isoformat()},
+            ))
+        return scenarios
+
+    def run_scenario(self, client, url, params, options):
+        for _ in range(options['warmup']):
+            client.get(url, params)
+        latencies, queries = [], []
+        for _ in range(options['iterations']):
+            with CaptureQueriesContext(connection) as ctx:
+                began = time.perf_counter()
+                response = client.get(url, params)
+                latencies.append((time.perf_counter() - began) * 1000)
+            queries.append(len(ctx.captured_queries))
+            if response.status_code != 200:
+                raise CommandError(f'{url} respondió {response.status_code}')
+        return {
+            'url': url,
+            'params': params,
+            'status': response.status_code,
+            'bytes': len(response.content),
+            'p50_ms': round(percentile(latencies, 50), 3),
+            'p95_ms': round(percentile(latencies, 95), 3),
+            'p99_ms': round(percentile(latencies, 99), 3),
+            'mean_ms': round(statistics.mean(latencies), 3),
+            'queries': max(queries),
+        }
+
+    def metadata(self):
+        try:
+            commit = subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                check=True, cwd=settings.BASE_DIR
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = None
+        return {
+            'commit': commit,
+            'timestamp': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'dataset': {
+                'users': CustomUser.objects.count(),
+                'reservations': Reservation.objects.count(),
+                'shifts': ShiftAssignment.objects.count(),
+                'leaves': LeaveRequest.objects.count(),
+            },
+        }
+
+    def handle(self, *args, **options):
+        clients = {}
+        for role, user in self.users().items():
+            token, _ = Token.objects.get_or_create(user=user)
+            clients[role] = Client(HTTP_AUTHORIZATION=f'Token {token.key}')
+        token_cache.clear()
+        results = {}
+        for name, role, url, params in self.scenarios():
+            if options['only'] and name not in options['only']:
+                continue
+            result = self.run_scenario(clients[role], url, params, options)
+            results[name] = result
+            self.stdout.write(
+                f"{name:32} p50 {result['p50_ms']:8.2f} ms  p95 {result['p95_ms']:8.2f} ms  "
+                f"p99 {result['p99_ms']:8.2f} ms  {result['queries']:3d} consultas"
+            )
+        report = {'meta': self.metadata(), 'iterations': options['iterations'],
+                  'results': results}
+        if options['output'] == '-':
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            with open(options['output'], 'w', encoding='utf-8') as fh:
+                json.dump(report, fh, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Resultados en {options['output']}"))
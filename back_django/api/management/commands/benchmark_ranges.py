@@ -0,0 +1,99 @@
+"""
+Comando para comparar los filtros por fecha (``__date``) contra los rangos
+semiabiertos indexados sobre un conjunto de datos sembrado.
+"""
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from api.intervals import local_day_bounds
+from api.models import ShiftAssignment, Tower
+
+CustomUser = get_user_model()
+
+
+class Command(BaseCommand):
+    """
+    Siembra empleados y turnos dentro de una transacción que se
+    revierte al final, mide cada consulta en su forma anterior y en la nueva,
+    y muestra el plan de ejecución de ambas. No deja datos en la base.
+    """
+    help = 'Compara filtros __date contra rangos indexados sobre datos sembrados.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--employees', type=int, default=200)
+        parser.add_argument('--days', type=int, default=365,
+                            help='Días de turnos por empleado (un turno por día).')
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--plans', action='store_true',
+                            help='Mostrar el plan de ejecución de cada consulta.')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.seed(options)
+            self.run(options)
+            transaction.set_rollback(True)
+
+    def seed(self, options):
+        rng = random.Random(42)
+        tower = Tower.objects.create(name='Torre bench', num_floors=10)
+        employees = CustomUser.objects.bulk_create([
+            CustomUser(username=f'bench{i}', email=f'bench{i}@bench.local', first_name='Bench',
+                       last_name=str(i), telefono='0', role=CustomUser.EMPLEADO,
+                       subrole=CustomUser.SEGURIDAD, password='!')
+            for i in range(options['employees'])
+        ])
+        self.origin = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        ShiftAssignment.objects.bulk_create([
+            ShiftAssignment(
+                employee=employee, area='seguridad', tower=tower,
+                start_datetime=self.origin + timedelta(days=day, hours=hour),
+                end_datetime=self.origin + timedelta(days=day, hours=hour + 8),
+            )
+            for employee in employees
+            for day in range(options['days'])
+            for hour in (rng.choice((6, 14, 22)),)
+        ], batch_size=2000)
+        self.employee = employees[len(employees) // 2]
+        self.stdout.write(f"Sembrados: {ShiftAssignment.objects.count()} turnos")
+
+    def queries(self):
+        """Pares (nombre, consulta anterior, consulta nueva)."""
+        first = (self.origin + timedelta(days=30)).date()
+        last = first + timedelta(days=6)
+        start, end = local_day_bounds(first, last)
+        shifts = ShiftAssignment.objects.all()
+        return [
+            ('turnos de la semana (admin)',
+             shifts.filter(start_datetime__date__gte=first, end_datetime__date__lte=last),
+             shifts.filter(start_datetime__gte=start, end_datetime__lt=end)),
+            ('turnos de la semana (empleado)',
+             shifts.filter(employee=self.employee,
+                           start_datetime__date__gte=first, end_datetime__date__lte=last),
+             shifts.filter(employee=self.employee,
+                           start_datetime__gte=start, end_datetime__lt=end)),
+        ]
+
+    def measure(self, queryset, repeat):
+        timings = []
+        for _ in range(repeat):
+            began = time.perf_counter()
+            list(queryset.values_list('pk', flat=True))
+            timings.append((time.perf_counter() - began) * 1000)
+        return statistics.median(timings)
+
+    def run(self, options):
+        self.stdout.write(f"{'consulta':34} {'__date (ms)':>12} {'rango (ms)':>12}")
+        for name, before, after in self.queries():
+            old_ms = self.measure(before, options['repeat'])
+            new_ms = self.measure(after, options['repeat'])
+            self.stdout.write(f"{name:34} {old_ms:12.2f} {new_ms:12.2f}")
+            if options['plans']:
+                self.stdout.write(f"  antes: {before.explain()}")
+                self.stdout.write(f"  ahora: {after.explain()}")
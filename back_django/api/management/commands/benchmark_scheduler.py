@@ -0,0 +1,84 @@
+"""
+Comando para medir el motor de programación de turnos a varios tamaños.
+"""
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.core.management.base import BaseCommand
+
+from api.intervals import IntervalIndex
+from api.scheduler import Slot, schedule
+
+
+class Command(BaseCommand):
+    """
+    Genera problemas sintéticos en memoria (empleados por área, permisos
+    aleatorios y tres bloques diarios de 8 horas por ubicación) y mide el
+    tiempo de ``schedule`` para cada combinación de empleados y días.
+    No usa la base de datos.
+    """
+    help = 'Mide el motor de programación de turnos a varios tamaños.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--employees', type=int, nargs='+', default=[50, 200, 500, 1000])
+        parser.add_argument('--days', type=int, nargs='+', default=[7, 31])
+        parser.add_argument('--locations', type=int, default=10,
+                            help='Torres o instalaciones a cubrir por área.')
+        parser.add_argument('--leave-rate', type=float, default=0.05,
+                            help='Fracción de días con permiso por empleado.')
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def problem(self, employees, days, options):
+        rng = random.Random(42)
+        origin = datetime(2025, 1, 6, tzinfo=dt_timezone.utc)
+        candidates = {
+            'aseo': list(range(0, employees // 2)),
+            'seguridad': list(range(employees // 2, employees)),
+        }
+        # cobertura proporcional a la plantilla: cerca de 5 de cada 7 días por empleado
+        required = max(1, employees // (2 * options['locations'] * 3 * 7 // 5))
+        slots = [
+            Slot(area, location, None,
+                 origin + timedelta(days=day, hours=hour),
+                 origin + timedelta(days=day, hours=hour + 8), required)
+            for day in range(days)
+            for hour in (6, 14, 22)
+            for area in candidates
+            for location in range(options['locations'])
+        ]
+        slots.sort(key=lambda slot: slot.start)
+        leaves = {}
+        for pk in range(employees):
+            for day in range(days):
+                if rng.random() < options['leave_rate']:
+                    leaves.setdefault(pk, []).append(
+                        (origin + timedelta(days=day), origin + timedelta(days=day + 1))
+                    )
+        return slots, candidates, leaves
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"{'empleados':>10} {'días':>5} {'franjas':>8} {'asignados':>10} "
+            f"{'sin cubrir':>11} {'desv. horas':>12} {'ms':>10}"
+        )
+        for employees in options['employees']:
+            for days in options['days']:
+                slots, candidates, leaves = self.problem(employees, days, options)
+                timings = []
+                for _ in range(options['repeat']):
+                    busy = {}
+                    leave_index = {pk: IntervalIndex(iv) for pk, iv in leaves.items()}
+                    began = time.perf_counter()
+                    assignments, unfilled = schedule(slots, candidates, busy, leave_index)
+                    timings.append((time.perf_counter() - began) * 1000)
+                hours = {pk: 0 for pk in range(employees)}
+                for pk, slot in assignments:
+                    hours[pk] += (slot.end - slot.start).total_seconds() / 3600
+                self.stdout.write(
+                    f"{employees:>10} {days:>5} {len(slots):>8} {len(assignments):>10} "
+                    f"{sum(missing for _, missing in unfilled):>11} "
+                    f"{statistics.pstdev(hours.values()):>12.2f} "
+                    f"{statistics.median(timings):>10.1f}"
+                )
@@ -0,0 +1,136 @@
+"""
+Comando para medir el rendimiento de escritura de SQLite con varios
+procesos escritores, con el perfil por defecto y con el de producción.
+"""
+import json
+import multiprocessing
+import os
+import sqlite3
+import statistics
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+BENCH_SLOTS = 50
+
+PROFILES = {
+    'default': {},
+    'production': settings.SQLITE_PRODUCTION_OPTIONS,
+}
+
+
+def connect(path, options):
+    """
+    Conexión sqlite3 configurada como la de Django con ``options``
+    (timeout, init_command y transaction_mode).
+    """
+    conn = sqlite3.connect(path, timeout=options.get('timeout', 5), isolation_level=None)
+    for command in options.get('init_command', '').split(';'):
+        if command.strip():
+            conn.execute(command)
+    return conn
+
+
+def writer(path, options, transactions, worker, results):
+    """
+    Proceso escritor: cada transacción cuenta las filas de una franja y
+    luego inserta una, como ``perform_create`` al validar solapes.
+    """
+    conn = connect(path, options)
+    begin = f"BEGIN {options.get('transaction_mode') or ''}".strip()
+    latencies, errors = [], 0
+    for i in range(transactions):
+        slot = (worker * transactions + i) % BENCH_SLOTS
+        started = time.perf_counter()
+        try:
+            conn.execute(begin)
+            conn.execute('SELECT COUNT(*) FROM bench_write WHERE slot = ?', [slot]).fetchone()
+            conn.execute('INSERT INTO bench_write (slot, worker) VALUES (?, ?)', [slot, worker])
+            conn.execute('COMMIT')
+        except sqlite3.OperationalError:
+            # "database is locked": la escritura se perdió
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            errors += 1
+            continue
+        latencies.append(time.perf_counter() - started)
+    conn.close()
+    results.put((latencies, errors))
+
+
+class Command(BaseCommand):
+    """
+    Crea una base SQLite temporal y lanza 1, 4 y 16 procesos (como workers
+    de gunicorn) que leen y escriben en transacciones cortas, con la misma
+    configuración de conexión que aplica Django para cada perfil. Reporta
+    transacciones por segundo, latencias y escrituras fallidas con cada
+    perfil. No toca la base configurada.
+    """
+    help = 'Mide escrituras concurrentes en SQLite con los perfiles default y production.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, nargs='+', default=[1, 4, 16])
+        parser.add_argument('--transactions', type=int, default=200,
+                            help='Transacciones por escritor.')
+        parser.add_argument('--profile', choices=sorted(PROFILES), action='append',
+                            help='Perfil a medir (por defecto ambos).')
+        parser.add_argument('--output', help='Guardar los resultados en JSON ("-": stdout).')
+
+    def handle(self, *args, **options):
+        results = []
+        for profile in options['profile'] or sorted(PROFILES):
+            for writers in options['writers']:
+                results.append(self.run(profile, writers, options['transactions']))
+        if options['output'] == '-':
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        self.stdout.write(f"{'perfil':<12}{'escritores':>11}{'tx/s':>10}{'p50 ms':>9}"
+                          f"{'p95 ms':>9}{'fallidas':>10}")
+        for row in results:
+            self.stdout.write(
+                f"{row['profile']:<12}{row['writers']:>11}{row['tx_per_second']:>10.0f}"
+                f"{row['p50_ms']:>9.2f}{row['p95_ms']:>9.2f}{row['errors']:>10}"
+            )
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as handle:
+                json.dump(results, handle, indent=2)
+
+    def run(self, profile, writers, transactions):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'bench.sqlite3')
+            self.create_table(path, PROFILES[profile])
+            context = multiprocessing.get_context('fork')
+            queue = context.Queue()
+            processes = [
+                context.Process(target=writer,
+                                args=(path, PROFILES[profile], transactions, worker, queue))
+                for worker in range(writers)
+            ]
+            started = time.perf_counter()
+            for process in processes:
+                process.start()
+            outcomes = [queue.get() for _ in processes]
+            for process in processes:
+                process.join()
+            elapsed = time.perf_counter() - started
+        latencies = sorted(latency for done, _ in outcomes for latency in done)
+        committed = len(latencies)
+        return {
+            'profile': profile,
+            'writers': writers,
+            'committed': committed,
+            'errors': sum(errors for _, errors in outcomes),
+            'seconds': elapsed,
+            'tx_per_second': committed / elapsed if elapsed else 0.0,
+            'p50_ms': statistics.median(latencies) * 1000 if latencies else 0.0,
+            'p95_ms': latencies[int(len(latencies) * 0.95) - 1] * 1000 if latencies else 0.0,
+        }
+
+    def create_table(self, path, options):
+        conn = connect(path, options)
+        conn.execute('CREATE TABLE bench_write (id INTEGER PRIMARY KEY, '
+                     'slot INTEGER NOT NULL, worker INTEGER NOT NULL)')
+        conn.execute('CREATE INDEX bench_write_slot ON bench_write (slot)')
+        conn.close()
@@ -0,0 +1,21 @@
+"""
+Comando para borrar las lápidas viejas de la sincronización incremental.
+"""
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api.models import Tombstone
+from api.sync import SYNC_TOMBSTONE_RETENTION
+
+
+class Command(BaseCommand):
+    """
+    Borra las lápidas más viejas que la retención (SYNC["TOMBSTONE_DAYS"]).
+    Un cliente con un cursor anterior recibe una copia completa en su
+    próxima sincronización, así que no necesita esas lápidas.
+    """
+    help = 'Borra las lápidas de sincronización más viejas que la retención.'
+
+    def handle(self, *args, **options):
+        pruned = Tombstone.objects.prune(timezone.now() - SYNC_TOMBSTONE_RETENTION)
+        self.stdout.write(f'Lápidas borradas: {pruned}')
@@ -0,0 +1,23 @@
+"""
+Comando para reconstruir el índice de búsqueda de texto completo.
+"""
+from django.core.management.base import BaseCommand
+
+from api.search import SEARCH_SOURCES, rebuild
+
+
+class Command(BaseCommand):
+    """
+    Regenera los documentos de búsqueda desde las tablas. Las señales
+    mantienen el índice al día; esto hace falta tras cargas masivas o
+    cambios hechos fuera del ORM.
+    """
+    help = 'Reconstruye el índice de búsqueda de texto completo.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--kind', action='append', choices=sorted(SEARCH_SOURCES),
+                            help='Tipo de documento a reconstruir (por defecto todos).')
+
+    def handle(self, *args, **options):
+        counts = rebuild(options['kind'])
+        self.stdout.write(', '.join(f'{kind}: {n}' for kind, n in counts.items()))
@@ -0,0 +1,63 @@
+"""
+Comando para programar turnos automáticamente a partir de una plantilla
+de cobertura.
+"""
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from api.models import ShiftAssignment, OutboxEmail
+from api.scheduler import plan_shifts, shift_notifications
+from api.serializers import ShiftScheduleSerializer
+
+
+class Command(BaseCommand):
+    """
+    Lee los bloques de cobertura de un archivo JSON
+    ({"blocks": [{"area", "tower" | "facility", "weekdays", "start", "end",
+    "required"}, ...]}), asigna empleados elegibles equilibrando sus horas
+    y guarda los turnos, salvo con --dry-run.
+    """
+    help = 'Programa turnos automáticamente según una plantilla de cobertura.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('template', help='Archivo JSON con los bloques de cobertura.')
+        parser.add_argument('--start', required=True, help='Primer día (AAAA-MM-DD).')
+        parser.add_argument('--end', required=True, help='Último día (AAAA-MM-DD).')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Mostrar el plan sin guardar turnos.')
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['template'], encoding='utf-8') as fh:
+                template = json.load(fh)
+        except (OSError, ValueError) as exc:
+            raise CommandError(f'No se pudo leer la plantilla: {exc}') from exc
+        serializer = ShiftScheduleSerializer(data={
+            'start_date': options['start'], 'end_date': options['end'],
+            'blocks': template.get('blocks'), 'dry_run': options['dry_run'],
+        })
+        if not serializer.is_valid():
+            raise CommandError(json.dumps(serializer.errors, ensure_ascii=False))
+        data = serializer.validated_data
+        with transaction.atomic():
+            shifts, unfilled = plan_shifts(data['start_date'], data['end_date'], data['blocks'])
+            if not data['dry_run']:
+                results = ShiftAssignment.objects.assign_many(shifts)
+                shifts = [shift for shift, conflict in results if conflict is None]
+                OutboxEmail.objects.queue(
+                    shift_notifications(shifts, settings.DEFAULT_FROM_EMAIL)
+                )
+        for slot, missing in unfilled:
+            self.stdout.write(self.style.WARNING(
+                f'Sin cubrir: {missing} de {slot.required} en {slot.area} '
+                f'{slot.start} - {slot.end}'
+            ))
+        action = 'Planeados' if data['dry_run'] else 'Creados'
+        self.stdout.write(self.style.SUCCESS(
+            f'{action} {len(shifts)} turnos para '
+            f'{len({shift.employee_id for shift in shifts})} empleados; '
+            f'{sum(missing for _, missing in unfilled)} puestos sin cubrir.'
+        ))
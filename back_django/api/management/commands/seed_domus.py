@@ -0,0 +1,173 @@
+"""
+Comando para sembrar un conjunto de datos sintético de un edificio.
+"""
+import random
+from datetime import datetime, time, timedelta
+
+import factory.random
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from api.factories import (SEED_PASSWORD, UserFactory, EmployeeFactory, TowerFactory,
+                           ApartmentFactory, ParkingSpotFactory, FacilityFactory,
+                           ReservationFactory, ShiftAssignmentFactory, LeaveRequestFactory)
+from api.models import (Tower, Apartment, Facility, ParkingSpot,
+                        ShiftAssignment, LeaveRequest, Reservation)
+from api.search import rebuild
+
+CustomUser = get_user_model()
+
+SHIFT_START_HOURS = (6, 14, 22)
+
+
+class Command(BaseCommand):
+    """
+    Siembra torres, apartamentos, parqueaderos, instalaciones, usuarios,
+    reservas, turnos y permisos con factory_boy e inserciones masivas.
+    Los turnos no se solapan por empleado ni las reservas por instalación,
+    y no se asignan turnos en días de permisos aprobados.
+    Todos los usuarios sembrados usan la contraseña ``SEED_PASSWORD``.
+    """
+    help = 'Siembra un conjunto de datos sintético para pruebas de carga.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--prefix', default='seed',
+                            help='Prefijo de usuarios y correos sembrados.')
+        parser.add_argument('--towers', type=int, default=4)
+        parser.add_argument('--apartments-per-tower', type=int, default=40)
+        parser.add_argument('--owners', type=int, default=300)
+        parser.add_argument('--employees', type=int, default=150)
+        parser.add_argument('--facilities', type=int, default=8)
+        parser.add_argument('--reservations', type=int, default=5000)
+        parser.add_argument('--shift-days', type=int, default=180,
+                            help='Días hacia atrás con turnos (5 de cada 7 días por empleado).')
+        parser.add_argument('--leaves', type=int, default=600)
+        parser.add_argument('--seed', type=int, default=42, help='Semilla aleatoria.')
+
+    def handle(self, *args, **options):
+        prefix = options['prefix']
+        if CustomUser.objects.filter(email__endswith=f'@{prefix}.domus.local').exists():
+            raise CommandError(f'Ya hay datos sembrados con el prefijo "{prefix}"; use --prefix.')
+        self.rng = random.Random(options['seed'])
+        factory.random.reseed_random(options['seed'])
+        self.today = timezone.localdate()
+        with transaction.atomic():
+            self.seed_users(prefix, options)
+            self.seed_buildings(options)
+            self.seed_reservations(options)
+            leaves = self.seed_leaves(options)
+            self.seed_shifts(options, leaves)
+            # bulk_create no emite señales: indexar lo sembrado de una vez
+            rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            'Sembrados: '
+            f'{Tower.objects.count()} torres, {Apartment.objects.count()} apartamentos, '
+            f'{ParkingSpot.objects.count()} parqueaderos, {Facility.objects.count()} instalaciones, '
+            f'{CustomUser.objects.count()} usuarios, {Reservation.objects.count()} reservas, '
+            f'{ShiftAssignment.objects.count()} turnos, {LeaveRequest.objects.count()} permisos.'
+        ))
+        self.stdout.write(f'Administrador: admin@{prefix}.domus.local / {SEED_PASSWORD}')
+
+    def seed_users(self, prefix, options):
+        password = make_password(SEED_PASSWORD)
+
+        def build(factory, kind, n, **extra):
+            return [
+                factory.build(username=f'{prefix}-{kind}{i}',
+                              email=f'{kind}{i}@{prefix}.domus.local',
+                              password=password, **extra)
+                for i in range(n)
+            ]
+
+        self.admin = CustomUser.objects.bulk_create(
+            [UserFactory.build(username=f'{prefix}-admin', email=f'admin@{prefix}.domus.local',
+                               password=password, role=CustomUser.ADMIN, is_staff=True)]
+        )[0]
+        Token.objects.get_or_create(user=self.admin)
+        self.owners = CustomUser.objects.bulk_create(
+            build(UserFactory, 'owner', options['owners'])
+        )
+        self.employees = CustomUser.objects.bulk_create(
+            build(EmployeeFactory, 'employee', options['employees'])
+        )
+
+    def seed_buildings(self, options):
+        towers = Tower.objects.bulk_create(
+            [TowerFactory.build() for _ in range(options['towers'])]
+        )
+        apartments = Apartment.objects.bulk_create([
+            ApartmentFactory.build(tower=tower, floor=1 + i // 4,
+                                   number=f'{1 + i // 4}{i % 4 + 1:02d}',
+                                   owner=self.rng.choice(self.owners) if self.owners else None)
+            for tower in towers
+            for i in range(options['apartments_per_tower'])
+        ], batch_size=1000)
+        ParkingSpot.objects.bulk_create([
+            ParkingSpotFactory.build(apartment=apartment, identifier=f'{apartment.tower_id}-{i}')
+            for i, apartment in enumerate(apartments)
+        ], batch_size=1000)
+        self.towers = towers
+        self.facilities = Facility.objects.bulk_create(
+            [FacilityFactory.build() for _ in range(options['facilities'])]
+        )
+
+    def seed_reservations(self, options):
+        if not self.facilities or not self.owners:
+            return
+        now = timezone.now().replace(minute=0, second=0, microsecond=0)
+        taken = set()
+        reservations = []
+        attempts = 0
+        while len(reservations) < options['reservations'] and attempts < options['reservations'] * 5:
+            attempts += 1
+            facility = self.rng.choice(self.facilities)
+            start = now + timedelta(days=self.rng.randint(-180, 30), hours=self.rng.randint(-12, 8))
+            if (facility.pk, start) in taken:
+                continue
+            taken.add((facility.pk, start))
+            reservations.append(ReservationFactory.build(
+                facility=facility, user=self.rng.choice(self.owners),
+                start_datetime=start, end_datetime=start + timedelta(hours=1)
+            ))
+        Reservation.objects.bulk_create(reservations, batch_size=2000)
+
+    def seed_leaves(self, options):
+        if not self.employees:
+            return []
+        leaves = []
+        for _ in range(options['leaves']):
+            start = self.today + timedelta(days=self.rng.randint(-options['shift_days'], 30))
+            leaves.append(LeaveRequestFactory.build(
+                employee=self.rng.choice(self.employees), start_date=start,
+                end_date=start + timedelta(days=self.rng.randint(1, 5)),
+                reviewed_by=self.admin
+            ))
+        return LeaveRequest.objects.bulk_create(leaves, batch_size=2000)
+
+    def seed_shifts(self, options, leaves):
+        if not self.towers:
+            return
+        on_leave = {
+            (leave.employee_id, leave.start_date + timedelta(days=d))
+            for leave in leaves if leave.status == 'aprobada'
+            for d in range((leave.end_date - leave.start_date).days + 1)
+        }
+        tz = timezone.get_current_timezone()
+        shifts = []
+        for employee in self.employees:
+            tower = self.rng.choice(self.towers)
+            hour = self.rng.choice(SHIFT_START_HOURS)
+            for offset in range(options['shift_days']):
+                day = self.today - timedelta(days=offset)
+                if day.weekday() >= 5 or (employee.pk, day) in on_leave:
+                    continue
+                start = timezone.make_aware(datetime.combine(day, time(hour)), tz)
+                shifts.append(ShiftAssignmentFactory.build(
+                    employee=employee, tower=tower, start_datetime=start,
+                    end_datetime=start + timedelta(hours=8)
+                ))
+        ShiftAssignment.objects.bulk_create(shifts, batch_size=2000)
@@ -0,0 +1,39 @@
+"""
+Comando para enviar los correos encolados en el outbox.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.outbox import drain_outbox
+
+
+class Command(BaseCommand):
+    """
+    Envía los correos pendientes en lotes por una única conexión SMTP.
+    Con --loop queda corriendo como worker y consulta el outbox cada --interval segundos.
+    """
+    help = 'Envía los correos pendientes del outbox.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help='Correos por lote (por defecto OUTBOX["BATCH_SIZE"]).')
+        parser.add_argument('--max-attempts', type=int, default=None,
+                            help='Intentos antes de marcar un correo como fallido.')
+        parser.add_argument('--loop', action='store_true',
+                            help='Seguir corriendo como worker.')
+        parser.add_argument('--interval', type=float, default=5.0,
+                            help='Segundos de espera cuando el outbox está vacío.')
+
+    def handle(self, *args, **options):
+        total_sent = total_failed = 0
+        while True:
+            sent, failed = drain_outbox(options['batch_size'], options['max_attempts'])
+            total_sent += sent
+            total_failed += failed
+            if sent or failed:
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+        self.stdout.write(f'Enviados: {total_sent}, fallidos: {total_failed}')
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.3 on 2026-10-18 16:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_outboxemail'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='leaverequest',
+            index=models.Index(fields=['employee', 'status', 'created_at'], name='leave_employee_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['facility', 'start_datetime', 'end_datetime'], name='reservation_facility_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='shiftassignment',
+            index=models.Index(fields=['employee', 'start_datetime', 'end_datetime'], name='shift_employee_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='shiftassignment',
+            index=models.Index(fields=['start_datetime', 'end_datetime'], name='shift_time_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.3 on 2026-10-18 17:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_composite_time_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['start_datetime', 'end_datetime'], name='reservation_time_idx'),
+        ),
+    ]
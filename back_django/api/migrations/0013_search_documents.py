@@ -0,0 +1,99 @@
+# Generated by Django 5.1.3 on 2026-10-18 17:32
+
+import re
+import unicodedata
+
+from django.db import migrations, models
+
+SQLITE_INDEX = [
+    """CREATE VIRTUAL TABLE api_searchdocument_fts USING fts5(
+        body, content='api_searchdocument', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2')""",
+    """CREATE TRIGGER api_searchdocument_ai AFTER INSERT ON api_searchdocument BEGIN
+        INSERT INTO api_searchdocument_fts(rowid, body) VALUES (new.id, new.body);
+    END""",
+    """CREATE TRIGGER api_searchdocument_ad AFTER DELETE ON api_searchdocument BEGIN
+        INSERT INTO api_searchdocument_fts(api_searchdocument_fts, rowid, body)
+        VALUES ('delete', old.id, old.body);
+    END""",
+    """CREATE TRIGGER api_searchdocument_au AFTER UPDATE ON api_searchdocument BEGIN
+        INSERT INTO api_searchdocument_fts(api_searchdocument_fts, rowid, body)
+        VALUES ('delete', old.id, old.body);
+        INSERT INTO api_searchdocument_fts(rowid, body) VALUES (new.id, new.body);
+    END""",
+]
+
+SQLITE_DROP = [
+    'DROP TRIGGER IF EXISTS api_searchdocument_au',
+    'DROP TRIGGER IF EXISTS api_searchdocument_ad',
+    'DROP TRIGGER IF EXISTS api_searchdocument_ai',
+    'DROP TABLE IF EXISTS api_searchdocument_fts',
+]
+
+POSTGRES_INDEX = [
+    "CREATE INDEX api_searchdocument_tsv ON api_searchdocument "
+    "USING gin (to_tsvector('simple', body))",
+]
+
+POSTGRES_DROP = ['DROP INDEX IF EXISTS api_searchdocument_tsv']
+
+# Texto indexado por tipo de documento (copia de api.search.SEARCH_SOURCES)
+SOURCES = {
+    'user': ('CustomUser', ('first_name', 'last_name', 'email')),
+    'facility': ('Facility', ('name',)),
+    'leave': ('LeaveRequest', ('reason',)),
+}
+
+
+def normalize(text):
+    text = unicodedata.normalize('NFKD', str(text or ''))
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return ' '.join(re.findall(r'\w+', text.lower()))
+
+
+def run(schema_editor, statements):
+    for statement in statements.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(statement)
+
+
+def create_index(apps, schema_editor):
+    run(schema_editor, {'sqlite': SQLITE_INDEX, 'postgresql': POSTGRES_INDEX})
+
+
+def drop_index(apps, schema_editor):
+    run(schema_editor, {'sqlite': SQLITE_DROP, 'postgresql': POSTGRES_DROP})
+
+
+def populate(apps, schema_editor):
+    SearchDocument = apps.get_model('api', 'SearchDocument')
+    for kind, (model_name, fields) in SOURCES.items():
+        model = apps.get_model('api', model_name)
+        SearchDocument.objects.bulk_create([
+            SearchDocument(kind=kind, object_id=row[0], body=normalize(' '.join(
+                str(value or '') for value in row[1:])))
+            for row in model.objects.values_list('pk', *fields).iterator()
+        ], batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_tombstones'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=20)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('body', models.TextField()),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('kind', 'object_id'), name='search_document_unique')],
+            },
+        ),
+        migrations.RunPython(create_index, drop_index),
+        migrations.RunPython(populate, migrations.RunPython.noop),
+    ]
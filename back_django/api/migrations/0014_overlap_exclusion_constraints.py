@@ -0,0 +1,84 @@
+# Generated by Django 5.1.3 on 2026-10-18 19:05
+
+from django.db import migrations, models
+from django.db.models import Exists, OuterRef
+
+import api.constraints
+
+try:
+    from django.contrib.postgres.operations import BtreeGistExtension
+except ImportError:
+    # sin psycopg la base no puede ser PostgreSQL y la extensión sobra
+    BtreeGistExtension = None
+
+# Las restricciones solo existen en PostgreSQL; en SQLite los modelos
+# siguen verificando el solape con una consulta (ver api.constraints).
+
+REPORT_LIMIT = 20
+
+
+def overlapping_ids(queryset, owner):
+    """Ids de las filas que se cruzan con otra anterior del mismo ``owner``."""
+    earlier = queryset.filter(**{owner: OuterRef(owner)}, pk__lt=OuterRef('pk'),
+                              start_datetime__lt=OuterRef('end_datetime'),
+                              end_datetime__gt=OuterRef('start_datetime'))
+    return list(queryset.filter(Exists(earlier)).order_by('pk')
+                .values_list('pk', flat=True)[:REPORT_LIMIT])
+
+
+def check_existing_overlaps(apps, schema_editor):
+    """
+    La verificación previa en Python podía perder carreras, así que la base
+    puede tener ya solapes que harían fallar la restricción con un 23P01
+    sin detalle. Si los hay, se detiene la migración con los ids a revisar.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Reservation = apps.get_model('api', 'Reservation')
+    ShiftAssignment = apps.get_model('api', 'ShiftAssignment')
+    using = schema_editor.connection.alias
+    problems = []
+    reservations = overlapping_ids(
+        Reservation.objects.using(using).exclude(status='rechazada'), 'facility'
+    )
+    if reservations:
+        problems.append(f'reservas vigentes que se cruzan con otra de la misma instalación '
+                        f'(rechazar o mover): {reservations}')
+    shifts = overlapping_ids(ShiftAssignment.objects.using(using), 'employee')
+    if shifts:
+        problems.append(f'turnos que se cruzan con otro del mismo empleado '
+                        f'(reasignar o borrar): {shifts}')
+    if problems:
+        raise RuntimeError(
+            'No se pueden crear las restricciones de solape; corrija antes: '
+            + '; '.join(problems)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_search_documents'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_existing_overlaps, migrations.RunPython.noop),
+        *([BtreeGistExtension()] if BtreeGistExtension is not None else []),
+        migrations.AddConstraint(
+            model_name='reservation',
+            constraint=api.constraints.OverlapConstraint(
+                condition=models.Q(('status', 'rechazada'), _negated=True),
+                expressions=[(models.F('facility'), '='),
+                             (api.constraints.TsTzRange('start_datetime', 'end_datetime'), '&&')],
+                name='reservation_no_overlap',
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name='shiftassignment',
+            constraint=api.constraints.OverlapConstraint(
+                expressions=[(models.F('employee'), '='),
+                             (api.constraints.TsTzRange('start_datetime', 'end_datetime'), '&&')],
+                name='shift_no_overlap',
+            ),
+        ),
+    ]
@@ -1,11 +1,16 @@
 """Modulo de modelos para la aplicación de usuarios de Django."""
+import secrets
+from functools import reduce
+from operator import or_
 from django.contrib.auth.models import AbstractUser
 from django.utils.translation import gettext_lazy as _
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
 from django.core.exceptions import ValidationError
-from django.core.mail import send_mail
 from django.utils import timezone
+from .constraints import (RESERVATION_OVERLAP, SHIFT_OVERLAP, OverlapConstraint, TsTzRange,
+                          overlap_guard, overlaps_enforced)
+from .intervals import IntervalIndex, local_day_bounds
 
 # Create your models here.
 User = settings.AUTH_USER_MODEL
@@ -17,6 +22,7 @@ class Tower(models.Model):
     """
     name = models.CharField(max_length=100)
     num_floors = models.PositiveIntegerField()
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return str(self.name)
@@ -34,6 +40,7 @@ class Apartment(models.Model):
     bathrooms = models.PositiveIntegerField()
     rent_price = models.DecimalField(max_digits=10, decimal_places=2)
     parking_slots = models.IntegerField()
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"Apt {self.number} - {self.tower.name}"
@@ -45,10 +52,27 @@ class Facility(models.Model):
     """
     name = models.CharField(max_length=100)
     is_reserved = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return str(self.name)
 
+    def lock(self):
+        """
+        Bloquea la fila de la instalación hasta el final de la transacción
+        en curso, para serializar las reservas concurrentes. SQLite no
+        bloquea filas: con BEGIN diferido la transacción empieza leyendo y
+        dos que leen y luego escriben chocan al subir a escritura, así que
+        se toma el bloqueo de escritura de la base antes de leer con una
+        escritura que no cambia nada. Con BEGIN IMMEDIATE ya se tiene.
+        """
+        connection = transaction.get_connection()
+        if connection.features.has_select_for_update:
+            list(Facility.objects.select_for_update()
+                 .filter(pk=self.pk).values_list('pk'))
+        elif connection.settings_dict['OPTIONS'].get('transaction_mode') != 'IMMEDIATE':
+            Facility.objects.filter(pk=self.pk).update(name=models.F('name'))
+
 class ParkingSpot(models.Model):
     """
     Modelo para representar un parqueadero en el edificio.
@@ -58,11 +82,82 @@ class ParkingSpot(models.Model):
                 Apartment, related_name='parkings', on_delete=models.SET_NULL, null=True, blank=True
                 )
     identifier = models.CharField(max_length=20)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         label = f"Parking {self.identifier}"
         return f"{label} - Apto {self.apartment.number}" if self.apartment else label
 
+class ShiftAssignmentQuerySet(models.QuerySet):
+    """
+    Consultas reutilizables sobre turnos.
+    """
+    def overlapping(self, start, end):
+        """Turnos que se cruzan con el rango semiabierto [start, end)."""
+        return self.filter(start_datetime__lt=end, end_datetime__gt=start)
+
+    def availability(self, employee_ids, window_start, window_end):
+        """
+        Turnos y permisos aprobados de los empleados que se cruzan con
+        [window_start, window_end), con una consulta cada uno.
+        Devuelve (turnos {id: IntervalIndex}, permisos {id: IntervalIndex}).
+        """
+        busy, leaves = {}, {}
+        for employee_id, start, end in (
+            self.filter(employee__in=employee_ids)
+            .overlapping(window_start, window_end)
+            .values_list('employee_id', 'start_datetime', 'end_datetime')
+        ):
+            busy.setdefault(employee_id, []).append((start, end))
+        for employee_id, first_day, last_day in (
+            LeaveRequest.objects.filter(
+                employee__in=employee_ids, status='aprobada',
+                start_date__lte=timezone.localdate(window_end),
+                end_date__gte=timezone.localdate(window_start)
+            ).values_list('employee_id', 'start_date', 'end_date')
+        ):
+            leaves.setdefault(employee_id, []).append(local_day_bounds(first_day, last_day))
+        return (
+            {pk: IntervalIndex(intervals) for pk, intervals in busy.items()},
+            {pk: IntervalIndex(intervals) for pk, intervals in leaves.items()},
+        )
+
+    def assign_many(self, shifts):
+        """
+        Crea varios turnos (instancias sin guardar) en una sola transacción.
+        Los turnos existentes y los permisos aprobados de los empleados del
+        lote se cargan con una consulta cada uno y se indexan por empleado;
+        cada turno se compara en memoria contra ellos y contra los ya
+        aceptados del lote. Devuelve una lista de (turno, conflicto), donde
+        conflicto es None, 'turno' o 'permiso'. Si la restricción de
+        exclusión rechaza un solape creado entretanto por otra transacción,
+        lanza ``ValidationError(SHIFT_OVERLAP)`` y no crea ninguno.
+        """
+        if not shifts:
+            return []
+        employee_ids = {shift.employee_id for shift in shifts}
+        window_start = min(shift.start_datetime for shift in shifts)
+        window_end = max(shift.end_datetime for shift in shifts)
+        with transaction.atomic():
+            busy, leaves = self.availability(employee_ids, window_start, window_end)
+            results = []
+            for shift in shifts:
+                start, end = shift.start_datetime, shift.end_datetime
+                employee_busy = busy.setdefault(shift.employee_id, IntervalIndex())
+                employee_leaves = leaves.get(shift.employee_id)
+                if employee_leaves is not None and employee_leaves.overlaps(start, end):
+                    results.append((shift, 'permiso'))
+                elif employee_busy.overlaps(start, end):
+                    results.append((shift, 'turno'))
+                else:
+                    employee_busy.add(start, end)
+                    results.append((shift, None))
+            # otra transacción pudo asignar un turno desde la consulta de arriba
+            with overlap_guard(SHIFT_OVERLAP, self.db):
+                self.bulk_create([shift for shift, conflict in results if conflict is None],
+                                 batch_size=1000)
+        return results
+
 class ShiftAssignment(models.Model):
     """
     Modelo para asignar turnos a empleados de aseo y seguridad.
@@ -95,27 +190,81 @@ class ShiftAssignment(models.Model):
         blank=True
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = ShiftAssignmentQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # solapes por empleado (clean) y turnos de un empleado en un rango
+            models.Index(fields=['employee', 'start_datetime', 'end_datetime'],
+                         name='shift_employee_time_idx'),
+            # listados por rango de fechas sin filtrar por empleado
+            models.Index(fields=['start_datetime', 'end_datetime'], name='shift_time_idx'),
+        ]
+        constraints = [
+            # un empleado no puede tener dos turnos que se crucen (PostgreSQL)
+            OverlapConstraint(
+                name='shift_no_overlap',
+                expressions=[(models.F('employee'), '='),
+                             (TsTzRange('start_datetime', 'end_datetime'), '&&')],
+            ),
+        ]
 
     def clean(self):
         if self.area not in dict(self.AREA_CHOICES):
             raise ValidationError("Área no válida.")
-        overlapping_shifts = ShiftAssignment.objects.filter(
-            employee=self.employee,
-            start_datetime__lt=self.end_datetime,
-            end_datetime__gt=self.start_datetime
-        ).exclude(id=self.id)
-        if overlapping_shifts.exists():
-            raise ValidationError("El empleado ya tiene un turno asignado en este horario.")
+        # en PostgreSQL el solape lo rechaza la restricción shift_no_overlap al guardar
+        if not overlaps_enforced():
+            overlapping_shifts = ShiftAssignment.objects.filter(
+                employee=self.employee,
+                start_datetime__lt=self.end_datetime,
+                end_datetime__gt=self.start_datetime
+            ).exclude(id=self.id)
+            if overlapping_shifts.exists():
+                raise ValidationError(SHIFT_OVERLAP)
         if self.start_datetime >= self.end_datetime:
             raise ValidationError('La fecha de inicio debe ser anterior a la fecha de fin.')
         # ubicación exclusiva
         if bool(self.tower) == bool(self.facility):
             raise ValidationError('Especifique torre o instalación, no ambos ni ninguno.')
 
+    def save(self, *args, **kwargs):
+        with overlap_guard(SHIFT_OVERLAP, kwargs.get('using')):
+            super().save(*args, **kwargs)
+
     def __str__(self):
         loc = self.tower or self.facility
         return f"{self.employee} ({self.area}) {self.start_datetime} - {self.end_datetime} @ {loc}"
 
+class LeaveRequestQuerySet(models.QuerySet):
+    """
+    Consultas reutilizables sobre solicitudes de permiso.
+    """
+    def review_many(self, decision, reviewer):
+        """
+        Aprueba o rechaza en bloque las solicitudes pendientes del queryset.
+        Aplica el cambio de estado con un único UPDATE, borra con un único
+        DELETE los turnos cubiertos por las aprobadas y encola las
+        notificaciones en el outbox dentro de la misma transacción.
+        Devuelve la lista de solicitudes revisadas.
+        """
+        leaves = list(self.filter(status='pendiente').select_related('employee'))
+        if not leaves:
+            return []
+        now = timezone.now()
+        with transaction.atomic():
+            LeaveRequest.objects.filter(pk__in=[leave.pk for leave in leaves]).update(
+                status=decision, reviewed_by=reviewer, reviewed_at=now, updated_at=now
+            )
+            if decision == 'aprobada':
+                covered = reduce(or_, (leave.covered_shifts_q() for leave in leaves))
+                ShiftAssignment.objects.filter(covered).delete()
+            for leave in leaves:
+                leave.status, leave.reviewed_by, leave.reviewed_at = decision, reviewer, now
+            OutboxEmail.objects.queue([leave.notification() for leave in leaves])
+        return leaves
+
 class LeaveRequest(models.Model):
     """
     Modelo para solicitudes de permisos y incapacidades.
@@ -157,32 +306,97 @@ class LeaveRequest(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True)
     reviewed_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = LeaveRequestQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['employee', 'status', 'created_at'],
+                         name='leave_employee_status_idx'),
+        ]
 
     def clean(self):
         if self.start_date >= self.end_date:
             raise ValidationError('Fecha inicio posterior a fecha fin.')
 
-    def approve(self, reviewer):
+    def covered_shifts_q(self):
         """
-        Aprueba la solicitud de permiso.
+        Filtro de los turnos del empleado que quedan dentro del permiso.
+        """
+        start, end = local_day_bounds(self.start_date, self.end_date)
+        return models.Q(
+            employee=self.employee_id,
+            start_datetime__gte=start,
+            end_datetime__lt=end
+        )
+
+    def notification(self):
+        """
+        Correo para el empleado según el estado de la solicitud,
+        como tupla (asunto, mensaje, remitente, destinatarios).
+        """
+        if self.status == 'aprobada':
+            subject = "Solicitud de permiso aprobada"
+            message = f"Tu solicitud fue aprobada desde {self.start_date} a {self.end_date}."
+        else:
+            subject = "Solicitud de permiso rechazada"
+            message = f"Tu solicitud fue rechazada. Motivo: {self.reason}."
+        return (subject, message, settings.DEFAULT_FROM_EMAIL, [self.employee.email])
+
+    def approve(self, reviewer, replacements=None):
+        """
+        Aprueba la solicitud de permiso. Los turnos cubiertos por el permiso
+        se reasignan según ``replacements`` ({id de turno: id de empleado})
+        y los demás se borran. Lanza ``ValidationError(SHIFT_OVERLAP)`` si un
+        reemplazo ya tiene un turno o un permiso aprobado en ese horario: en
+        PostgreSQL lo detecta la restricción de exclusión; en otros motores
+        se verifica dentro de la transacción antes de reasignar.
         """
         self.status = 'aprobada'
         self.reviewed_by = reviewer
         self.reviewed_at = timezone.now()
-        self.save()
-
-        ShiftAssignment.objects.filter(
-            employee=self.employee,
-            start_datetime__date__gte=self.start_date,
-            end_datetime__date__lte=self.end_date
-        ).delete()
-
-        send_mail(
-            subject="Solicitud de permiso aprobada",
-            message=f"Tu solicitud fue aprobada desde {self.start_date} a {self.end_date}.",
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[self.employee.email]
+        replacements = replacements or {}
+        with transaction.atomic():
+            self.save()
+            covered = ShiftAssignment.objects.filter(self.covered_shifts_q())
+            by_employee = {}
+            for shift_id, employee_id in replacements.items():
+                by_employee.setdefault(employee_id, []).append(shift_id)
+            if replacements:
+                moved = list(covered.filter(pk__in=replacements)
+                             .values_list('pk', 'start_datetime', 'end_datetime'))
+                if not overlaps_enforced() and moved:
+                    self._check_replacements(moved, replacements)
+                # los turnos reasignados desaparecen de la vista del empleado
+                Tombstone.objects.record(ShiftAssignment, [
+                    (pk, self.employee_id) for pk, _, _ in moved
+                ], self.reviewed_at)
+            with overlap_guard(SHIFT_OVERLAP):
+                for employee_id, shift_ids in by_employee.items():
+                    covered.filter(pk__in=shift_ids).update(employee_id=employee_id,
+                                                            updated_at=self.reviewed_at)
+            covered.exclude(pk__in=replacements).delete()
+            OutboxEmail.objects.queue([self.notification()])
+
+    def _check_replacements(self, moved, replacements):
+        """
+        Verifica que cada reemplazo esté libre en el horario del turno
+        [(id, inicio, fin)] que recibe, contra sus turnos y permisos
+        aprobados y los demás turnos que recibe en la misma aprobación.
+        """
+        busy, leaves = ShiftAssignment.objects.availability(
+            set(replacements.values()),
+            min(start for _, start, _ in moved), max(end for _, _, end in moved)
         )
+        for pk, start, end in moved:
+            employee_id = replacements[pk]
+            employee_busy = busy.setdefault(employee_id, IntervalIndex())
+            employee_leaves = leaves.get(employee_id)
+            if employee_busy.overlaps(start, end) or (
+                    employee_leaves is not None and employee_leaves.overlaps(start, end)):
+                raise ValidationError(SHIFT_OVERLAP)
+            employee_busy.add(start, end)
 
     def reject(self, reviewer):
         """
@@ -190,18 +404,70 @@ class LeaveRequest(models.Model):
         """
         self.status = 'rechazada'
         self.reviewed_by = reviewer
-        self.save()
-
-        send_mail(
-            subject="Solicitud de permiso rechazada",
-            message=f"Tu solicitud fue rechazada. Motivo: {self.reason}.",
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[self.employee.email]
-        )
+        with transaction.atomic():
+            self.save()
+            OutboxEmail.objects.queue([self.notification()])
 
     def __str__(self):
         return f"{self.employee.email} - {self.type} ({self.status})"
 
+class ReservationQuerySet(models.QuerySet):
+    """
+    Consultas reutilizables sobre reservas.
+    """
+    def blocking(self):
+        """Reservas que ocupan la instalación (las rechazadas liberan el horario)."""
+        return self.exclude(status='rechazada')
+
+    def overlapping(self, start, end):
+        """Reservas que se cruzan con el rango semiabierto [start, end)."""
+        return self.filter(start_datetime__lt=end, end_datetime__gt=start)
+
+    def review_many(self, decision):
+        """
+        Aprueba o rechaza en bloque las reservas pendientes del queryset con
+        un único UPDATE. Devuelve la lista de reservas revisadas.
+        """
+        reservations = list(self.filter(status='pendiente').select_related('facility', 'user'))
+        if reservations:
+            # update() no toca auto_now: se fija updated_at explícitamente
+            Reservation.objects.filter(pk__in=[r.pk for r in reservations]).update(
+                status=decision, updated_at=timezone.now()
+            )
+        for reservation in reservations:
+            reservation.status = decision
+        return reservations
+
+    def book_many(self, facility, user, occurrences):
+        """
+        Crea varias reservas de una instalación en una sola transacción.
+        Las reservas existentes se cargan con una consulta y cada ocurrencia
+        se compara en memoria contra ellas y contra las ya aceptadas del lote.
+        Devuelve una lista de (inicio, fin, reserva o None si hay conflicto).
+        """
+        if not occurrences:
+            return []
+        window_start = min(start for start, _ in occurrences)
+        window_end = max(end for _, end in occurrences)
+        with transaction.atomic():
+            facility.lock()
+            busy = IntervalIndex(
+                self.blocking().overlapping(window_start, window_end)
+                .filter(facility=facility)
+                .values_list('start_datetime', 'end_datetime')
+            )
+            results = []
+            for start, end in occurrences:
+                if busy.overlaps(start, end):
+                    results.append((start, end, None))
+                    continue
+                busy.add(start, end)
+                results.append((start, end, self.model(
+                    facility=facility, user=user, start_datetime=start, end_datetime=end
+                )))
+            self.bulk_create([r for _, _, r in results if r is not None])
+        return results
+
 class Reservation(models.Model):
     """
     Modelo para reservas de instalaciones.
@@ -230,17 +496,75 @@ class Reservation(models.Model):
         default='pendiente'
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = ReservationQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['facility', 'start_datetime', 'end_datetime'],
+                         name='reservation_facility_time_idx'),
+            # calendario de reservas de todas las instalaciones
+            models.Index(fields=['start_datetime', 'end_datetime'], name='reservation_time_idx'),
+        ]
+        constraints = [
+            # las reservas vigentes de una instalación no se cruzan (PostgreSQL)
+            OverlapConstraint(
+                name='reservation_no_overlap',
+                expressions=[(models.F('facility'), '='),
+                             (TsTzRange('start_datetime', 'end_datetime'), '&&')],
+                condition=~models.Q(status='rechazada'),
+            ),
+        ]
 
     def clean(self):
+        self.clean_range()
+        self.check_overlap()
+
+    def clean_range(self):
+        """
+        Valida que el rango horario sea coherente (no consulta la base de datos).
+        """
         if self.start_datetime >= self.end_datetime:
             raise ValidationError("La fecha de inicio debe ser anterior a la fecha de fin.")
-        overlapping = Reservation.objects.filter(
-            facility=self.facility,
-            start_datetime__lt=self.end_datetime,
-            end_datetime__gt=self.start_datetime
-        ).exclude(id=self.id)
+
+    def check_overlap(self):
+        """
+        Lanza ValidationError si otra reserva vigente ocupa el mismo rango.
+        En PostgreSQL no consulta: la restricción reservation_no_overlap
+        rechaza el solape al guardar.
+        """
+        if overlaps_enforced():
+            return
+        overlapping = Reservation.objects.blocking().overlapping(
+            self.start_datetime, self.end_datetime
+        ).filter(facility=self.facility).exclude(id=self.id)
         if overlapping.exists():
-            raise ValidationError("Ya existe una reserva para este rango horario.")
+            raise ValidationError(RESERVATION_OVERLAP)
+
+    def save(self, *args, **kwargs):
+        with overlap_guard(RESERVATION_OVERLAP, kwargs.get('using')):
+            super().save(*args, **kwargs)
+
+    def book(self):
+        """
+        Guarda la reserva verificando solapes de forma atómica.
+        En PostgreSQL basta con guardar: la restricción de exclusión rechaza
+        el solape aunque dos reservas lleguen a la vez. En SQLite el
+        INSERT/UPDATE toma el bloqueo de escritura antes de la verificación.
+        Si hay solape se revierte todo.
+        """
+        adding = self._state.adding
+        try:
+            with transaction.atomic():
+                self.save()
+                self.check_overlap()
+        except ValidationError:
+            if adding:
+                self.pk = None
+                self._state.adding = True
+            raise
+        return self
 
     def __str__(self):
         return f"Reserva {self.facility.name} por {self.user.get_full_name()} ({self.status})"
@@ -314,6 +638,7 @@ class CustomUser(AbstractUser):
     is_active = models.BooleanField(_('Active user'),
                                     default=False,
                                     help_text=_('Designa si este usuario puede autenticarse.'))
+    updated_at = models.DateTimeField(auto_now=True)
 
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username', 'first_name', 'last_name', 'telefono', 'role']
@@ -328,17 +653,18 @@ class CustomUser(AbstractUser):
         """
         self.registration_status = CustomUser.APROBADO
         self.is_active = True
-        self.save(update_fields=['registration_status', 'is_active'])
-        # Enviar correo de bienvenida
-        send_mail(
-            subject=_('Bienvenido a Domus'),
-            message=_(
-                '¡Hola %(name)s!\n\n'
-                'Tu solicitud de registro ha sido aprobada y ya puedes iniciar sesión en Domus.'
-                ) % {'name': self.get_full_name()},
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[self.email]
-        )
+        with transaction.atomic():
+            self.save(update_fields=['registration_status', 'is_active', 'updated_at'])
+            # Encolar correo de bienvenida
+            OutboxEmail.objects.queue([(
+                _('Bienvenido a Domus'),
+                _(
+                    '¡Hola %(name)s!\n\n'
+                    'Tu solicitud de registro ha sido aprobada y ya puedes iniciar sesión en Domus.'
+                    ) % {'name': self.get_full_name()},
+                settings.DEFAULT_FROM_EMAIL,
+                [self.email]
+            )])
 
     def reject(self):
         """
@@ -346,15 +672,235 @@ class CustomUser(AbstractUser):
         """
         self.registration_status = CustomUser.RECHAZADO
         # mantenemos is_active=False
-        self.save(update_fields=['registration_status'])
-        # Enviar correo de rechazo
-        send_mail(
-            subject=_('Lo sentimos'),
-            message=_(
-                'Hola %(name)s,\n\n'
-                'Tu solicitud de registro ha sido rechazada. Si crees que esto es un error, '
-                'por favor contacta al administrador.'
-                ) % {'name': self.get_full_name()},
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[self.email]
-        )
+        with transaction.atomic():
+            self.save(update_fields=['registration_status', 'updated_at'])
+            # Encolar correo de rechazo
+            OutboxEmail.objects.queue([(
+                _('Lo sentimos'),
+                _(
+                    'Hola %(name)s,\n\n'
+                    'Tu solicitud de registro ha sido rechazada. Si crees que esto es un error, '
+                    'por favor contacta al administrador.'
+                    ) % {'name': self.get_full_name()},
+                settings.DEFAULT_FROM_EMAIL,
+                [self.email]
+            )])
+
+class OutboxEmailQuerySet(models.QuerySet):
+    """
+    Consultas reutilizables sobre el outbox de correos.
+    """
+    def queue(self, datatuple):
+        """
+        Encola correos con un único INSERT. Recibe tuplas
+        (asunto, mensaje, remitente, destinatarios) como ``send_mass_mail``
+        y omite las que no tienen destinatarios.
+        """
+        return self.bulk_create([
+            self.model(
+                subject=str(subject),
+                body=str(message),
+                from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+                recipients=list(recipients),
+            )
+            for subject, message, from_email, recipients in datatuple
+            if recipients
+        ])
+
+class OutboxEmail(models.Model):
+    """
+    Correo saliente pendiente de envío (patrón outbox transaccional).
+    Se escribe en la misma transacción que el cambio que lo origina y lo
+    envía en lotes el comando ``send_outbox``.
+    """
+    PENDIENTE = 'pendiente'
+    ENVIADO = 'enviado'
+    FALLIDO = 'fallido'
+    STATUS_CHOICES = (
+        (PENDIENTE, 'Pendiente'),
+        (ENVIADO, 'Enviado'),
+        (FALLIDO, 'Fallido'),
+    )
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=255)
+    recipients = models.JSONField(default=list)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=PENDIENTE)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    objects = OutboxEmailQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.recipients)} ({self.status})"
+
+class CalendarFeed(models.Model):
+    """
+    Token secreto de los feeds iCalendar (.ics) de un usuario.
+    Las apps de calendario no envían cabeceras de autenticación, así que el
+    token va en la URL; rotarlo invalida las URLs anteriores.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='calendar_feed')
+    token = models.CharField(max_length=64, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Feed de {self.user}"
+
+    def save(self, *args, **kwargs):
+        if not self.token:
+            self.token = secrets.token_urlsafe(32)
+        super().save(*args, **kwargs)
+
+    def rotate(self):
+        """Genera un token nuevo."""
+        self.token = secrets.token_urlsafe(32)
+        self.save(update_fields=['token'])
+
+class TombstoneQuerySet(models.QuerySet):
+    """
+    Consultas sobre las lápidas de la sincronización incremental.
+    """
+    def record(self, model, rows, deleted_at=None):
+        """
+        Registra con un único INSERT que las filas ``rows`` ([(id, id del
+        dueño o None), ...]) de ``model`` ya no son visibles para su dueño.
+        """
+        deleted_at = deleted_at or timezone.now()
+        return self.bulk_create([
+            self.model(model=model._meta.label_lower, object_id=pk, owner_id=owner_id,
+                       deleted_at=deleted_at)
+            for pk, owner_id in rows
+        ])
+
+    def prune(self, before):
+        """Borra las lápidas anteriores a ``before``. Devuelve cuántas borró."""
+        return self.filter(deleted_at__lt=before).delete()[0]
+
+class Tombstone(models.Model):
+    """
+    Marca de una fila borrada (o reasignada a otro dueño) para que los
+    clientes de ``/api/sync/`` la quiten de su copia local.
+    ``owner_id`` es el usuario que veía la fila (None si era pública); no es
+    FK para que sobreviva al borrado en cascada del propio usuario.
+    """
+    model = models.CharField(max_length=50)
+    object_id = models.PositiveBigIntegerField()
+    owner_id = models.PositiveBigIntegerField(null=True, blank=True)
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    objects = TombstoneQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['deleted_at'], name='tombstone_deleted_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.model}#{self.object_id} ({self.deleted_at})"
+
+class SearchDocument(models.Model):
+    """
+    Texto normalizado de una fila para la búsqueda de texto completo
+    (ver ``api/search.py``). En SQLite lo indexa la tabla FTS5
+    ``api_searchdocument_fts``, sincronizada por triggers; en PostgreSQL,
+    un índice GIN sobre ``to_tsvector('simple', body)``.
+    """
+    kind = models.CharField(max_length=20)
+    object_id = models.PositiveBigIntegerField()
+    body = models.TextField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id'], name='search_document_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}#{self.object_id}"
+
+class ArchivedReservation(models.Model):
+    """
+    Reserva ya terminada movida al histórico por ``archive_history``.
+    Conserva el id y los campos de la reserva original; solo se consulta.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    facility = models.ForeignKey(Facility, on_delete=models.CASCADE, related_name='+')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    start_datetime = models.DateTimeField()
+    end_datetime = models.DateTimeField()
+    status = models.CharField(max_length=20, choices=Reservation.STATUS_CHOICES)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'start_datetime'], name='archived_res_user_idx'),
+            models.Index(fields=['start_datetime'], name='archived_res_time_idx'),
+        ]
+
+    def __str__(self):
+        return f"Reserva archivada #{self.pk} ({self.start_datetime:%Y-%m-%d})"
+
+class ArchivedShiftAssignment(models.Model):
+    """
+    Turno ya terminado movido al histórico por ``archive_history``.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    employee = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    area = models.CharField(max_length=20, choices=ShiftAssignment.AREA_CHOICES)
+    start_datetime = models.DateTimeField()
+    end_datetime = models.DateTimeField()
+    tower = models.ForeignKey(Tower, on_delete=models.SET_NULL, null=True, blank=True,
+                              related_name='+')
+    facility = models.ForeignKey(Facility, on_delete=models.SET_NULL, null=True, blank=True,
+                                 related_name='+')
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['employee', 'start_datetime'], name='archived_shift_emp_idx'),
+            models.Index(fields=['start_datetime'], name='archived_shift_time_idx'),
+        ]
+
+    def __str__(self):
+        return f"Turno archivado #{self.pk} ({self.start_datetime:%Y-%m-%d})"
+
+class ArchivedLeaveRequest(models.Model):
+    """
+    Solicitud de permiso ya revisada y terminada, movida al histórico por
+    ``archive_history``. El documento adjunto se conserva en su ruta.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    employee = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    type = models.CharField(max_length=20, choices=LeaveRequest.TYPE_CHOICES)
+    start_date = models.DateField()
+    end_date = models.DateField()
+    reason = models.TextField()
+    document = models.FileField(upload_to='leave_docs/')
+    status = models.CharField(max_length=20, choices=LeaveRequest.STATUS_CHOICES)
+    reviewed_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True,
+                                    related_name='+')
+    created_at = models.DateTimeField()
+    reviewed_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['employee', 'start_date'], name='archived_leave_emp_idx'),
+        ]
+
+    def __str__(self):
+        return f"Permiso archivado #{self.pk} ({self.start_date})"
@@ -0,0 +1,112 @@
+"""
+Envío de los correos encolados en el outbox transaccional.
+Las vistas y modelos encolan con ``OutboxEmail.objects.queue`` dentro de su
+transacción; ``drain_outbox`` los envía en lotes por una única conexión SMTP.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import OutboxEmail
+
+
+def _outbox_setting(name, default):
+    return getattr(settings, 'OUTBOX', {}).get(name, default)
+
+
+def retry_delay(attempts):
+    """Espera antes del siguiente intento: backoff exponencial con tope."""
+    base = _outbox_setting('RETRY_BASE_SECONDS', 60)
+    cap = _outbox_setting('RETRY_MAX_SECONDS', 3600)
+    return timedelta(seconds=min(cap, base * 2 ** (attempts - 1)))
+
+
+def _claim_batch(batch_size):
+    """
+    Toma en una transacción corta los correos pendientes cuyo intento ya
+    venció: les suma el intento y corre ``next_attempt_at`` un plazo
+    (``CLAIM_SECONDS``) para que otro worker no los tome mientras se envían.
+    Si el worker muere a mitad del envío, se reintentan al vencer el plazo.
+    En motores con SELECT ... FOR UPDATE se omiten los que otro worker tiene tomados.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        due = OutboxEmail.objects.filter(
+            status=OutboxEmail.PENDIENTE, next_attempt_at__lte=now
+        ).order_by('next_attempt_at', 'id')
+        if transaction.get_connection().features.has_select_for_update_skip_locked:
+            due = due.select_for_update(skip_locked=True)
+        batch = list(due[:batch_size])
+        if batch:
+            OutboxEmail.objects.filter(pk__in=[email.pk for email in batch]).update(
+                attempts=F('attempts') + 1,
+                next_attempt_at=now + timedelta(seconds=_outbox_setting('CLAIM_SECONDS', 300))
+            )
+    for email in batch:
+        email.attempts += 1
+    return batch
+
+
+def _record_failure(email, exc, max_attempts):
+    email.last_error = str(exc)
+    if email.attempts >= max_attempts:
+        email.status = OutboxEmail.FALLIDO
+    else:
+        email.next_attempt_at = timezone.now() + retry_delay(email.attempts)
+
+
+def drain_outbox(batch_size=None, max_attempts=None, connection=None):
+    """
+    Envía un lote de correos pendientes reutilizando una sola conexión.
+    El envío ocurre fuera de toda transacción: el lote se toma y los
+    resultados se guardan en dos transacciones cortas, así la conversación
+    SMTP no retiene el bloqueo de escritura de la base. Los fallos (también
+    el de abrir la conexión) se reintentan con backoff; tras
+    ``max_attempts`` quedan como fallidos.
+    Devuelve una tupla (enviados, fallidos en este lote).
+    """
+    batch_size = batch_size or _outbox_setting('BATCH_SIZE', 100)
+    max_attempts = max_attempts or _outbox_setting('MAX_ATTEMPTS', 5)
+    sent = failed = 0
+    batch = _claim_batch(batch_size)
+    if not batch:
+        return sent, failed
+    connection = connection or get_connection()
+    try:
+        connection.open()
+    except Exception as exc:  # pylint: disable=broad-except
+        # servidor caído o que rechaza la conexión: falla todo el lote
+        for email in batch:
+            _record_failure(email, exc, max_attempts)
+        failed = len(batch)
+    else:
+        try:
+            for email in batch:
+                try:
+                    EmailMessage(
+                        email.subject, email.body, email.from_email, email.recipients,
+                        connection=connection
+                    ).send()
+                except Exception as exc:  # pylint: disable=broad-except
+                    failed += 1
+                    _record_failure(email, exc, max_attempts)
+                else:
+                    sent += 1
+                    email.status = OutboxEmail.ENVIADO
+                    email.sent_at = timezone.now()
+                    email.last_error = ''
+        finally:
+            try:
+                connection.close()
+            except Exception:  # pylint: disable=broad-except
+                # los correos ya salieron: no perder sus resultados
+                pass
+    with transaction.atomic():
+        OutboxEmail.objects.bulk_update(
+            batch, ['status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at']
+        )
+    return sent, failed
@@ -0,0 +1,142 @@
+"""
+Clases de paginación de la API.
+"""
+import json
+from functools import reduce
+from operator import or_
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination, PageNumberPagination
+
+
+class StandardPagination(PageNumberPagination):
+    """
+    Paginación por número de página con tamaño elegido por el cliente
+    (?page_size=) y un tope del lado del servidor.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Paginación por cursor (keyset) sin COUNT(*) ni OFFSET: el cursor guarda
+    los valores de todos los campos de ``ordering`` de la fila frontera y la
+    página siguiente filtra por la tupla, p. ej. ``start_datetime < x OR
+    (start_datetime = x AND id < k)``. Así los empates en el primer campo
+    (turnos generados en lote) no se saltan con OFFSET y el costo de cada
+    página no depende de qué tan lejos haya avanzado el cliente. Si el
+    orden no termina en la clave primaria se agrega como desempate.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-created_at', '-id')
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if not any(field.lstrip('-') in ('id', 'pk') for field in ordering):
+            ordering += ('-pk' if ordering[0].startswith('-') else 'pk',)
+        return ordering
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor.reverse
+        ordering = self.ordering
+        if reverse:
+            ordering = tuple(f[1:] if f.startswith('-') else f'-{f}' for f in ordering)
+        queryset = queryset.order_by(*ordering)
+        if self.cursor is not None and self.cursor.position is not None:
+            queryset = queryset.filter(self._beyond(ordering, self.cursor.position))
+        # una fila de más indica si hay otra página en ese sentido
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        more = len(results) > self.page_size
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, more
+        else:
+            self.has_next, self.has_previous = more, self.cursor is not None
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    @staticmethod
+    def _beyond(ordering, position):
+        """Filas posteriores a la tupla ``position`` en el orden ``ordering``."""
+        terms, equal = [], {}
+        for field, value in zip(ordering, position):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            terms.append(Q(**equal, **{f'{name}__{lookup}': value}))
+            equal[name] = value
+        return reduce(or_, terms)
+
+    def _position(self, instance):
+        return [str(getattr(instance, field.lstrip('-'))) for field in self.ordering]
+
+    def decode_cursor(self, request):
+        cursor = super().decode_cursor(request)
+        if cursor is None or cursor.position is None:
+            return cursor
+        try:
+            position = json.loads(cursor.position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if (not isinstance(position, list) or len(position) != len(self.ordering)
+                or not all(isinstance(value, str) for value in position)):
+            raise NotFound(self.invalid_cursor_message)
+        return Cursor(offset=0, reverse=cursor.reverse, position=position)
+
+    def _link(self, reverse, position):
+        if position is not None:
+            position = json.dumps(position)
+        return self.encode_cursor(Cursor(offset=0, reverse=reverse, position=position))
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        # página vacía al volver atrás (se borraron filas): desde el principio
+        return self._link(False, self._position(self.page[-1]) if self.page else None)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        return self._link(True, self._position(self.page[0]) if self.page
+                          else self.cursor.position)
+
+
+class OptionalCursorPagination(StandardPagination):
+    """
+    Paginación por número de página por defecto; con ?pagination=cursor
+    (o cuando la petición ya trae ?cursor=) usa KeysetPagination ordenada
+    por ``cursor_ordering`` de la vista. Así los clientes actuales no cambian.
+    """
+    mode_query_param = 'pagination'
+
+    def __init__(self):
+        self.keyset = None
+
+    def use_cursor(self, request):
+        return (request.query_params.get(self.mode_query_param) == 'cursor'
+                or KeysetPagination.cursor_query_param in request.query_params)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.use_cursor(request):
+            self.keyset = None
+            return super().paginate_queryset(queryset, request, view)
+        self.keyset = KeysetPagination()
+        self.keyset.ordering = getattr(view, 'cursor_ordering', KeysetPagination.ordering)
+        self.keyset.page_size = self.page_size
+        return self.keyset.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
@@ -0,0 +1,157 @@
+"""
+Réplicas de lectura. ``ReplicaRouter`` manda las lecturas a una réplica
+solo dentro de ``read_from_replicas()``; todo lo demás (y toda escritura)
+va a la base principal. ``ReplicaMiddleware`` activa las réplicas en las
+peticiones GET/HEAD/OPTIONS y, tras una escritura, fija al cliente a la
+principal durante ``PIN_SECONDS`` para que lea lo que acaba de escribir
+aunque la réplica vaya atrasada.
+"""
+import hashlib
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_use_replicas = ContextVar('domus_use_replicas', default=False)
+
+
+def replication_settings():
+    # se lee en cada llamada para que las pruebas puedan cambiarla
+    return getattr(settings, 'REPLICATION', {})
+
+
+def replica_aliases():
+    return tuple(replication_settings().get('REPLICAS', ()))
+
+
+@contextmanager
+def _reading_from(replicas):
+    token = _use_replicas.set(replicas)
+    try:
+        yield
+    finally:
+        _use_replicas.reset(token)
+
+
+def read_from_replicas():
+    """
+    Las lecturas dentro del bloque van a una réplica (si hay), p. ej. para
+    un reporte desde un comando. Las escrituras siguen en la principal.
+    """
+    return _reading_from(True)
+
+
+def read_from_primary():
+    """
+    Las lecturas dentro del bloque van a la principal aunque la petición
+    sea segura, p. ej. cuando la respuesta no tolera el retraso de la réplica.
+    """
+    return _reading_from(False)
+
+
+class ReplicaRouter:
+    """
+    Router de bases de datos: principal para escrituras y migraciones;
+    réplica al azar para las lecturas marcadas con ``read_from_replicas``.
+    """
+    def db_for_read(self, model, **hints):
+        replicas = replica_aliases()
+        if replicas and _use_replicas.get():
+            return random.choice(replicas)
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        # explícito: si no, Django usaría la base de la que se leyó la instancia
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *replica_aliases()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # las réplicas reciben el esquema por replicación
+        if db in replica_aliases():
+            return False
+        return None
+
+
+def _pin_key(credentials):
+    return 'replica:pin:' + hashlib.sha256(credentials.encode()).hexdigest()
+
+
+def pin_key(request):
+    """
+    Clave del cliente para fijarlo a la principal: su cabecera Authorization
+    o su cookie de sesión (admin). Sin credenciales no se fija.
+    """
+    credentials = (request.META.get('HTTP_AUTHORIZATION')
+                   or request.COOKIES.get(settings.SESSION_COOKIE_NAME))
+    if not credentials:
+        return None
+    return _pin_key(credentials)
+
+
+def issued_pin_keys(response):
+    """
+    Claves de las credenciales que entrega la respuesta de una escritura:
+    el token de ``/api-token-auth/`` o la cookie de sesión de un login. Las
+    peticiones que las usen se fijan también, aunque la escritura no las
+    traía (la réplica puede no tener aún el token o el usuario).
+    """
+    keys = []
+    data = getattr(response, 'data', None)
+    if isinstance(data, dict) and isinstance(data.get('token'), str):
+        keys.append(_pin_key(f"Token {data['token']}"))
+    session = response.cookies.get(settings.SESSION_COOKIE_NAME)
+    if session is not None and session.value:
+        keys.append(_pin_key(session.value))
+    return keys
+
+
+class ReplicaMiddleware:
+    """
+    Lecturas seguras a las réplicas salvo que el cliente haya escrito hace
+    menos de ``PIN_SECONDS``. El pin se guarda en la caché ``CACHE_ALIAS``;
+    con varios workers debe ser una caché compartida.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not replica_aliases():
+            return self.get_response(request)
+        options = replication_settings()
+        cache = caches[options.get('CACHE_ALIAS', 'default')]
+        key = pin_key(request)
+        if request.method not in SAFE_METHODS:
+            response = self.get_response(request)
+            keys = issued_pin_keys(response) + ([key] if key is not None else [])
+            if keys:
+                cache.set_many(dict.fromkeys(keys, True), options.get('PIN_SECONDS', 5))
+            return response
+        if key is not None and cache.get(key):
+            return self.get_response(request)
+        with read_from_replicas():
+            response = self.get_response(request)
+        if response.streaming:
+            # los feeds .ics se consultan mientras se envían
+            response.streaming_content = _from_replicas(response.streaming_content)
+        return response
+
+
+def _from_replicas(content):
+    iterator = iter(content)
+    while True:
+        with read_from_replicas():
+            try:
+                chunk = next(iterator)
+            except StopIteration:
+                return
+        yield chunk
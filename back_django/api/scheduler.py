@@ -0,0 +1,214 @@
+"""
+Motor de programación automática de turnos.
+Asigna empleados elegibles a los bloques de cobertura requeridos,
+equilibrando las horas de cada empleado dentro del horizonte.
+"""
+import heapq
+from collections import namedtuple
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from .intervals import IntervalIndex, local_day_bounds, weekly_blocks
+from .models import ShiftAssignment, LeaveRequest
+
+CustomUser = get_user_model()
+
+# Subrol que puede cubrir cada área de turnos
+AREA_SUBROLES = {
+    'aseo': CustomUser.LIMPIEZA,
+    'seguridad': CustomUser.SEGURIDAD,
+}
+
+# Franja de cobertura requerida: ``required`` empleados del área en [start, end)
+Slot = namedtuple('Slot', 'area tower_id facility_id start end required')
+
+
+def expand_slots(first_day, last_day, blocks):
+    """
+    Expande los bloques de cobertura ({area, tower | facility, weekdays,
+    start, end, required}) sobre el rango de días. Devuelve las franjas
+    ordenadas por inicio.
+    """
+    slots = [
+        Slot(block['area'], getattr(block.get('tower'), 'pk', None),
+             getattr(block.get('facility'), 'pk', None), start, end, block['required'])
+        for block, start, end in weekly_blocks(first_day, last_day, blocks)
+    ]
+    slots.sort(key=lambda slot: slot.start)
+    return slots
+
+
+def schedule(slots, candidates, busy, leaves, hours=None):
+    """
+    Asignación voraz con un montículo por área ordenado por horas asignadas:
+    cada franja toma a los empleados con menos horas que no tengan un turno
+    ni un permiso aprobado que se cruce con ella.
+
+    - ``candidates``: {área: [id de empleado, ...]}
+    - ``busy`` / ``leaves``: {id de empleado: IntervalIndex}; ``busy`` se
+      actualiza con los turnos asignados.
+    - ``hours``: {id de empleado: segundos ya trabajados en el horizonte}.
+
+    Devuelve (asignaciones [(id de empleado, franja)], faltantes [(franja, n)]).
+    """
+    hours = dict(hours or {})
+    heaps = {
+        area: [(hours.get(pk, 0), pk) for pk in employees]
+        for area, employees in candidates.items()
+    }
+    for heap in heaps.values():
+        heapq.heapify(heap)
+    assignments, unfilled = [], []
+    for slot in slots:
+        heap = heaps.get(slot.area, [])
+        duration = (slot.end - slot.start).total_seconds()
+        chosen, skipped = [], []
+        while heap and len(chosen) < slot.required:
+            worked, pk = heapq.heappop(heap)
+            employee_busy = busy.setdefault(pk, IntervalIndex())
+            employee_leaves = leaves.get(pk)
+            if (employee_busy.overlaps(slot.start, slot.end)
+                    or (employee_leaves is not None
+                        and employee_leaves.overlaps(slot.start, slot.end))):
+                skipped.append((worked, pk))
+                continue
+            employee_busy.add(slot.start, slot.end)
+            chosen.append((worked + duration, pk))
+            assignments.append((pk, slot))
+        for item in skipped + chosen:
+            heapq.heappush(heap, item)
+        if len(chosen) < slot.required:
+            unfilled.append((slot, slot.required - len(chosen)))
+    return assignments, unfilled
+
+
+def load_availability(employee_ids, window_start, window_end):
+    """
+    Carga con una consulta cada uno los turnos y los permisos aprobados de
+    los empleados que se cruzan con [window_start, window_end).
+    Devuelve (turnos {id: IntervalIndex}, permisos {id: IntervalIndex},
+    segundos trabajados {id: segundos}).
+    """
+    busy, leaves, hours = {}, {}, {}
+    for pk, start, end in ShiftAssignment.objects.filter(
+        employee__in=employee_ids, start_datetime__lt=window_end, end_datetime__gt=window_start
+    ).values_list('employee_id', 'start_datetime', 'end_datetime'):
+        busy.setdefault(pk, []).append((start, end))
+        hours[pk] = hours.get(pk, 0) + (end - start).total_seconds()
+    for pk, start_date, end_date in LeaveRequest.objects.filter(
+        employee__in=employee_ids, status='aprobada',
+        start_date__lte=timezone.localdate(window_end),
+        end_date__gte=timezone.localdate(window_start)
+    ).values_list('employee_id', 'start_date', 'end_date'):
+        leaves.setdefault(pk, []).append(local_day_bounds(start_date, end_date))
+    return (
+        {pk: IntervalIndex(intervals) for pk, intervals in busy.items()},
+        {pk: IntervalIndex(intervals) for pk, intervals in leaves.items()},
+        hours,
+    )
+
+
+def plan_shifts(first_day, last_day, blocks):
+    """
+    Carga los empleados elegibles, sus turnos y sus permisos aprobados del
+    horizonte (una consulta cada uno) y programa los bloques de cobertura.
+    Devuelve (turnos sin guardar, faltantes [(franja, n)]).
+    """
+    slots = expand_slots(first_day, last_day, blocks)
+    if not slots:
+        return [], []
+    window_start = slots[0].start
+    window_end = max(slot.end for slot in slots)
+    subrole_areas = {subrole: area for area, subrole in AREA_SUBROLES.items()}
+    candidates = {}
+    for pk, subrole in CustomUser.objects.filter(
+        role=CustomUser.EMPLEADO, is_active=True, subrole__in=subrole_areas
+    ).order_by('pk').values_list('pk', 'subrole'):
+        candidates.setdefault(subrole_areas[subrole], []).append(pk)
+    employee_ids = [pk for employees in candidates.values() for pk in employees]
+    busy, leaves, hours = load_availability(employee_ids, window_start, window_end)
+    assignments, unfilled = schedule(slots, candidates, busy, leaves, hours)
+    shifts = [
+        ShiftAssignment(employee_id=pk, area=slot.area, tower_id=slot.tower_id,
+                        facility_id=slot.facility_id,
+                        start_datetime=slot.start, end_datetime=slot.end)
+        for pk, slot in assignments
+    ]
+    return shifts, unfilled
+
+
+def replacement_plan(shifts, employee, limit=5):
+    """
+    Reemplazos para los turnos de un empleado que sale de permiso.
+    Los candidatos son los empleados activos del mismo subrol sin turno ni
+    permiso aprobado que se cruce; se ordenan por horas trabajadas en el
+    horizonte de los turnos. Además se sugiere una asignación consistente
+    (un candidato no cubre dos turnos solapados) con ``schedule``.
+    Devuelve una lista de (turno, [(id, nombre, horas), ...], id sugerido o None).
+    """
+    if not shifts or not employee.subrole:
+        return [(shift, [], None) for shift in shifts]
+    names = {
+        pk: f'{first} {last}'.strip()
+        for pk, first, last in CustomUser.objects.filter(
+            role=CustomUser.EMPLEADO, is_active=True, subrole=employee.subrole
+        ).exclude(pk=employee.pk).order_by('pk').values_list('pk', 'first_name', 'last_name')
+    }
+    candidates = list(names)
+    window_start = min(shift.start_datetime for shift in shifts)
+    window_end = max(shift.end_datetime for shift in shifts)
+    busy, leaves, hours = load_availability(candidates, window_start, window_end)
+
+    def available(pk, shift):
+        return not any(
+            index.get(pk) is not None and index[pk].overlaps(shift.start_datetime,
+                                                              shift.end_datetime)
+            for index in (busy, leaves)
+        )
+
+    ranked = [
+        sorted(((pk, names[pk], hours.get(pk, 0) / 3600)
+                for pk in candidates if available(pk, shift)),
+               key=lambda item: item[2])[:limit]
+        for shift in shifts
+    ]
+    slots = [
+        Slot(shift.area, shift.tower_id, shift.facility_id,
+             shift.start_datetime, shift.end_datetime, 1)
+        for shift in shifts
+    ]
+    order = sorted(range(len(shifts)), key=lambda i: slots[i].start)
+    assignments, _ = schedule(
+        [slots[i] for i in order], {slot.area: candidates for slot in slots},
+        busy, leaves, hours
+    )
+    suggested = {id(slot): pk for pk, slot in assignments}
+    return [
+        (shift, ranked[i], suggested.get(id(slots[i])))
+        for i, shift in enumerate(shifts)
+    ]
+
+
+def shift_notifications(shifts, from_email):
+    """
+    Un correo por empleado con el resumen de sus turnos nuevos,
+    como tuplas (asunto, mensaje, remitente, destinatarios).
+    """
+    by_employee = {}
+    for shift in shifts:
+        by_employee.setdefault(shift.employee_id, []).append(shift)
+    if not by_employee:
+        return []
+    emails = dict(CustomUser.objects.filter(pk__in=by_employee).values_list('pk', 'email'))
+    return [
+        (
+            'Nuevos turnos asignados',
+            f"Se le han asignado {len(employee_shifts)} turnos entre "
+            f"{timezone.localdate(min(s.start_datetime for s in employee_shifts))} y "
+            f"{timezone.localdate(max(s.start_datetime for s in employee_shifts))}.",
+            from_email,
+            [emails[pk]]
+        )
+        for pk, employee_shifts in by_employee.items()
+    ]
@@ -0,0 +1,228 @@
+"""
+Búsqueda de texto completo sobre personas, instalaciones y motivos de permisos.
+Cada fila indexada tiene un ``SearchDocument`` con su texto normalizado
+(sin tildes, en minúsculas), mantenido por señales. En SQLite lo indexa
+una tabla FTS5 y se ordena por bm25; en PostgreSQL, un índice GIN sobre
+``to_tsvector`` y se ordena por ``ts_rank``. Otros motores recorren los
+documentos con ``LIKE`` (sin ranking).
+"""
+import re
+import unicodedata
+from collections import namedtuple
+from functools import reduce
+from operator import and_, or_
+
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Least
+from rest_framework.filters import BaseFilterBackend
+from rest_framework.settings import api_settings
+
+from .models import Facility, LeaveRequest, SearchDocument
+
+CustomUser = get_user_model()
+
+SEARCH_MAX_RESULTS = 200  # ids por tipo de documento
+SEARCH_MAX_TERMS = 8
+REBUILD_BATCH_SIZE = 2000
+
+# Tipo de documento → modelo y campos con el texto indexado
+SearchSource = namedtuple('SearchSource', 'model fields')
+
+SEARCH_SOURCES = {
+    'user': SearchSource(CustomUser, ('first_name', 'last_name', 'email')),
+    'facility': SearchSource(Facility, ('name',)),
+    'leave': SearchSource(LeaveRequest, ('reason',)),
+}
+
+# Documentos de un tipo que contienen todas las palabras, sin tope: se usa
+# como subconsulta ``campo__in`` y, con orden y tope, para el ranking.
+SQLITE_MATCH = """
+    SELECT d.object_id FROM api_searchdocument_fts
+    JOIN api_searchdocument d ON d.id = api_searchdocument_fts.rowid
+    WHERE api_searchdocument_fts MATCH %s AND d.kind = %s"""
+SQLITE_ORDER = " ORDER BY api_searchdocument_fts.rank, d.object_id LIMIT %s"
+
+POSTGRES_MATCH = """
+    SELECT d.object_id FROM api_searchdocument d
+    WHERE d.kind = %s AND to_tsvector('simple', d.body) @@ to_tsquery('simple', %s)"""
+POSTGRES_ORDER = (" ORDER BY ts_rank(to_tsvector('simple', d.body), to_tsquery('simple', %s))"
+                  " DESC, d.object_id LIMIT %s")
+
+
+def normalize(text):
+    """Minúsculas, sin tildes y con la puntuación como espacio (p. ej. en correos)."""
+    text = unicodedata.normalize('NFKD', str(text or ''))
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return ' '.join(re.findall(r'\w+', text.lower()))
+
+
+def terms(query):
+    """Palabras de la consulta del usuario, ya normalizadas."""
+    return normalize(query).split()[:SEARCH_MAX_TERMS]
+
+
+def document_body(source, instance):
+    return normalize(' '.join(str(getattr(instance, field) or '') for field in source.fields))
+
+
+def index(kind, instance):
+    """Crea o actualiza el documento de ``instance``."""
+    SearchDocument.objects.update_or_create(
+        kind=kind, object_id=instance.pk,
+        defaults={'body': document_body(SEARCH_SOURCES[kind], instance)}
+    )
+
+
+def unindex(kind, pk):
+    SearchDocument.objects.filter(kind=kind, object_id=pk).delete()
+
+
+def rebuild(kinds=None):
+    """
+    Reconstruye los documentos de ``kinds`` (todos por defecto) desde las
+    tablas; necesario tras cargas con ``bulk_create``, que no emiten señales.
+    Devuelve la cantidad de documentos por tipo.
+    """
+    counts = {}
+    with transaction.atomic():
+        for kind in kinds or SEARCH_SOURCES:
+            source = SEARCH_SOURCES[kind]
+            SearchDocument.objects.filter(kind=kind).delete()
+            batch, counts[kind] = [], 0
+            for instance in source.model.objects.only('pk', *source.fields).iterator(
+                    chunk_size=REBUILD_BATCH_SIZE):
+                batch.append(SearchDocument(kind=kind, object_id=instance.pk,
+                                            body=document_body(source, instance)))
+                if len(batch) >= REBUILD_BATCH_SIZE:
+                    counts[kind] += len(SearchDocument.objects.bulk_create(batch))
+                    batch = []
+            counts[kind] += len(SearchDocument.objects.bulk_create(batch))
+    return counts
+
+
+def _match(kind, words, using):
+    """
+    SQL de coincidencias del motor de ``using``: (consulta, parámetros, orden
+    por relevancia, parámetros del orden), o None si no hay índice de texto.
+    """
+    connection = connections[using]
+    if connection.vendor == 'sqlite':
+        return SQLITE_MATCH, [' '.join(f'"{word}"*' for word in words), kind], SQLITE_ORDER, []
+    if connection.vendor == 'postgresql':
+        tsquery = ' & '.join(f'{word}:*' for word in words)
+        return POSTGRES_MATCH, [kind, tsquery], POSTGRES_ORDER, [tsquery]
+    return None
+
+
+def _documents(kind, words):
+    documents = SearchDocument.objects.filter(kind=kind)
+    for word in words:
+        documents = documents.filter(body__contains=word)
+    return documents
+
+
+def matches(kind, query, using=DEFAULT_DB_ALIAS):
+    """
+    Subconsulta con los ids de todas las filas de ``kind`` que contienen
+    las palabras de ``query``, para filtrar con ``campo__in`` un queryset
+    de la base ``using``.
+    """
+    words = terms(query)
+    match = _match(kind, words, using)
+    if match is None:
+        return _documents(kind, words).values('object_id')
+    sql, params, _, _ = match
+    return RawSQL(sql, params)
+
+
+def search(kind, query, limit=SEARCH_MAX_RESULTS, within=None, using=None):
+    """
+    Ids de las filas de ``kind`` que contienen todas las palabras de
+    ``query`` (como prefijos), de la más a la menos relevante, hasta
+    ``limit``. ``within`` (queryset de una columna de ids) restringe la
+    búsqueda antes de aplicar el tope. Consulta la base ``using``; por
+    defecto, la de ``within`` (p. ej. una réplica) o la principal.
+    """
+    words = terms(query)
+    if not words:
+        return []
+    if using is None:
+        using = within.db if within is not None else DEFAULT_DB_ALIAS
+    match = _match(kind, words, using)
+    if match is None:
+        documents = _documents(kind, words).using(using)
+        if within is not None:
+            documents = documents.filter(object_id__in=within)
+        return list(documents.order_by('object_id').values_list('object_id', flat=True)[:limit])
+    sql, params, order, order_params = match
+    if within is not None:
+        within_sql, within_params = within.query.get_compiler(using).as_sql()
+        sql += f' AND d.object_id IN ({within_sql})'
+        params += list(within_params)
+    with connections[using].cursor() as cursor:
+        cursor.execute(sql + order, params + order_params + [limit])
+        return [row[0] for row in cursor.fetchall()]
+
+
+def ranked(queryset, documents, query, order=True, fields=()):
+    """
+    Filtra ``queryset`` a las filas cuyos documentos coinciden con ``query``.
+    ``documents`` son pares (tipo de documento, campo del queryset con el id
+    del documento), p. ej. ``(('user', 'employee'),)``. ``fields`` son
+    columnas cortas sin documento (p. ej. el tipo de permiso): también
+    coincide la fila que contiene cada palabra en alguna de ellas. El
+    filtro es una subconsulta sin tope, así que no pierde coincidencias.
+    Las consultas van a la base del queryset (réplica o principal). Con ``order``, se
+    ordena por la mejor posición entre los tipos; las posiciones se calculan
+    solo entre las filas del queryset y, pasadas las primeras
+    ``SEARCH_MAX_RESULTS``, el resto sale por id. Una consulta sin palabras
+    no filtra.
+    """
+    words = terms(query)
+    if not words:
+        return queryset
+    condition = [Q(**{f'{field}__in': matches(kind, query, queryset.db)})
+                 for kind, field in documents]
+    if fields:
+        condition.append(reduce(and_, (
+            reduce(or_, (Q(**{f'{field}__icontains': word}) for field in fields))
+            for word in words
+        )))
+    queryset = queryset.filter(reduce(or_, condition))
+    if not order:
+        return queryset
+    ranks = []
+    for kind, field in documents:
+        ids = search(kind, query, within=queryset.order_by().values(field))
+        if not ids:
+            continue
+        ranks.append(Case(
+            *[When(**{field: pk}, then=Value(position)) for position, pk in enumerate(ids)],
+            default=Value(SEARCH_MAX_RESULTS), output_field=IntegerField()
+        ))
+    if not ranks:
+        return queryset
+    rank = ranks[0] if len(ranks) == 1 else Least(*ranks)
+    return queryset.annotate(search_rank=rank).order_by('search_rank', 'pk')
+
+
+class FullTextSearchFilter(BaseFilterBackend):
+    """
+    ``?search=`` sobre el índice de texto completo. La vista declara
+    ``search_documents`` y, si hace falta, ``search_fields`` con columnas
+    cortas buscadas con ``icontains`` (ver ``ranked``). Los resultados salen por
+    relevancia salvo que la petición pida otro orden con ``?ordering=``.
+    """
+    search_param = api_settings.SEARCH_PARAM
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '')
+        documents = getattr(view, 'search_documents', ())
+        if not query.strip() or not documents:
+            return queryset
+        order = not request.query_params.get(api_settings.ORDERING_PARAM)
+        return ranked(queryset, documents, query, order=order,
+                      fields=getattr(view, 'search_fields', ()))
@@ -1,9 +1,14 @@
 """Modulos de serializadores para la API REST"""
+from datetime import timedelta
 from uuid import uuid4
 from rest_framework import serializers
+from django.utils import timezone
+from django.core.exceptions import ValidationError as DjangoValidationError
 from django.contrib.auth import get_user_model
 from .models import (Tower, Apartment, Facility, ParkingSpot,
-                    ShiftAssignment, LeaveRequest, Reservation)
+                    ShiftAssignment, LeaveRequest, Reservation, ArchivedReservation,
+                    ArchivedShiftAssignment, ArchivedLeaveRequest)
+from .intervals import weekly_blocks
 
 CustomUser = get_user_model()
 
@@ -13,7 +18,7 @@ class ReservationSerializer(serializers.ModelSerializer):
     Permite la creación y actualización de reservas en el sistema.
     """
     facility_name = serializers.CharField(source='facility.name', read_only=True)
-    user_name = serializers.CharField(source='user.nombre_completo', read_only=True)
+    user_name = serializers.CharField(source='user.get_full_name', read_only=True)
 
     class Meta:
         """
@@ -30,8 +35,241 @@ class ReservationSerializer(serializers.ModelSerializer):
         read_only_fields = ['status', 'created_at', 'user']
 
     def validate(self, attrs):
+        # El solape se verifica al guardar, dentro de la transacción de book()
         instance = Reservation(**attrs)
-        instance.clean()
+        if self.instance is not None:
+            instance.start_datetime = attrs.get('start_datetime', self.instance.start_datetime)
+            instance.end_datetime = attrs.get('end_datetime', self.instance.end_datetime)
+        instance.clean_range()
+        return attrs
+
+    def create(self, validated_data):
+        return self._book(Reservation(**validated_data))
+
+    def update(self, instance, validated_data):
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        return self._book(instance)
+
+    def _book(self, reservation):
+        try:
+            return reservation.book()
+        except DjangoValidationError as exc:
+            raise serializers.ValidationError({'non_field_errors': exc.messages}) from exc
+
+class ReservationRangeSerializer(serializers.Serializer):
+    """
+    Rango horario de una ocurrencia en una reserva masiva.
+    """
+    start_datetime = serializers.DateTimeField()
+    end_datetime = serializers.DateTimeField()
+
+    def validate(self, attrs):
+        if attrs['start_datetime'] >= attrs['end_datetime']:
+            raise serializers.ValidationError(
+                "La fecha de inicio debe ser anterior a la fecha de fin."
+            )
+        return attrs
+
+class RecurrenceSerializer(ReservationRangeSerializer):
+    """
+    Regla de recurrencia: la primera ocurrencia se repite cada ``interval``
+    días o semanas, ``count`` veces o hasta la fecha ``until`` (inclusive).
+    """
+    FREQ_CHOICES = (
+        ('daily', 'Diaria'),
+        ('weekly', 'Semanal'),
+    )
+    freq = serializers.ChoiceField(choices=FREQ_CHOICES, default='weekly')
+    interval = serializers.IntegerField(min_value=1, default=1)
+    count = serializers.IntegerField(min_value=1, required=False)
+    until = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        if ('count' in attrs) == ('until' in attrs):
+            raise serializers.ValidationError('Especifique "count" o "until", no ambos ni ninguno.')
+        return attrs
+
+    @staticmethod
+    def expand(rule, limit):
+        """
+        Devuelve las ocurrencias (inicio, fin) de la regla, como máximo ``limit + 1``.
+        Los saltos se calculan en hora local para respetar cambios de horario.
+        """
+        tz = timezone.get_current_timezone()
+        start = timezone.localtime(rule['start_datetime'], tz).replace(tzinfo=None)
+        duration = rule['end_datetime'] - rule['start_datetime']
+        step = timedelta(days=rule['interval'] * (7 if rule['freq'] == 'weekly' else 1))
+        count = rule.get('count', limit + 1)
+        until = rule.get('until')
+        occurrences = []
+        current = start
+        while len(occurrences) < min(count, limit + 1):
+            if until and current.date() > until:
+                break
+            aware = timezone.make_aware(current, tz)
+            occurrences.append((aware, aware + duration))
+            current += step
+        return occurrences
+
+class ReservationBulkSerializer(serializers.Serializer):
+    """
+    Entrada para crear varias reservas de una instalación en una sola petición,
+    a partir de una lista de rangos o de una regla de recurrencia.
+    """
+    MAX_OCCURRENCES = 100
+
+    facility = serializers.PrimaryKeyRelatedField(queryset=Facility.objects.all())
+    ranges = ReservationRangeSerializer(many=True, required=False)
+    recurrence = RecurrenceSerializer(required=False)
+
+    def validate(self, attrs):
+        if ('ranges' in attrs) == ('recurrence' in attrs):
+            raise serializers.ValidationError(
+                'Especifique "ranges" o "recurrence", no ambos ni ninguno.'
+            )
+        if 'ranges' in attrs:
+            occurrences = [(r['start_datetime'], r['end_datetime']) for r in attrs['ranges']]
+        else:
+            occurrences = RecurrenceSerializer.expand(attrs['recurrence'], self.MAX_OCCURRENCES)
+        if not occurrences:
+            raise serializers.ValidationError('La solicitud no genera ninguna ocurrencia.')
+        if len(occurrences) > self.MAX_OCCURRENCES:
+            raise serializers.ValidationError(
+                f'Máximo {self.MAX_OCCURRENCES} ocurrencias por solicitud.'
+            )
+        attrs['occurrences'] = occurrences
+        return attrs
+
+class BulkReviewSerializer(serializers.Serializer):
+    """
+    Entrada para aprobar o rechazar varias solicitudes en una sola petición.
+    """
+    MAX_ITEMS = 200
+    DECISION_CHOICES = (
+        ('aprobada', 'Aprobada'),
+        ('rechazada', 'Rechazada'),
+    )
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=MAX_ITEMS
+    )
+    decision = serializers.ChoiceField(choices=DECISION_CHOICES)
+
+class WeeklyBlockSerializer(serializers.Serializer):
+    """
+    Bloque de una plantilla semanal: días de la semana (0 = lunes) y hora
+    de inicio y fin en hora local. Si la hora de fin no es posterior a la
+    de inicio, el turno termina al día siguiente.
+    """
+    weekdays = serializers.ListField(
+        child=serializers.IntegerField(min_value=0, max_value=6),
+        allow_empty=False,
+        max_length=7
+    )
+    start = serializers.TimeField()
+    end = serializers.TimeField()
+
+class RosterBlockSerializer(WeeklyBlockSerializer):
+    """
+    Bloque de la plantilla de turnos con los empleados asignados.
+    """
+    employees = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False
+    )
+
+class ShiftRosterSerializer(serializers.Serializer):
+    """
+    Entrada para generar los turnos de un rango de fechas a partir de una
+    plantilla semanal. Los empleados se validan con una sola consulta.
+    """
+    MAX_DAYS = 62
+    MAX_SHIFTS = 10000
+
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+    area = serializers.ChoiceField(choices=ShiftAssignment.AREA_CHOICES)
+    tower = serializers.PrimaryKeyRelatedField(queryset=Tower.objects.all(), required=False)
+    facility = serializers.PrimaryKeyRelatedField(queryset=Facility.objects.all(), required=False)
+    blocks = RosterBlockSerializer(many=True, allow_empty=False)
+
+    def validate(self, attrs):
+        if ('tower' in attrs) == ('facility' in attrs):
+            raise serializers.ValidationError('Especifique torre o instalación, no ambos ni ninguno.')
+        days = (attrs['end_date'] - attrs['start_date']).days + 1
+        if days < 1:
+            raise serializers.ValidationError(
+                'La fecha de inicio debe ser anterior o igual a la fecha de fin.'
+            )
+        if days > self.MAX_DAYS:
+            raise serializers.ValidationError(f'Máximo {self.MAX_DAYS} días por plantilla.')
+        requested = {pk for block in attrs['blocks'] for pk in block['employees']}
+        found = set(CustomUser.objects.filter(
+            pk__in=requested, role=CustomUser.EMPLEADO, is_active=True
+        ).values_list('pk', flat=True))
+        if requested - found:
+            raise serializers.ValidationError({
+                'blocks': f"Empleados no válidos: {sorted(requested - found)}."
+            })
+        shifts = self.expand(attrs)
+        if len(shifts) > self.MAX_SHIFTS:
+            raise serializers.ValidationError(f'Máximo {self.MAX_SHIFTS} turnos por plantilla.')
+        attrs['shifts'] = shifts
+        return attrs
+
+    @staticmethod
+    def expand(attrs):
+        """
+        Genera los turnos (sin guardar) de la plantilla, día por día.
+        """
+        return [
+            ShiftAssignment(employee_id=pk, area=attrs['area'],
+                            tower=attrs.get('tower'), facility=attrs.get('facility'),
+                            start_datetime=start, end_datetime=end)
+            for block, start, end in weekly_blocks(attrs['start_date'], attrs['end_date'],
+                                                   attrs['blocks'])
+            for pk in dict.fromkeys(block['employees'])
+        ]
+
+class ScheduleBlockSerializer(WeeklyBlockSerializer):
+    """
+    Bloque de cobertura requerida: cuántos empleados del área deben
+    cubrir la torre o instalación en cada ocurrencia del bloque.
+    """
+    area = serializers.ChoiceField(choices=ShiftAssignment.AREA_CHOICES)
+    tower = serializers.PrimaryKeyRelatedField(queryset=Tower.objects.all(), required=False)
+    facility = serializers.PrimaryKeyRelatedField(queryset=Facility.objects.all(), required=False)
+    required = serializers.IntegerField(min_value=1, max_value=100, default=1)
+
+    def validate(self, attrs):
+        if ('tower' in attrs) == ('facility' in attrs):
+            raise serializers.ValidationError('Especifique torre o instalación, no ambos ni ninguno.')
+        return attrs
+
+class ShiftScheduleSerializer(serializers.Serializer):
+    """
+    Entrada para programar turnos automáticamente en un rango de fechas.
+    Con ``dry_run`` se devuelve el plan sin guardar turnos.
+    """
+    MAX_DAYS = 62
+
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+    blocks = ScheduleBlockSerializer(many=True, allow_empty=False)
+    dry_run = serializers.BooleanField(default=False)
+
+    def validate(self, attrs):
+        days = (attrs['end_date'] - attrs['start_date']).days + 1
+        if days < 1:
+            raise serializers.ValidationError(
+                'La fecha de inicio debe ser anterior o igual a la fecha de fin.'
+            )
+        if days > self.MAX_DAYS:
+            raise serializers.ValidationError(f'Máximo {self.MAX_DAYS} días por programación.')
         return attrs
 
 class TowerSerializer(serializers.ModelSerializer):
@@ -111,6 +349,13 @@ class ShiftAssignmentSerializer(serializers.ModelSerializer):
         instance.clean()
         return attrs
 
+    def save(self, **kwargs):
+        # en PostgreSQL el solape se detecta al guardar (ver api.constraints)
+        try:
+            return super().save(**kwargs)
+        except DjangoValidationError as exc:
+            raise serializers.ValidationError({'non_field_errors': exc.messages}) from exc
+
 class LeaveRequestSerializer(serializers.ModelSerializer):
     """
     Serializador para la clase LeaveRequest.
@@ -131,6 +376,45 @@ class LeaveRequestSerializer(serializers.ModelSerializer):
             'status', 'reviewed_by', 'created_at', 'reviewed_at', 'employee'
         ]
 
+class ArchivedReservationSerializer(serializers.ModelSerializer):
+    """
+    Serializador de solo lectura para las reservas del histórico.
+    """
+    facility_name = serializers.CharField(source='facility.name', read_only=True)
+    user_name = serializers.CharField(source='user.get_full_name', read_only=True)
+
+    class Meta:
+        model = ArchivedReservation
+        fields = [
+            'id', 'facility', 'facility_name', 'user', 'user_name',
+            'start_datetime', 'end_datetime', 'status', 'created_at', 'archived_at'
+        ]
+        read_only_fields = fields
+
+class ArchivedShiftAssignmentSerializer(serializers.ModelSerializer):
+    """
+    Serializador de solo lectura para los turnos del histórico.
+    """
+    class Meta:
+        model = ArchivedShiftAssignment
+        fields = [
+            'id', 'employee', 'area', 'start_datetime', 'end_datetime',
+            'tower', 'facility', 'archived_at'
+        ]
+        read_only_fields = fields
+
+class ArchivedLeaveRequestSerializer(serializers.ModelSerializer):
+    """
+    Serializador de solo lectura para las solicitudes de permiso del histórico.
+    """
+    class Meta:
+        model = ArchivedLeaveRequest
+        fields = [
+            'id', 'employee', 'type', 'start_date', 'end_date', 'reason', 'document',
+            'status', 'reviewed_by', 'created_at', 'reviewed_at', 'archived_at'
+        ]
+        read_only_fields = fields
+
 class UserSerializer(serializers.ModelSerializer):
     """
     Serializer para la creación y listado de usuarios.
@@ -0,0 +1,112 @@
+"""
+Señales de la aplicación API.
+"""
+from functools import reduce
+from operator import or_
+
+from django.contrib.auth import get_user_model
+from django.db import models
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from .authentication import token_cache
+from .catalog import catalog_cache, set_null_targets
+from .models import Tower, Apartment, Facility, ParkingSpot, Tombstone
+from .search import SEARCH_SOURCES, index, unindex
+from .sync import SYNC_MODELS, owner_of
+
+CustomUser = get_user_model()
+
+
+@receiver([post_save, post_delete], sender=Token)
+def invalidate_token(sender, instance, **kwargs):
+    """El token cambió o se borró: sacarlo de la caché de autenticación."""
+    token_cache.invalidate(instance.key)
+
+
+@receiver([post_save, post_delete], sender=CustomUser)
+def invalidate_user_tokens(sender, instance, **kwargs):
+    """Cambios del usuario (is_active, role, ...) invalidan sus tokens en caché."""
+    token_cache.invalidate_user(instance.pk)
+
+
+# Catálogos servidos desde catalog_cache por sus ViewSets
+CATALOG_MODELS = (Tower, Apartment, Facility, ParkingSpot)
+
+
+def catalog_invalidator(model):
+    def invalidate(sender, **kwargs):
+        catalog_cache.invalidate(model)
+    return invalidate
+
+
+for _model in CATALOG_MODELS:
+    _invalidate = catalog_invalidator(_model)
+    post_save.connect(_invalidate, sender=_model, weak=False,
+                      dispatch_uid=f'catalog_save_{_model._meta.label_lower}')
+    post_delete.connect(_invalidate, sender=_model, weak=False,
+                        dispatch_uid=f'catalog_delete_{_model._meta.label_lower}')
+    # borrar la fila referenciada pone la FK en NULL sin señales propias
+    for _target in set_null_targets(_model):
+        post_delete.connect(
+            _invalidate, sender=_target, weak=False,
+            dispatch_uid=f'catalog_delete_{_target._meta.label_lower}_{_model._meta.label_lower}'
+        )
+
+
+def record_tombstone(sender, instance, **kwargs):
+    """La fila borrada se informa a los clientes de /api/sync/."""
+    Tombstone.objects.record(sender, [(instance.pk, owner_of(instance))])
+
+
+def touch_set_null_dependents(model, target):
+    """
+    Borrar ``target`` pone en NULL la FK de las filas de ``model`` con un
+    UPDATE que no toca updated_at; se marca antes para que la sincronización
+    y los ETag vean el cambio.
+    """
+    fields = [
+        field.name for field in model._meta.get_fields()
+        if field.many_to_one and field.related_model is target
+        and field.remote_field.on_delete is models.SET_NULL
+    ]
+
+    def touch(sender, instance, **kwargs):
+        model.objects.filter(reduce(or_, (Q(**{name: instance}) for name in fields))).update(
+            updated_at=timezone.now()
+        )
+    return touch
+
+
+for _spec in SYNC_MODELS:
+    post_delete.connect(record_tombstone, sender=_spec.model, weak=False,
+                        dispatch_uid=f'sync_tombstone_{_spec.model._meta.label_lower}')
+    for _target in set_null_targets(_spec.model):
+        pre_delete.connect(
+            touch_set_null_dependents(_spec.model, _target), sender=_target, weak=False,
+            dispatch_uid=f'sync_touch_{_target._meta.label_lower}_{_spec.model._meta.label_lower}'
+        )
+
+
+def search_indexer(kind, fields):
+    """Mantiene el documento de búsqueda de las filas de ``kind``."""
+    def save(sender, instance, update_fields=None, **kwargs):
+        # p. ej. el login solo guarda last_login: el texto no cambió
+        if update_fields is not None and not set(update_fields) & set(fields):
+            return
+        index(kind, instance)
+
+    def delete(sender, instance, **kwargs):
+        unindex(kind, instance.pk)
+    return save, delete
+
+
+for _kind, _source in SEARCH_SOURCES.items():
+    _save, _delete = search_indexer(_kind, _source.fields)
+    post_save.connect(_save, sender=_source.model, weak=False,
+                      dispatch_uid=f'search_save_{_kind}')
+    post_delete.connect(_delete, sender=_source.model, weak=False,
+                        dispatch_uid=f'search_delete_{_kind}')
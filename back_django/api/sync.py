@@ -0,0 +1,98 @@
+"""
+Sincronización incremental para clientes móviles con copia local.
+El cliente guarda el ``cursor`` de la última respuesta y lo envía como
+``since``: recibe solo las filas modificadas desde entonces (una consulta
+por modelo) y los ids borrados (una consulta sobre las lápidas).
+"""
+from collections import namedtuple
+from datetime import timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Reservation, ShiftAssignment, LeaveRequest, Facility, Tombstone
+from .serializers import (ReservationSerializer, ShiftAssignmentSerializer,
+                          LeaveRequestSerializer, FacilitySerializer)
+
+_sync_settings = getattr(settings, 'SYNC', {})
+
+# Margen con el que se relee hacia atrás desde el cursor: una transacción
+# que fijó updated_at antes de generarse el cursor pero confirmó después
+# no se pierde. El cliente aplica los cambios como upserts, así que las
+# filas repetidas no le afectan.
+SYNC_OVERLAP = timedelta(seconds=_sync_settings.get('OVERLAP_SECONDS', 5))
+# Antigüedad de las lápidas que se conservan; un cursor más viejo recibe
+# una copia completa con ``reset``.
+SYNC_TOMBSTONE_RETENTION = timedelta(days=_sync_settings.get('TOMBSTONE_DAYS', 90))
+
+# owner: FK al usuario dueño de la fila (None si la ven todos).
+# related: relaciones cuyos datos se serializan en la fila.
+SyncModel = namedtuple('SyncModel', 'key model serializer owner related')
+
+SYNC_MODELS = (
+    SyncModel('reservations', Reservation, ReservationSerializer, 'user', ('facility', 'user')),
+    SyncModel('shifts', ShiftAssignment, ShiftAssignmentSerializer, 'employee', ()),
+    SyncModel('leaves', LeaveRequest, LeaveRequestSerializer, 'employee', ()),
+    SyncModel('facilities', Facility, FacilitySerializer, None, ()),
+)
+
+SYNC_KEYS = {spec.model._meta.label_lower: spec.key for spec in SYNC_MODELS}
+
+
+def owner_of(instance):
+    """Id del usuario que ve la fila, o None si es pública."""
+    for spec in SYNC_MODELS:
+        if isinstance(instance, spec.model):
+            return getattr(instance, f'{spec.owner}_id') if spec.owner else None
+    return None
+
+
+def sync_queryset(spec, user, since):
+    """Filas de ``spec`` visibles para ``user`` modificadas desde ``since``."""
+    qs = spec.model.objects.select_related(*spec.related).order_by('pk')
+    if spec.owner and user.role != user.ADMIN:
+        qs = qs.filter(**{spec.owner: user})
+    if since is not None:
+        changed = Q(updated_at__gte=since)
+        for related in spec.related:
+            changed |= Q(**{f'{related}__updated_at__gte': since})
+        qs = qs.filter(changed)
+    return qs
+
+
+def changes_since(user, since, context=None):
+    """
+    Cambios visibles para ``user`` desde ``since`` (None: copia completa).
+    Devuelve un diccionario con el cursor nuevo, las filas por modelo y los
+    ids borrados por modelo. Un ``since`` anterior a la retención de las
+    lápidas se trata como copia completa y se marca con ``reset``.
+    """
+    now = timezone.now()
+    if since is not None and since < now - SYNC_TOMBSTONE_RETENTION:
+        since = None
+    window = since - SYNC_OVERLAP if since is not None else None
+    changes = {
+        spec.key: spec.serializer(sync_queryset(spec, user, window), many=True,
+                                  context=context or {}).data
+        for spec in SYNC_MODELS
+    }
+    deleted = {spec.key: [] for spec in SYNC_MODELS}
+    if window is not None:
+        tombstones = Tombstone.objects.filter(deleted_at__gte=window,
+                                              model__in=SYNC_KEYS)
+        if user.role != user.ADMIN:
+            tombstones = tombstones.filter(Q(owner_id=user.pk) | Q(owner_id__isnull=True))
+        for label, pk in tombstones.order_by('pk').values_list('model', 'object_id'):
+            deleted[SYNC_KEYS[label]].append(pk)
+        # una fila reasignada que sigue visible llega en los cambios
+        for key, rows in changes.items():
+            present = {row['id'] for row in rows}
+            deleted[key] = sorted(set(deleted[key]) - present)
+    return {
+        # en UTC con Z: sin '+' que haya que escapar en la URL
+        'cursor': now.astimezone(dt_timezone.utc).isoformat().replace('+00:00', 'Z'),
+        'reset': since is None,
+        'changes': changes,
+        'deleted': deleted,
+    }
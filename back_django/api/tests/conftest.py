@@ -0,0 +1,13 @@
+import pytest
+
+from api.catalog import catalog_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_catalog_cache():
+    """
+    La caché en memoria sobrevive entre pruebas, pero el rollback de cada
+    prueba no emite señales: se vacía para no servir catálogos de otra prueba.
+    """
+    catalog_cache.clear()
+    yield
@@ -0,0 +1,28 @@
+"""
+Utilidades compartidas por las pruebas: fechas fijas de junio de 2025 y
+usuarios creados con las fábricas de ``api.factories``.
+"""
+from datetime import datetime, timezone as dt_timezone
+
+from api.factories import EmployeeFactory, UserFactory
+from api.models import CustomUser
+
+
+def on(day, hour):
+    """Instante UTC del ``day`` de junio de 2025 a la hora ``hour``."""
+    return datetime(2025, 6, day, hour, tzinfo=dt_timezone.utc)
+
+
+def make_admin(**fields):
+    """Administrador activo con acceso a las vistas IsAdminUser."""
+    return UserFactory(role=CustomUser.ADMIN, is_staff=True, is_superuser=True, **fields)
+
+
+def make_employee(subrole=CustomUser.SEGURIDAD, **fields):
+    """Empleado activo del subrol dado (seguridad por defecto)."""
+    return EmployeeFactory(subrole=subrole, **fields)
+
+
+def make_resident(**fields):
+    """Propietario activo."""
+    return UserFactory(**fields)
@@ -0,0 +1,143 @@
+from io import StringIO
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from api.archive import ARCHIVE_MODELS, archive
+from api.models import (CustomUser, Facility, Reservation, ShiftAssignment, LeaveRequest,
+                        ArchivedReservation, ArchivedShiftAssignment, ArchivedLeaveRequest,
+                        SearchDocument, Tombstone)
+
+
+class ArchiveTests(APITestCase):
+    def setUp(self):
+        self.admin = CustomUser.objects.create_user(
+            username='admin', email='admin@example.com', password='adminpass',
+            first_name='Admin', last_name='Uno', telefono='3000000000',
+            role=CustomUser.ADMIN, is_staff=True
+        )
+        self.employee = CustomUser.objects.create_user(
+            username='emp', email='emp@example.com', password='pass',
+            first_name='Emp', last_name='Uno', telefono='3001111111',
+            role=CustomUser.EMPLEADO, subrole=CustomUser.SEGURIDAD
+        )
+        self.resident = CustomUser.objects.create_user(
+            username='prop', email='prop@example.com', password='pass',
+            first_name='Prop', last_name='Dos', telefono='3002222222',
+            role=CustomUser.PROPIETARIO
+        )
+        self.gym = Facility.objects.create(name='Gimnasio', is_reserved=True)
+        now = timezone.now()
+        self.old = now - timezone.timedelta(days=400)
+        self.recent = now - timezone.timedelta(days=10)
+        hour = timezone.timedelta(hours=1)
+        self.old_reservations = [
+            Reservation.objects.create(facility=self.gym, user=user, status='aprobada',
+                                       start_datetime=self.old + i * hour,
+                                       end_datetime=self.old + (i + 1) * hour)
+            for i, user in enumerate([self.resident, self.admin, self.resident])
+        ]
+        self.recent_reservation = Reservation.objects.create(
+            facility=self.gym, user=self.resident,
+            start_datetime=self.recent, end_datetime=self.recent + hour
+        )
+        self.old_shift = ShiftAssignment.objects.create(
+            employee=self.employee, area='seguridad', facility=self.gym,
+            start_datetime=self.old, end_datetime=self.old + 8 * hour
+        )
+        self.recent_shift = ShiftAssignment.objects.create(
+            employee=self.employee, area='seguridad', facility=self.gym,
+            start_datetime=self.recent, end_datetime=self.recent + 8 * hour
+        )
+        old_day = timezone.localdate(self.old)
+        self.old_leave = LeaveRequest.objects.create(
+            employee=self.employee, type='permiso', start_date=old_day, end_date=old_day,
+            reason='Cita médica', status='aprobada', document=SimpleUploadedFile('a.txt', b'a')
+        )
+        self.pending_leave = LeaveRequest.objects.create(
+            employee=self.employee, type='permiso', start_date=old_day, end_date=old_day,
+            reason='Trámite', document=SimpleUploadedFile('b.txt', b'b')
+        )
+
+    def _ids(self, url, **params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [row['id'] for row in response.data['results']]
+
+    def test_moves_expired_rows_in_batches(self):
+        old_ids = [r.id for r in self.old_reservations]
+        cutoff = timezone.now() - timezone.timedelta(days=365)
+        with CaptureQueriesContext(connection) as context:
+            counts = archive(cutoff, keys=['reservations'], batch_size=2)
+        # lotes de 2: una transacción (aquí, punto de guardado) por lote
+        batches = [q for q in context.captured_queries if q['sql'].startswith('SAVEPOINT')]
+        self.assertEqual(len(batches), 2)
+        self.assertEqual(counts, {'reservations': 3})
+        self.assertEqual(list(Reservation.objects.values_list('id', flat=True)),
+                         [self.recent_reservation.id])
+        archived = ArchivedReservation.objects.order_by('id')
+        self.assertEqual([r.id for r in archived], old_ids)
+        self.assertEqual(archived[0].start_datetime, self.old_reservations[0].start_datetime)
+        self.assertEqual(archived[0].status, 'aprobada')
+        # los clientes de /api/sync/ las quitan de su copia
+        self.assertEqual(set(Tombstone.objects.values_list('object_id', flat=True)), set(old_ids))
+
+    def test_command_archives_every_model_and_keeps_pending_leaves(self):
+        out = StringIO()
+        call_command('archive_history', '--dry-run', stdout=out)
+        self.assertIn('reservations: 3', out.getvalue())
+        self.assertEqual(ArchivedReservation.objects.count(), 0)
+        out = StringIO()
+        call_command('archive_history', '--days', '365', stdout=out)
+        self.assertEqual(out.getvalue().split('\n')[:3],
+                         ['reservations: 3', 'shifts: 1', 'leaves: 1'])
+        self.assertEqual(list(ShiftAssignment.objects.all()), [self.recent_shift])
+        self.assertEqual(list(ArchivedShiftAssignment.objects.values_list('id', flat=True)),
+                         [self.old_shift.id])
+        self.assertEqual(list(LeaveRequest.objects.all()), [self.pending_leave])
+        archived_leave = ArchivedLeaveRequest.objects.get()
+        self.assertEqual(archived_leave.document.name, self.old_leave.document.name)
+        self.assertFalse(SearchDocument.objects.filter(kind='leave',
+                                                       object_id=self.old_leave.id).exists())
+        # volver a correrlo no mueve nada
+        out = StringIO()
+        call_command('archive_history', stdout=out)
+        self.assertIn('reservations: 0', out.getvalue())
+
+    def test_archive_api_is_read_only_and_scoped_to_the_owner(self):
+        archive(timezone.now() - timezone.timedelta(days=365))
+        url = reverse('archived-reservation-list')
+        self.client.force_authenticate(self.resident)
+        own = [self.old_reservations[2].id, self.old_reservations[0].id]
+        self.assertEqual(self._ids(url), own)
+        response = self.client.get(reverse('archived-reservation-detail',
+                                           args=[self.old_reservations[1].id]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.post(url, {'facility': self.gym.id})
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+        self.client.force_authenticate(self.admin)
+        self.assertEqual(len(self._ids(url)), 3)
+        row = self.client.get(reverse('archived-reservation-detail',
+                                      args=[own[0]])).data
+        self.assertEqual(row['facility_name'], 'Gimnasio')
+        self.assertEqual(self._ids(reverse('archived-shift-list'), area='seguridad'),
+                         [self.old_shift.id])
+        self.assertEqual(self._ids(reverse('archived-leave-list'), status='aprobada'),
+                         [self.old_leave.id])
+
+        self.client.force_authenticate(self.employee)
+        self.assertEqual(self._ids(reverse('archived-reservation-list')), [])
+        self.assertEqual(self._ids(reverse('archived-leave-list')), [self.old_leave.id])
+
+    def test_every_archived_column_exists_in_the_hot_table(self):
+        for spec in ARCHIVE_MODELS:
+            hot = {field.attname for field in spec.model._meta.concrete_fields}
+            archived = {field.attname for field in spec.archive._meta.concrete_fields}
+            self.assertEqual(archived - hot, {'archived_at'}, spec.key)
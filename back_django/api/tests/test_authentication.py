@@ -0,0 +1,56 @@
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+
+from api.authentication import TokenCache, token_cache
+from api.models import CustomUser
+
+
+class TokenCacheTests(APITestCase):
+    def setUp(self):
+        token_cache.clear()
+        self.admin = CustomUser.objects.create_user(
+            username='admin', email='admin@example.com', password='adminpass',
+            first_name='Admin', last_name='Uno', telefono='3000000000', role=CustomUser.ADMIN
+        )
+        self.admin.is_active = True
+        self.admin.is_staff = True
+        self.admin.save()
+        self.token = Token.objects.create(user=self.admin)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.url = reverse('user-me')
+
+    def test_second_request_skips_token_query(self):
+        with self.assertNumQueries(1):
+            self.client.get(self.url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        stats = self.client.get(reverse('cache_stats')).data['token_auth']
+        self.assertEqual((stats['hits'], stats['misses']), (2, 1))
+
+    def test_deactivating_user_invalidates_cache(self):
+        self.client.get(self.url)
+        self.admin.is_active = False
+        self.admin.save()
+        response = self.client.get(self.url)
+        # SessionAuthentication va primero, por eso DRF responde 403 y no 401
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_deleted_token_is_rejected(self):
+        self.client.get(self.url)
+        self.token.delete()
+        response = self.client.get(self.url)
+        # SessionAuthentication va primero, por eso DRF responde 403 y no 401
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_lru_eviction(self):
+        cache = TokenCache(max_size=2, ttl=60)
+        cache.set('a', (self.admin, self.token))
+        cache.set('b', (self.admin, self.token))
+        cache.get('a')
+        cache.set('c', (self.admin, self.token))
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('a'))
+        self.assertEqual(cache.stats()['evictions'], 1)
@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+
+from api.intervals import merge_intervals, free_intervals, free_slots, IntervalIndex
+from api.models import CustomUser, Facility, Reservation
+
+
+def at(hour, minute=0):
+    return datetime(2025, 6, 2, hour, minute, tzinfo=dt_timezone.utc)
+
+
+class IntervalTests(SimpleTestCase):
+    def test_merge_overlapping_and_adjacent(self):
+        merged = merge_intervals([(at(10), at(11)), (at(8), at(9)), (at(9), at(10)), (at(12), at(13))])
+        self.assertEqual(merged, [(at(8), at(11)), (at(12), at(13))])
+
+    def test_free_intervals_clip_to_window(self):
+        busy = [(at(7), at(9)), (at(11), at(12)), (at(17), at(19))]
+        free = free_intervals(busy, at(8), at(18))
+        self.assertEqual(free, [(at(9), at(11)), (at(12), at(17))])
+
+    def test_free_slots_aligned_to_window(self):
+        free = [(at(9, 30), at(11, 15))]
+        slots = free_slots(free, at(8), timedelta(minutes=30))
+        self.assertEqual(slots, [(at(9, 30), at(10)), (at(10), at(10, 30)), (at(10, 30), at(11))])
+
+    def test_interval_index_overlaps_and_add(self):
+        index = IntervalIndex([(at(8), at(9)), (at(12), at(13))])
+        self.assertFalse(index.overlaps(at(9), at(12)))
+        self.assertTrue(index.overlaps(at(8, 30), at(10)))
+        index.add(at(9), at(12))
+        self.assertEqual(list(index), [(at(8), at(13))])
+        self.assertTrue(index.overlaps(at(10), at(11)))
+
+
+class AvailabilityViewTests(APITestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            username='prop', email='prop@example.com', password='userpass',
+            first_name='Prop', last_name='Dos', telefono='3001111111', role=CustomUser.PROPIETARIO
+        )
+        self.user.is_active = True
+        self.user.save()
+        token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        self.facility = Facility.objects.create(name='Gimnasio', is_reserved=True)
+        self.url = reverse('facility-availability', args=[self.facility.id])
+
+    def test_availability_excludes_reservations(self):
+        Reservation.objects.create(facility=self.facility, user=self.user,
+                                   start_datetime=at(9), end_datetime=at(10))
+        Reservation.objects.create(facility=self.facility, user=self.user,
+                                   start_datetime=at(10), end_datetime=at(11), status='rechazada')
+        with self.assertNumQueries(3):  # token, instalación y reservas
+            response = self.client.get(self.url, {
+                'from': at(8).isoformat(), 'to': at(12).isoformat(), 'slot': 60
+            })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        starts = [slot['start'] for slot in response.data['slots']]
+        self.assertEqual(starts, [at(8), at(10), at(11)])
+        self.assertEqual(response.data['free'], [
+            {'start': at(8), 'end': at(9)}, {'start': at(10), 'end': at(12)}
+        ])
+
+    def test_availability_requires_valid_window(self):
+        response = self.client.get(self.url, {'from': at(12).isoformat(), 'to': at(8).isoformat()})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(self.url, {'from': '2025-06-01'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,88 @@
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from api.models import CustomUser, Tower, Facility, Reservation, ShiftAssignment
+
+
+class BootstrapTests(APITestCase):
+    def setUp(self):
+        self.admin = CustomUser.objects.create_superuser(
+            username='admin', email='admin@example.com', password='adminpass',
+            first_name='Admin', last_name='Uno', telefono='3000000000', role=CustomUser.ADMIN
+        )
+        self.resident = CustomUser.objects.create_user(
+            username='prop', email='prop@example.com', password='proppass',
+            first_name='Prop', last_name='Dos', telefono='3001111111',
+            role=CustomUser.PROPIETARIO, is_active=True
+        )
+        self.employee = CustomUser.objects.create_user(
+            username='emp', email='emp@example.com', password='emppass',
+            first_name='Emp', last_name='Tres', telefono='3002222222',
+            role=CustomUser.EMPLEADO, subrole=CustomUser.SEGURIDAD, is_active=True
+        )
+        self.tower = Tower.objects.create(name='Torre A', num_floors=10)
+        facility = Facility.objects.create(name='Gimnasio', is_reserved=True)
+        now = timezone.now()
+        for i, user in enumerate([self.resident, self.resident, self.employee]):
+            Reservation.objects.create(
+                facility=facility, user=user,
+                start_datetime=now + timezone.timedelta(hours=2 * i + 1),
+                end_datetime=now + timezone.timedelta(hours=2 * i + 2)
+            )
+        Reservation.objects.create(
+            facility=facility, user=self.resident, status='aprobada',
+            start_datetime=now - timezone.timedelta(days=2),
+            end_datetime=now - timezone.timedelta(days=2, hours=-1)
+        )
+        start = timezone.localtime().replace(hour=8, minute=0, second=0, microsecond=0)
+        self.shift = ShiftAssignment.objects.create(
+            employee=self.employee, area='seguridad', tower=self.tower,
+            start_datetime=start, end_datetime=start + timezone.timedelta(hours=8)
+        )
+        ShiftAssignment.objects.create(
+            employee=self.employee, area='seguridad', tower=self.tower,
+            start_datetime=start + timezone.timedelta(days=1),
+            end_datetime=start + timezone.timedelta(days=1, hours=8)
+        )
+        self.url = reverse('bootstrap')
+
+    def test_admin_bundle_query_budget(self):
+        self.client.force_authenticate(self.admin)
+        # reservas, instalaciones, torres y turnos
+        with self.assertNumQueries(4):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.data
+        self.assertEqual(data['user']['email'], 'admin@example.com')
+        self.assertEqual([f['name'] for f in data['facilities']], ['Gimnasio'])
+        self.assertEqual([t['id'] for t in data['towers']], [self.tower.id])
+        self.assertEqual([s['id'] for s in data['shifts']], [self.shift.id])
+        # pendientes de revisar, de todos los usuarios
+        self.assertEqual(len(data['reservations']), 3)
+        # los catálogos quedan en caché
+        with self.assertNumQueries(2):
+            self.client.get(self.url)
+
+    def test_employee_sees_own_shifts_and_reservations(self):
+        self.client.force_authenticate(self.employee)
+        data = self.client.get(self.url).data
+        self.assertEqual([s['id'] for s in data['shifts']], [self.shift.id])
+        self.assertEqual([r['user'] for r in data['reservations']], [self.employee.id])
+        # las torres solo las ve el admin, igual que en /api/towers/
+        self.assertNotIn('towers', data)
+
+    def test_resident_bundle_has_no_staff_data(self):
+        self.client.force_authenticate(self.resident)
+        self.client.get(self.url)
+        with self.assertNumQueries(1):
+            data = self.client.get(self.url).data
+        self.assertNotIn('shifts', data)
+        self.assertNotIn('towers', data)
+        # solo las próximas propias
+        self.assertEqual(len(data['reservations']), 2)
+        self.assertTrue(all(r['user'] == self.resident.id for r in data['reservations']))
+
+    def test_requires_authentication(self):
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,68 @@
+from unittest import skipUnless
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+
+from api.models import Facility, Reservation
+from helpers import make_resident, on
+
+
+class BulkReservationTests(APITestCase):
+    def setUp(self):
+        self.user = make_resident()
+        token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        self.facility = Facility.objects.create(name='Gimnasio', is_reserved=True)
+        self.url = reverse('reservations-bulk')
+
+    def test_weekly_recurrence_reports_conflicts(self):
+        # La segunda semana ya está ocupada
+        Reservation.objects.create(facility=self.facility, user=self.user,
+                                   start_datetime=on(9, 18), end_datetime=on(9, 19))
+        payload = {
+            'facility': self.facility.id,
+            'recurrence': {
+                'start_datetime': on(2, 18).isoformat(),
+                'end_datetime': on(2, 19).isoformat(),
+                'freq': 'weekly',
+                'count': 4,
+            },
+        }
+        response = self.client.post(self.url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 3)
+        self.assertEqual([r['status'] for r in response.data['results']],
+                         ['creada', 'conflicto', 'creada', 'creada'])
+        self.assertEqual(Reservation.objects.filter(facility=self.facility).count(), 4)
+
+    def test_ranges_conflicting_within_batch(self):
+        payload = {
+            'facility': self.facility.id,
+            'ranges': [
+                {'start_datetime': on(2, 8).isoformat(), 'end_datetime': on(2, 10).isoformat()},
+                {'start_datetime': on(2, 9).isoformat(), 'end_datetime': on(2, 11).isoformat()},
+            ],
+        }
+        response = self.client.post(self.url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([r['status'] for r in response.data['results']], ['creada', 'conflicto'])
+
+    @skipUnless(connection.vendor == 'sqlite', 'solo SQLite')
+    def test_sqlite_takes_the_write_lock_before_reading(self):
+        updated_at = self.facility.updated_at
+        with CaptureQueriesContext(connection) as context:
+            Reservation.objects.book_many(self.facility, self.user, [(on(2, 8), on(2, 9))])
+        statements = [q['sql'] for q in context.captured_queries
+                      if not q['sql'].startswith(('SAVEPOINT', 'RELEASE'))]
+        # con BEGIN diferido la primera sentencia de la transacción escribe
+        self.assertTrue(statements[0].startswith('UPDATE "api_facility"'), statements[0])
+        self.facility.refresh_from_db()
+        self.assertEqual(self.facility.updated_at, updated_at)
+
+    def test_requires_ranges_or_recurrence(self):
+        response = self.client.post(self.url, {'facility': self.facility.id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
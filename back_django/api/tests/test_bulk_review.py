@@ -0,0 +1,152 @@
+from django.core import mail
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+
+from api.models import (CustomUser, Facility, Reservation, LeaveRequest, ShiftAssignment,
+                        OutboxEmail)
+from api.authentication import token_cache
+from api.outbox import drain_outbox
+
+
+class BulkReviewTests(APITestCase):
+    def setUp(self):
+        self.admin = CustomUser.objects.create_user(
+            username='admin', email='admin@example.com', password='adminpass',
+            first_name='Admin', last_name='Uno', telefono='3000000000', role=CustomUser.ADMIN
+        )
+        self.admin.is_active = True
+        self.admin.is_staff = True
+        self.admin.save()
+        token = Token.objects.create(user=self.admin)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+
+        self.employee = CustomUser.objects.create_user(
+            username='emp', email='emp@example.com', password='emppass',
+            first_name='Emp', last_name='Tres', telefono='3002222222',
+            role=CustomUser.EMPLEADO, subrole=CustomUser.SEGURIDAD
+        )
+        self.facility = Facility.objects.create(name='Salón', is_reserved=True)
+
+    def _reservations(self, n):
+        now = timezone.now()
+        return [
+            Reservation.objects.create(
+                facility=self.facility, user=self.employee,
+                start_datetime=now + timezone.timedelta(hours=2 * i),
+                end_datetime=now + timezone.timedelta(hours=2 * i + 1)
+            )
+            for i in range(n)
+        ]
+
+    def test_reservation_bulk_review_constant_queries(self):
+        url = reverse('reservations-bulk-review')
+        few = [r.id for r in self._reservations(2)]
+        token_cache.clear()
+        # token, reservas, un único UPDATE, un único INSERT al outbox + savepoint
+        with self.assertNumQueries(6):
+            self.client.post(url, {'ids': few, 'decision': 'aprobada'}, format='json')
+        many = [r.id for r in self._reservations(20)]
+        drain_outbox()
+        mail.outbox.clear()
+        token_cache.clear()
+        with self.assertNumQueries(6):
+            response = self.client.post(url, {'ids': many, 'decision': 'rechazada'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(sorted(response.data['reviewed']), sorted(many))
+        self.assertEqual(Reservation.objects.filter(status='rechazada').count(), 20)
+        self.assertEqual(drain_outbox(), (20, 0))
+        self.assertEqual(len(mail.outbox), 20)
+
+    def test_leave_bulk_approve_removes_covered_shifts(self):
+        today = timezone.now().date()
+        leaves = [
+            LeaveRequest.objects.create(
+                employee=self.employee, type='permiso', start_date=today,
+                end_date=today + timezone.timedelta(days=1), reason='Motivo',
+                document=SimpleUploadedFile('req.txt', b'data')
+            )
+            for _ in range(2)
+        ]
+        ShiftAssignment.objects.create(
+            employee=self.employee, area='seguridad', facility=self.facility,
+            start_datetime=timezone.now(), end_datetime=timezone.now() + timezone.timedelta(hours=1)
+        )
+        url = reverse('leave-bulk-review')
+        response = self.client.post(
+            url, {'ids': [leave.id for leave in leaves], 'decision': 'aprobada'}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(LeaveRequest.objects.filter(status='aprobada', reviewed_by=self.admin).count(), 2)
+        self.assertFalse(ShiftAssignment.objects.filter(employee=self.employee).exists())
+        drain_outbox()
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_bulk_review_rejects_invalid_decision(self):
+        url = reverse('reservations-bulk-review')
+        response = self.client.post(url, {'ids': [1], 'decision': 'tal vez'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class OutboxTests(APITestCase):
+    def test_drain_retries_with_backoff_then_fails(self):
+        OutboxEmail.objects.queue([('Asunto', 'Cuerpo', None, ['a@example.com'])])
+
+        class BrokenConnection:
+            def open(self):
+                return False
+
+            def close(self):
+                pass
+
+            def send_messages(self, messages):
+                raise OSError('SMTP caído')
+
+        self.assertEqual(drain_outbox(connection=BrokenConnection()), (0, 1))
+        email = OutboxEmail.objects.get()
+        self.assertEqual((email.status, email.attempts), (OutboxEmail.PENDIENTE, 1))
+        self.assertGreater(email.next_attempt_at, timezone.now())
+        # aún no vence el reintento: el lote queda vacío
+        self.assertEqual(drain_outbox(), (0, 0))
+        OutboxEmail.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(drain_outbox(max_attempts=2, connection=BrokenConnection()), (0, 1))
+        self.assertEqual(OutboxEmail.objects.get().status, OutboxEmail.FALLIDO)
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_unreachable_server_is_retried_with_backoff(self):
+        OutboxEmail.objects.queue([('Asunto', 'Cuerpo', None, ['a@example.com']),
+                                   ('Asunto', 'Cuerpo', None, ['b@example.com'])])
+
+        class RefusedConnection:
+            def open(self):
+                raise ConnectionRefusedError('conexión rechazada')
+
+            def close(self):
+                pass
+
+        self.assertEqual(drain_outbox(connection=RefusedConnection()), (0, 2))
+        for email in OutboxEmail.objects.all():
+            self.assertEqual((email.status, email.attempts), (OutboxEmail.PENDIENTE, 1))
+            self.assertIn('rechazada', email.last_error)
+            self.assertGreater(email.next_attempt_at, timezone.now())
+
+    def test_claimed_batch_is_not_taken_by_another_worker(self):
+        OutboxEmail.objects.queue([('Asunto', 'Cuerpo', None, ['a@example.com'])])
+        test_case = self
+
+        class SlowConnection:
+            def open(self):
+                # otro worker mientras este envía: el correo ya está tomado
+                test_case.assertEqual(drain_outbox(), (0, 0))
+
+            def close(self):
+                pass
+
+            def send_messages(self, messages):
+                return len(messages)
+
+        self.assertEqual(drain_outbox(connection=SlowConnection()), (1, 0))
+        self.assertEqual(OutboxEmail.objects.get().status, OutboxEmail.ENVIADO)
@@ -0,0 +1,59 @@
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from api.models import Tower, Facility, ShiftAssignment, Reservation
+from helpers import make_admin, make_employee, make_resident, on
+
+
+class CalendarTests(APITestCase):
+    def setUp(self):
+        self.admin = make_admin()
+        self.employee = make_employee(first_name='Ana', last_name='Ruiz')
+        self.owner = make_resident()
+        self.tower = Tower.objects.create(name='Torre A', num_floors=10)
+        self.facility = Facility.objects.create(name='Gimnasio', is_reserved=True)
+        for day, hour in ((2, 6), (2, 22), (4, 14), (9, 6)):
+            ShiftAssignment.objects.create(employee=self.employee, area='seguridad',
+                                           tower=self.tower, start_datetime=on(day, hour),
+                                           end_datetime=on(day, hour + 8 if hour < 16 else 23))
+        for user, day in ((self.owner, 3), (self.admin, 3), (self.owner, 10)):
+            Reservation.objects.create(facility=self.facility, user=user,
+                                       start_datetime=on(day, 18), end_datetime=on(day, 19))
+        self.week = {'start': '2025-06-02', 'end': '2025-06-08'}
+
+    def test_shift_calendar_groups_week_by_day(self):
+        self.client.force_authenticate(self.admin)
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('shift-calendar'), self.week)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        days = response.data['days']
+        self.assertEqual(list(days), [f'2025-06-0{d}' for d in range(2, 9)])
+        self.assertEqual([len(v) for v in days.values()], [2, 0, 1, 0, 0, 0, 0])
+        first = days['2025-06-02'][0]
+        self.assertEqual(first['employee_name'], 'Ana Ruiz')
+        self.assertEqual(first['location'], 'Torre A')
+
+    def test_employee_sees_only_own_shifts(self):
+        self.client.force_authenticate(self.owner)
+        response = self.client.get(reverse('shift-calendar'), self.week)
+        self.assertEqual(sum(len(v) for v in response.data['days'].values()), 0)
+
+    def test_reservation_calendar(self):
+        self.client.force_authenticate(self.owner)
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('reservations-calendar'), self.week)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        [reservation] = response.data['days']['2025-06-03']
+        self.assertEqual(reservation['facility_name'], 'Gimnasio')
+        self.assertEqual(reservation['user'], self.owner.id)
+        self.client.force_authenticate(self.admin)
+        response = self.client.get(reverse('reservations-calendar'), self.week)
+        self.assertEqual(len(response.data['days']['2025-06-03']), 2)
+
+    def test_calendar_validates_range(self):
+        self.client.force_authenticate(self.admin)
+        for params in ({'start': '2025-06-02'}, {'start': '2025-06-02', 'end': '2025-08-02'},
+                       {'start': '2025-06-08', 'end': '2025-06-02'}):
+            response = self.client.get(reverse('shift-calendar'), params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
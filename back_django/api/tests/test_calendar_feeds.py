@@ -0,0 +1,82 @@
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from api.ical import fold
+from api.models import Tower, Facility, ShiftAssignment, Reservation, CalendarFeed
+from helpers import make_employee, on
+
+
+class FoldTests(SimpleTestCase):
+    def test_long_lines_are_folded_at_75_octets(self):
+        folded = fold('SUMMARY:' + 'ñ' * 80)
+        lines = folded.split('\r\n')[:-1]
+        self.assertTrue(all(len(line.encode('utf-8')) <= 75 for line in lines))
+        self.assertTrue(all(line.startswith(' ') for line in lines[1:]))
+        self.assertEqual(''.join(line[1:] if i else line for i, line in enumerate(lines)),
+                         'SUMMARY:' + 'ñ' * 80)
+
+
+class CalendarFeedTests(APITestCase):
+    def setUp(self):
+        self.employee = make_employee()
+        self.tower = Tower.objects.create(name='Torre A, norte', num_floors=10)
+        self.shift = ShiftAssignment.objects.create(
+            employee=self.employee, area='seguridad', tower=self.tower,
+            start_datetime=on(2, 6), end_datetime=on(2, 14)
+        )
+        self.client.force_authenticate(self.employee)
+        self.urls = self.client.get(reverse('user-calendar-feed')).data
+        self.client.force_authenticate(None)
+
+    def path(self, kind):
+        return self.urls[kind].replace('http://testserver', '')
+
+    def test_shift_feed_streams_ics(self):
+        with self.assertNumQueries(3):  # feed, versión y filas
+            response = self.client.get(self.path('shifts'))
+            body = b''.join(response.streaming_content).decode()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/calendar'))
+        self.assertIn(f'UID:shift-{self.shift.id}@domus\r\n', body)
+        self.assertIn('DTSTART:20250602T060000Z\r\n', body)
+        self.assertIn('LOCATION:Torre A\\, norte\r\n', body)
+        self.assertTrue(body.endswith('END:VCALENDAR\r\n'))
+
+    def test_conditional_requests_get_304_until_something_changes(self):
+        response = self.client.get(self.path('shifts'))
+        etag = response['ETag']
+        with self.assertNumQueries(2):
+            response = self.client.get(self.path('shifts'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.shift.end_datetime = on(2, 15)
+        self.shift.save()
+        response = self.client.get(self.path('shifts'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_renaming_the_location_changes_the_etag(self):
+        etag = self.client.get(self.path('shifts'))['ETag']
+        self.tower.name = 'Torre B'
+        self.tower.save()
+        response = self.client.get(self.path('shifts'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('LOCATION:Torre B\r\n', b''.join(response.streaming_content).decode())
+
+    def test_reservation_feed_maps_status(self):
+        facility = Facility.objects.create(name='Gimnasio', is_reserved=True)
+        Reservation.objects.create(facility=facility, user=self.employee, status='aprobada',
+                                   start_datetime=on(3, 18), end_datetime=on(3, 19))
+        response = self.client.get(self.path('reservations'))
+        body = b''.join(response.streaming_content).decode()
+        self.assertIn('STATUS:CONFIRMED\r\n', body)
+        self.assertNotIn('shift-', body)
+
+    def test_rotating_the_token_invalidates_old_urls(self):
+        old = self.path('shifts')
+        self.client.force_authenticate(self.employee)
+        response = self.client.post(reverse('user-calendar-feed'))
+        self.assertNotEqual(response.data['shifts'], self.urls['shifts'])
+        self.assertEqual(CalendarFeed.objects.count(), 1)
+        self.assertEqual(self.client.get(old).status_code, status.HTTP_404_NOT_FOUND)
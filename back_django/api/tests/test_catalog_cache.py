@@ -0,0 +1,81 @@
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from api.catalog import catalog_cache
+from api.models import CustomUser, Tower, Apartment, Facility, ParkingSpot
+
+
+class CatalogCacheTests(APITestCase):
+    def setUp(self):
+        self.admin = CustomUser.objects.create_superuser(
+            username='admin', email='admin@example.com', password='adminpass',
+            first_name='Admin', last_name='Uno', telefono='3000000000', role=CustomUser.ADMIN
+        )
+        self.client.force_authenticate(self.admin)
+        self.tower = Tower.objects.create(name='Torre A', num_floors=10)
+        Facility.objects.create(name='Gimnasio', is_reserved=True)
+
+    def test_second_read_is_served_from_cache(self):
+        url = reverse('facility-list')
+        first = self.client.get(url)
+        with self.assertNumQueries(0):
+            second = self.client.get(url)
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.data, first.data)
+        # otra página o filtro es otra entrada
+        with self.assertNumQueries(2):
+            self.client.get(url, {'page_size': 5})
+        stats = catalog_cache.stats()['models']['api.facility']
+        self.assertEqual((stats['hits'], stats['misses']), (1, 2))
+
+    def test_revalidation_uses_the_catalog_version(self):
+        url = reverse('facility-list')
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        Facility.objects.create(name='Piscina', is_reserved=True)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_save_and_delete_invalidate(self):
+        url = reverse('tower-detail', args=[self.tower.id])
+        self.client.get(url)
+        self.tower.name = 'Torre Norte'
+        self.tower.save()
+        self.assertEqual(self.client.get(url).data['name'], 'Torre Norte')
+        self.client.get(reverse('tower-list'))
+        self.client.delete(url)
+        self.assertEqual(self.client.get(reverse('tower-list')).data['count'], 0)
+
+    def test_set_null_on_delete_invalidates_dependents(self):
+        owner = CustomUser.objects.create_user(
+            username='prop', email='prop@example.com', password='pass', first_name='P',
+            last_name='D', telefono='3000000002', role=CustomUser.PROPIETARIO
+        )
+        apartment = Apartment.objects.create(tower=self.tower, floor=1, number='101', owner=owner,
+                                             rooms=2, bathrooms=1, rent_price=1, parking_slots=1)
+        ParkingSpot.objects.create(apartment=apartment, identifier='P1')
+        self.assertEqual(self.client.get(reverse('apartment-list')).data['results'][0]['owner'],
+                         owner.id)
+        self.client.get(reverse('parking-list'))
+        owner.delete()
+        self.assertIsNone(self.client.get(reverse('apartment-list')).data['results'][0]['owner'])
+        # borrar la torre borra en cascada el apartamento y deja el parqueadero sin él
+        self.tower.delete()
+        self.assertIsNone(self.client.get(reverse('parking-list')).data['results'][0]['apartment'])
+
+    def test_permissions_are_checked_on_cached_responses(self):
+        self.client.get(reverse('tower-list'))
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get(reverse('tower-list')).status_code,
+                         status.HTTP_403_FORBIDDEN)
+
+    def test_cache_stats_endpoint(self):
+        self.client.get(reverse('facility-list'))
+        self.client.get(reverse('facility-list'))
+        response = self.client.get(reverse('cache_stats'))
+        self.assertEqual(response.data['catalog']['hits'], 1)
+        self.assertIn('token_auth', response.data)
@@ -0,0 +1,100 @@
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from api.models import CustomUser, Facility, Reservation
+
+
+class ConditionalGetTests(APITestCase):
+    def setUp(self):
+        self.admin = CustomUser.objects.create_superuser(
+            username='admin', email='admin@example.com', password='adminpass',
+            first_name='Admin', last_name='Uno', telefono='3000000000', role=CustomUser.ADMIN
+        )
+        self.client.force_authenticate(self.admin)
+        self.facility = Facility.objects.create(name='Gimnasio', is_reserved=True)
+        now = timezone.now()
+        self.reservations = [
+            Reservation.objects.create(
+                facility=self.facility, user=self.admin,
+                start_datetime=now + timezone.timedelta(hours=2 * i),
+                end_datetime=now + timezone.timedelta(hours=2 * i + 1)
+            )
+            for i in range(3)
+        ]
+
+    def _revalidate(self, url, etag, **params):
+        return self.client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+
+    def test_unchanged_list_returns_304_without_serializing(self):
+        url = reverse('reservations-list')
+        first = self.client.get(url)
+        etag = first['ETag']
+        self.assertTrue(etag.startswith('W/"'))
+        # solo la consulta de la huella
+        with self.assertNumQueries(1):
+            response = self._revalidate(url, etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+        self.assertFalse(response.content)
+        # otra página u otro filtro tiene otro ETag
+        other = self._revalidate(url, etag, page_size=2)
+        self.assertEqual(other.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(other['ETag'], etag)
+
+    def test_update_delete_and_bulk_review_change_the_etag(self):
+        url = reverse('reservations-list')
+        etag = self.client.get(url)['ETag']
+        reservation = self.reservations[0]
+        self.client.patch(reverse('reservations-detail', args=[reservation.id]),
+                          {'status': 'aprobada'}, format='json')
+        response = self._revalidate(url, etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+
+        self.client.post(reverse('reservations-bulk-review'),
+                         {'ids': [r.id for r in self.reservations[1:]], 'decision': 'rechazada'},
+                         format='json')
+        response = self._revalidate(url, etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+
+        self.client.delete(reverse('reservations-detail', args=[reservation.id]))
+        response = self._revalidate(url, etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 2)
+
+    def test_related_rename_changes_the_etag(self):
+        # la reserva serializa el nombre de la instalación
+        url = reverse('reservations-detail', args=[self.reservations[0].id])
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self._revalidate(url, etag).status_code,
+                         status.HTTP_304_NOT_MODIFIED)
+        self.facility.name = 'Gimnasio Norte'
+        self.facility.save()
+        response = self._revalidate(url, etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['facility_name'], 'Gimnasio Norte')
+
+    def test_catalog_detail_and_missing_object(self):
+        url = reverse('facility-detail', args=[self.facility.id])
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self._revalidate(url, etag).status_code,
+                         status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(self._revalidate(url, '*').status_code,
+                         status.HTTP_304_NOT_MODIFIED)
+        missing = self.client.get(reverse('facility-detail', args=[self.facility.id + 100]),
+                                  HTTP_IF_NONE_MATCH='*')
+        self.assertEqual(missing.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_me_revalidates_without_queries(self):
+        url = reverse('user-me')
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(0):
+            response = self._revalidate(url, etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.admin.first_name = 'Administra'
+        self.admin.save()
+        self.client.force_authenticate(CustomUser.objects.get(pk=self.admin.pk))
+        self.assertEqual(self._revalidate(url, etag).status_code, status.HTTP_200_OK)
@@ -0,0 +1,79 @@
+from datetime import time
+
+import numpy as np
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from api.coverage import timeline, runs
+from api.models import Tower, Facility, ShiftAssignment
+from helpers import make_admin, make_employee, on
+
+
+class TimelineTests(SimpleTestCase):
+    def test_timeline_counts_overlapping_shifts(self):
+        counts = timeline(np.array([0, 2, 8]), np.array([4, 6, 12]), 10)
+        self.assertEqual(counts.tolist(), [1, 1, 2, 2, 1, 1, 0, 0, 1, 1])
+
+    def test_runs(self):
+        starts, ends = runs(np.array([True, True, False, True]))
+        self.assertEqual((starts.tolist(), ends.tolist()), ([0, 3], [2, 4]))
+
+
+class CoverageViewTests(APITestCase):
+    def setUp(self):
+        self.admin = make_admin()
+        self.client.force_authenticate(self.admin)
+        self.guards = [make_employee() for _ in range(2)]
+        self.tower = Tower.objects.create(name='Torre A', num_floors=10)
+        self.facility = Facility.objects.create(name='Piscina')
+        self.url = reverse('shift-coverage')
+
+    def shift(self, employee, start, end):
+        ShiftAssignment.objects.create(employee=employee, area='seguridad', tower=self.tower,
+                                       start_datetime=start, end_datetime=end)
+
+    def test_gaps_and_understaffed_windows(self):
+        # día 2: 22:00-06:00 y un refuerzo 00:00-02:00; día 3: 22:00-02:00
+        self.shift(self.guards[0], on(2, 22), on(3, 6))
+        self.shift(self.guards[1], on(3, 0), on(3, 2))
+        self.shift(self.guards[0], on(3, 22), on(4, 2))
+        response = self.client.get(self.url, {
+            'start': '2025-06-02', 'end': '2025-06-03', 'area': 'seguridad',
+            'tower': self.tower.id, 'min_staff': 2,
+            'daily_start': '22:00', 'daily_end': '06:00',
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        [result] = response.data['results']
+        self.assertEqual(result['observed_minutes'], (6 + 8 + 2) * 60)
+        # el 4 de junio cae fuera del rango: la franja nocturna del día 3 termina a medianoche
+        self.assertEqual(result['uncovered_minutes'], 6 * 60)
+        self.assertEqual([(g['start'], g['end']) for g in result['gaps']],
+                         [(on(2, 0), on(2, 6))])
+        self.assertEqual([(w['start'], w['end'], w['staff']) for w in result['understaffed']],
+                         [(on(2, 22), on(3, 0), 1), (on(3, 2), on(3, 6), 1),
+                          (on(3, 22), on(4, 0), 1)])
+
+    def test_reports_every_location_and_area_in_constant_queries(self):
+        self.shift(self.guards[0], on(2, 6), on(2, 14))
+        with self.assertNumQueries(3):  # torres, instalaciones y turnos
+            response = self.client.get(self.url, {'start': '2025-01-01', 'end': '2025-12-31'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        keys = [(r['location'], r['area']) for r in response.data['results']]
+        self.assertEqual(keys, [('tower', 'aseo'), ('tower', 'seguridad'),
+                                ('facility', 'aseo'), ('facility', 'seguridad')])
+        self.assertEqual(response.data['results'][1]['uncovered_minutes'], (365 * 24 - 8) * 60)
+
+    def test_invalid_parameters(self):
+        for params in ({'start': '2025-06-02'},
+                       {'start': '2025-06-02', 'end': '2026-06-05'},
+                       {'start': '2025-06-02', 'end': '2025-06-03', 'area': 'x'},
+                       {'start': '2025-06-02', 'end': '2025-06-03', 'daily_start': '22:00'},
+                       {'start': '2025-06-02', 'end': '2025-06-03',
+                        'daily_start': '25:00', 'daily_end': '06:00'},
+                       {'start': '2025-06-02', 'end': '2025-06-03',
+                        'daily_start': '22:00', 'daily_end': '06:61'},
+                       {'start': '2025-06-02', 'end': '2025-06-03', 'tower': 'x'}):
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
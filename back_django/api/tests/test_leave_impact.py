@@ -0,0 +1,89 @@
+from datetime import date
+
+from django.core.exceptions import ValidationError
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from api.constraints import SHIFT_OVERLAP
+from api.models import CustomUser, Tower, ShiftAssignment, LeaveRequest, OutboxEmail
+from helpers import make_admin, make_employee, on
+
+
+class LeaveImpactTests(APITestCase):
+    def setUp(self):
+        self.admin = make_admin()
+        self.client.force_authenticate(self.admin)
+        self.absent = make_employee()
+        self.busy = make_employee()
+        self.free = make_employee()
+        self.cleaner = make_employee(CustomUser.LIMPIEZA)
+        self.tower = Tower.objects.create(name='Torre A', num_floors=10)
+        self.shifts = [
+            ShiftAssignment.objects.create(employee=self.absent, area='seguridad', tower=self.tower,
+                                           start_datetime=on(day, 6), end_datetime=on(day, 14))
+            for day in (3, 4)
+        ]
+        # el día 3 el otro guarda ya tiene turno
+        ShiftAssignment.objects.create(employee=self.busy, area='seguridad', tower=self.tower,
+                                       start_datetime=on(3, 8), end_datetime=on(3, 16))
+        self.leave = LeaveRequest.objects.create(
+            employee=self.absent, type='permiso', start_date=date(2025, 6, 3),
+            end_date=date(2025, 6, 4), reason='x', document='leave_docs/x.txt'
+        )
+
+    def test_impact_lists_shifts_and_candidates(self):
+        # solicitud, turnos cubiertos, empleado, candidatos, sus turnos y sus permisos
+        with self.assertNumQueries(6):
+            response = self.client.get(reverse('leave-impact', args=[self.leave.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        first, second = response.data['shifts']
+        self.assertEqual(first['id'], self.shifts[0].id)
+        self.assertEqual([c['id'] for c in first['candidates']], [self.free.id])
+        self.assertEqual(first['suggested'], self.free.id)
+        # el día 4 ambos están libres; primero el de menos horas
+        self.assertEqual([c['id'] for c in second['candidates']], [self.free.id, self.busy.id])
+        self.assertEqual(second['suggested'], self.busy.id)
+        self.assertEqual(ShiftAssignment.objects.filter(employee=self.absent).count(), 2)
+
+    def test_approve_with_reassign(self):
+        OutboxEmail.objects.all().delete()
+        response = self.client.post(reverse('leave-review', args=[self.leave.id]),
+                                    {'decision': 'aprobada', 'reassign': True}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['reassigned'], {self.shifts[0].id: self.free.id,
+                                                       self.shifts[1].id: self.busy.id})
+        self.assertFalse(ShiftAssignment.objects.filter(employee=self.absent).exists())
+        self.assertEqual(ShiftAssignment.objects.count(), 3)
+        # correo al empleado con permiso y a cada reemplazo
+        self.assertEqual(OutboxEmail.objects.count(), 3)
+
+    def test_approve_rejects_a_busy_replacement(self):
+        # el día 3 el otro guarda ya tiene turno de 8 a 16
+        with self.assertRaisesMessage(ValidationError, SHIFT_OVERLAP):
+            self.leave.approve(self.admin, {self.shifts[0].id: self.busy.id,
+                                            self.shifts[1].id: self.free.id})
+        self.leave.refresh_from_db()
+        self.assertEqual(self.leave.status, 'pendiente')
+        self.assertEqual(ShiftAssignment.objects.filter(employee=self.absent).count(), 2)
+        # un reemplazo con permiso aprobado tampoco sirve
+        LeaveRequest.objects.create(
+            employee=self.free, type='permiso', start_date=date(2025, 6, 4),
+            end_date=date(2025, 6, 4), reason='x', document='leave_docs/y.txt', status='aprobada'
+        )
+        with self.assertRaisesMessage(ValidationError, SHIFT_OVERLAP):
+            self.leave.approve(self.admin, {self.shifts[1].id: self.free.id})
+        self.leave.approve(self.admin, {self.shifts[1].id: self.busy.id})
+        self.assertEqual(ShiftAssignment.objects.get(pk=self.shifts[1].id).employee, self.busy)
+
+    def test_approve_without_reassign_deletes_shifts(self):
+        response = self.client.post(reverse('leave-review', args=[self.leave.id]),
+                                    {'decision': 'aprobada'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['reassigned'], {})
+        self.assertEqual(ShiftAssignment.objects.count(), 1)
+
+    def test_impact_is_admin_only(self):
+        self.client.force_authenticate(self.absent)
+        response = self.client.get(reverse('leave-impact', args=[self.leave.id]))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
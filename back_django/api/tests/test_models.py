@@ -1,10 +1,14 @@
+from io import StringIO
+
 from django.test import TestCase, override_settings
 from django.core.exceptions import ValidationError
 from django.core import mail
+from django.core.management import call_command
 from django.utils import timezone
 from django.core.files.uploadedfile import SimpleUploadedFile
 
-from api.models import CustomUser, Tower, Facility, ShiftAssignment, Reservation, LeaveRequest
+from api.models import (CustomUser, Tower, Facility, ShiftAssignment, Reservation, LeaveRequest,
+                        OutboxEmail)
 
 class ModelTests(TestCase):
     def setUp(self):
@@ -113,5 +117,8 @@ class ModelTests(TestCase):
         lr.approve(reviewer=self.user)
         # Verificamos que no existan turnos
         self.assertFalse(ShiftAssignment.objects.filter(employee=self.user).exists())
-        # Verificamos correo
+        # El correo queda en el outbox hasta que corre el worker
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(OutboxEmail.objects.filter(recipients=[self.user.email]).count(), 1)
+        call_command('send_outbox', stdout=StringIO())
         self.assertEqual(len(mail.outbox), 1)
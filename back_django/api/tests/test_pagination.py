@@ -0,0 +1,89 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from api.models import CustomUser, Facility, Reservation
+
+
+class PaginationTests(APITestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            username='prop', email='prop@example.com', password='userpass',
+            first_name='Prop', last_name='Dos', telefono='3001111111', role=CustomUser.PROPIETARIO
+        )
+        self.user.is_active = True
+        self.user.save()
+        self.client.force_authenticate(self.user)
+        facility = Facility.objects.create(name='Gimnasio', is_reserved=True)
+        start = timezone.now()
+        # dos reservas por hora de inicio para cubrir empates en start_datetime
+        self.reservations = [
+            Reservation.objects.create(
+                facility=facility if i % 2 else Facility.objects.create(name=f'Sala {i}'),
+                user=self.user,
+                start_datetime=start + timezone.timedelta(hours=i // 2),
+                end_datetime=start + timezone.timedelta(hours=i // 2, minutes=30)
+            )
+            for i in range(25)
+        ]
+        self.url = reverse('reservations-list')
+
+    def test_page_number_is_default(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['count'], 25)
+        self.assertEqual(len(response.data['results']), 10)
+
+    def test_client_page_size_is_capped(self):
+        response = self.client.get(self.url, {'page_size': 5})
+        self.assertEqual(len(response.data['results']), 5)
+        response = self.client.get(self.url, {'page_size': 1000})
+        self.assertEqual(len(response.data['results']), 25)
+
+    def test_cursor_mode_walks_all_rows_without_count(self):
+        seen = []
+        url, params = self.url, {'pagination': 'cursor', 'page_size': 4}
+        while url:
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(url, params)
+            self.assertNotIn('count', response.data)
+            self.assertFalse(any('COUNT(' in q['sql'] for q in ctx.captured_queries))
+            self.assertNotIn('ETag', response)
+            seen.extend(row['id'] for row in response.data['results'])
+            url, params = response.data['next'], None
+        expected = sorted(self.reservations, key=lambda r: (r.start_datetime, r.id), reverse=True)
+        self.assertEqual(seen, [r.id for r in expected])
+
+    def test_cursor_pages_through_ties_larger_than_a_page(self):
+        facility = Facility.objects.create(name='Salón', is_reserved=True)
+        start = timezone.now() + timezone.timedelta(days=30)
+        # como los turnos de un roster: muchas filas con el mismo inicio
+        tied = Reservation.objects.bulk_create([
+            Reservation(facility=facility, user=self.user, status='rechazada',
+                        start_datetime=start, end_datetime=start + timezone.timedelta(hours=1))
+            for _ in range(11)
+        ])
+        expected = sorted(self.reservations + tied, key=lambda r: (r.start_datetime, r.id),
+                          reverse=True)
+        pages = []
+        url, params = self.url, {'pagination': 'cursor', 'page_size': 4}
+        while url:
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(url, params)
+            self.assertFalse(any('OFFSET' in q['sql'] for q in ctx.captured_queries))
+            pages.append(response.data)
+            url, params = response.data['next'], None
+        self.assertEqual([row['id'] for page in pages for row in page['results']],
+                         [r.id for r in expected])
+        # y de vuelta con previous, página por página
+        url, seen = pages[-1]['previous'], []
+        while url:
+            response = self.client.get(url)
+            seen[:0] = [row['id'] for row in response.data['results']]
+            url = response.data['previous']
+        self.assertEqual(seen, [r.id for r in expected[:-len(pages[-1]['results'])]])
+
+    def test_invalid_cursor_is_404(self):
+        response = self.client.get(self.url, {'cursor': 'cD1bMV0='})
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,200 @@
+"""
+Pruebas de las restricciones de exclusión y del pool de PostgreSQL. Corren
+con DB_ENGINE=postgresql (la base de pruebas se crea y se borra sola); con
+SQLite se omiten.
+"""
+import threading
+import time
+from importlib import import_module
+from unittest import skipUnless
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, connection, connections, transaction
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase, APITransactionTestCase
+
+from api.constraints import (EXCLUSION_VIOLATION, RESERVATION_OVERLAP, SHIFT_OVERLAP,
+                             is_exclusion_violation, overlaps_enforced)
+from api.models import CustomUser, Facility, LeaveRequest, Reservation, ShiftAssignment
+
+
+class ExclusionViolationTests(APITestCase):
+    def test_detects_the_sqlstate_of_the_driver_error(self):
+        class DriverError(Exception):
+            sqlstate = EXCLUSION_VIOLATION
+
+        exc = IntegrityError('conflicting key value violates exclusion constraint')
+        exc.__cause__ = DriverError()
+        self.assertTrue(is_exclusion_violation(exc))
+        exc.__cause__ = Exception()
+        self.assertFalse(is_exclusion_violation(exc))
+
+    @skipUnless(connection.vendor == 'sqlite', 'solo SQLite')
+    def test_sqlite_keeps_the_python_checks(self):
+        self.assertFalse(overlaps_enforced())
+
+    def test_migration_reports_existing_overlaps(self):
+        migration = import_module('api.migrations.0014_overlap_exclusion_constraints')
+        employee = CustomUser.objects.create_user(
+            username='emp', email='emp@example.com', password='pass',
+            first_name='Emp', last_name='Uno', telefono='3001111111',
+            role=CustomUser.EMPLEADO, subrole=CustomUser.SEGURIDAD
+        )
+        gym = Facility.objects.create(name='Gimnasio', is_reserved=True)
+        start = timezone.now().replace(microsecond=0)
+        hour = timezone.timedelta(hours=1)
+        # filas que la verificación en Python dejó pasar en una carrera
+        _, second, _ = ShiftAssignment.objects.bulk_create([
+            ShiftAssignment(employee=employee, area='seguridad', facility=gym,
+                            start_datetime=start + i * hour, end_datetime=start + (i + 2) * hour)
+            for i in (0, 1, 4)
+        ])
+        self.assertEqual(migration.overlapping_ids(ShiftAssignment.objects.all(), 'employee'),
+                         [second.id])
+        self.assertEqual(migration.overlapping_ids(Reservation.objects.all(), 'facility'), [])
+
+
+@skipUnless(connection.vendor == 'postgresql', 'requiere PostgreSQL (DB_ENGINE=postgresql)')
+class PostgresOverlapConstraintTests(APITestCase):
+    def setUp(self):
+        self.admin = CustomUser.objects.create_superuser(
+            username='admin', email='admin@example.com', password='adminpass',
+            first_name='Admin', last_name='Uno', telefono='3000000000', role=CustomUser.ADMIN
+        )
+        self.admin.is_active = True
+        self.admin.save()
+        self.employee = CustomUser.objects.create_user(
+            username='emp', email='emp@example.com', password='pass',
+            first_name='Emp', last_name='Uno', telefono='3001111111',
+            role=CustomUser.EMPLEADO, subrole=CustomUser.SEGURIDAD
+        )
+        self.gym = Facility.objects.create(name='Gimnasio', is_reserved=True)
+        self.start = timezone.now().replace(microsecond=0) + timezone.timedelta(days=1)
+        self.client.force_authenticate(self.admin)
+
+    def _range(self, hours_from, hours_to):
+        return (self.start + timezone.timedelta(hours=hours_from),
+                self.start + timezone.timedelta(hours=hours_to))
+
+    def test_reservation_overlap_is_rejected_by_the_database(self):
+        start, end = self._range(0, 2)
+        Reservation(facility=self.gym, user=self.admin,
+                    start_datetime=start, end_datetime=end).book()
+        start, end = self._range(1, 3)
+        with self.assertRaisesMessage(ValidationError, RESERVATION_OVERLAP):
+            Reservation(facility=self.gym, user=self.admin,
+                        start_datetime=start, end_datetime=end).book()
+        # los rangos son semiabiertos: la siguiente franja empieza donde acaba la anterior
+        start, end = self._range(2, 3)
+        Reservation(facility=self.gym, user=self.admin,
+                    start_datetime=start, end_datetime=end).book()
+        self.assertEqual(Reservation.objects.count(), 2)
+
+    def test_rejected_reservations_do_not_block(self):
+        start, end = self._range(0, 2)
+        Reservation.objects.create(facility=self.gym, user=self.admin, status='rechazada',
+                                   start_datetime=start, end_datetime=end)
+        Reservation(facility=self.gym, user=self.admin,
+                    start_datetime=start, end_datetime=end).book()
+        self.assertEqual(Reservation.objects.count(), 2)
+
+    def test_bulk_updates_cannot_bypass_the_constraint(self):
+        first = Reservation.objects.create(facility=self.gym, user=self.admin,
+                                           start_datetime=self._range(0, 1)[0],
+                                           end_datetime=self._range(0, 1)[1])
+        Reservation.objects.create(facility=self.gym, user=self.admin,
+                                   start_datetime=self._range(1, 2)[0],
+                                   end_datetime=self._range(1, 2)[1])
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Reservation.objects.filter(pk=first.pk).update(end_datetime=self._range(0, 2)[1])
+
+    def test_shift_overlap_returns_400_without_a_precheck_query(self):
+        start, end = self._range(0, 8)
+        ShiftAssignment.objects.create(employee=self.employee, area='seguridad',
+                                       facility=self.gym, start_datetime=start, end_datetime=end)
+        start, end = self._range(4, 12)
+        overlapping = ShiftAssignment(employee=self.employee, area='seguridad',
+                                      facility=self.gym, start_datetime=start, end_datetime=end)
+        with self.assertNumQueries(0):
+            overlapping.clean()
+        response = self.client.post(reverse('shift-list'), {
+            'employee': self.employee.id, 'area': 'seguridad', 'facility': self.gym.id,
+            'start_datetime': start.isoformat(), 'end_datetime': end.isoformat(),
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['non_field_errors'], [SHIFT_OVERLAP])
+        self.assertEqual(ShiftAssignment.objects.count(), 1)
+
+    def test_reassigning_onto_a_busy_employee_is_rejected(self):
+        other = CustomUser.objects.create_user(
+            username='emp2', email='emp2@example.com', password='pass',
+            first_name='Emp', last_name='Dos', telefono='3002222222',
+            role=CustomUser.EMPLEADO, subrole=CustomUser.SEGURIDAD
+        )
+        start, end = self._range(0, 8)
+        shift = ShiftAssignment.objects.create(employee=self.employee, area='seguridad',
+                                               facility=self.gym, start_datetime=start,
+                                               end_datetime=end)
+        ShiftAssignment.objects.create(employee=other, area='seguridad', facility=self.gym,
+                                       start_datetime=start, end_datetime=end)
+        day = timezone.localdate(start)
+        leave = LeaveRequest.objects.create(employee=self.employee, type='permiso',
+                                            start_date=day, end_date=day, reason='Cita')
+        with self.assertRaisesMessage(ValidationError, SHIFT_OVERLAP):
+            leave.approve(self.admin, {shift.pk: other.pk})
+        shift.refresh_from_db()
+        self.assertEqual(shift.employee_id, self.employee.id)
+
+    def test_connections_come_from_the_pool(self):
+        options = connection.settings_dict['OPTIONS']
+        if settings.POSTGRES_POOL:
+            self.assertEqual(options['pool'], settings.POSTGRES_POOL_OPTIONS)
+            self.assertIsNotNone(connection.pool)
+        else:
+            self.assertGreater(connection.settings_dict['CONN_MAX_AGE'], 0)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'requiere PostgreSQL (DB_ENGINE=postgresql)')
+class PostgresConcurrentAssignmentTests(APITransactionTestCase):
+    def setUp(self):
+        self.employee = CustomUser.objects.create_user(
+            username='emp', email='emp@example.com', password='pass',
+            first_name='Emp', last_name='Uno', telefono='3001111111',
+            role=CustomUser.EMPLEADO, subrole=CustomUser.SEGURIDAD
+        )
+        self.gym = Facility.objects.create(name='Gimnasio', is_reserved=True)
+        self.start = timezone.now().replace(microsecond=0) + timezone.timedelta(days=1)
+
+    def shift(self, hours_from, hours_to):
+        return ShiftAssignment(employee=self.employee, area='seguridad', facility=self.gym,
+                               start_datetime=self.start + timezone.timedelta(hours=hours_from),
+                               end_datetime=self.start + timezone.timedelta(hours=hours_to))
+
+    def test_assign_many_loses_the_race_with_a_validation_error(self):
+        inserted = threading.Event()
+
+        def competing_assignment():
+            try:
+                with transaction.atomic():
+                    self.shift(0, 8).save()
+                    inserted.set()
+                    # la otra transacción ya hizo su consulta de solapes
+                    time.sleep(0.5)
+            finally:
+                inserted.set()
+                connections.close_all()
+
+        competitor = threading.Thread(target=competing_assignment)
+        competitor.start()
+        inserted.wait()
+        try:
+            # la consulta previa no ve el turno sin confirmar; el INSERT espera
+            # a que la otra transacción confirme y la restricción lo rechaza
+            with self.assertRaisesMessage(ValidationError, SHIFT_OVERLAP):
+                ShiftAssignment.objects.assign_many([self.shift(4, 12), self.shift(12, 20)])
+        finally:
+            competitor.join()
+        self.assertEqual(ShiftAssignment.objects.count(), 1)
@@ -0,0 +1,111 @@
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from api.models import (CustomUser, Tower, Apartment, Facility, ParkingSpot,
+                        ShiftAssignment, LeaveRequest, Reservation)
+
+
+class ListQueryCountTests(APITestCase):
+    """
+    Cada listado debe ejecutar el mismo número de consultas sin importar
+    cuántas filas devuelve la página.
+    """
+    def setUp(self):
+        self.admin = CustomUser.objects.create_user(
+            username='admin', email='admin@example.com', password='adminpass',
+            first_name='Admin', last_name='Uno', telefono='3000000000', role=CustomUser.ADMIN
+        )
+        self.admin.is_active = True
+        self.admin.is_staff = True
+        self.admin.save()
+        self.client.force_authenticate(self.admin)
+        self.tower = Tower.objects.create(name='Torre A', num_floors=5)
+        self.facility = Facility.objects.create(name='Gimnasio', is_reserved=True)
+        self.created = 0
+
+    def _user(self):
+        self.created += 1
+        return CustomUser.objects.create_user(
+            username=f'user{self.created}', email=f'user{self.created}@example.com',
+            password='pass1234', first_name='Nombre', last_name=f'Apellido{self.created}',
+            telefono='3001111111', role=CustomUser.EMPLEADO, subrole=CustomUser.SEGURIDAD
+        )
+
+    def _slot(self):
+        start = timezone.now() + timezone.timedelta(hours=2 * self.created)
+        return start, start + timezone.timedelta(hours=1)
+
+    def _make(self, name):
+        user = self._user()
+        start, end = self._slot()
+        if name == 'reservations':
+            Reservation.objects.create(facility=self.facility, user=user,
+                                       start_datetime=start, end_datetime=end)
+        elif name == 'tower':
+            Tower.objects.create(name=f'Torre {self.created}', num_floors=3)
+        elif name == 'apartment':
+            Apartment.objects.create(tower=self.tower, floor=1, number=str(self.created),
+                                     owner=user, rooms=2, bathrooms=1, rent_price=1,
+                                     parking_slots=1)
+        elif name == 'facility':
+            Facility.objects.create(name=f'Sala {self.created}')
+        elif name == 'parking':
+            apartment = Apartment.objects.create(tower=self.tower, floor=1, number=str(self.created),
+                                                 owner=user, rooms=2, bathrooms=1,
+                                                 rent_price=1, parking_slots=1)
+            ParkingSpot.objects.create(apartment=apartment, identifier=f'P{self.created}')
+        elif name == 'shift':
+            ShiftAssignment.objects.create(employee=user, area='seguridad', tower=self.tower,
+                                           start_datetime=start, end_datetime=end)
+        elif name == 'leave':
+            LeaveRequest.objects.create(employee=user, type='permiso', start_date=start.date(),
+                                        end_date=end.date() + timezone.timedelta(days=1),
+                                        reason='Motivo', reviewed_by=self.admin,
+                                        document=SimpleUploadedFile('req.txt', b'data'))
+
+    def _count(self, name):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse(f'{name}-list'))
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def assertConstantQueries(self, name):
+        self._make(name)
+        few = self._count(name)
+        for _ in range(7):
+            self._make(name)
+        self.assertEqual(self._count(name), few, f'/{name}/ crece con el número de filas')
+
+    def test_reservations(self):
+        self.assertConstantQueries('reservations')
+
+    def test_towers(self):
+        self.assertConstantQueries('tower')
+
+    def test_apartments(self):
+        self.assertConstantQueries('apartment')
+
+    def test_facilities(self):
+        self.assertConstantQueries('facility')
+
+    def test_parkings(self):
+        self.assertConstantQueries('parking')
+
+    def test_shifts(self):
+        self.assertConstantQueries('shift')
+
+    def test_leaves(self):
+        self.assertConstantQueries('leave')
+
+    def test_users(self):
+        self.assertConstantQueries('user')
+
+    def test_reservation_user_name(self):
+        self._make('reservations')
+        row = self.client.get(reverse('reservations-list')).data['results'][0]
+        self.assertEqual(row['user_name'], 'Nombre Apellido1')
+        self.assertEqual(row['facility_name'], 'Gimnasio')
@@ -0,0 +1,188 @@
+"""
+Réplicas de lectura con dos archivos SQLite: la base de pruebas hace de
+principal y una copia en disco (tomada con la API de backup de SQLite) de
+réplica atrasada. Las pruebas confirman sus datos para poder copiarlos.
+"""
+import os
+import shutil
+import sqlite3
+import tempfile
+
+from django.core.cache import cache
+from django.db import connections
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITransactionTestCase
+
+from api.models import CustomUser, Facility, Reservation
+from api.replicas import ReplicaRouter, read_from_replicas
+from api.search import search
+
+REPLICA = 'replica_test'
+
+
+def replication(pin_seconds=5):
+    return override_settings(REPLICATION={
+        'REPLICAS': [REPLICA], 'PIN_SECONDS': pin_seconds, 'CACHE_ALIAS': 'default'
+    })
+
+
+class ReadReplicaTests(APITransactionTestCase):
+    databases = {'default', REPLICA}
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        connections.settings[REPLICA] = {
+            **connections['default'].settings_dict,
+            'NAME': os.path.join(cls.directory, 'replica.sqlite3'),
+        }
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections[REPLICA].close()
+        del connections[REPLICA]
+        del connections.settings[REPLICA]
+        shutil.rmtree(cls.directory)
+
+    def setUp(self):
+        self.admin = CustomUser.objects.create_user(
+            username='admin', email='admin@example.com', password='adminpass',
+            first_name='Admin', last_name='Uno', telefono='3000000000',
+            role=CustomUser.ADMIN, is_staff=True, is_active=True
+        )
+        self.resident = CustomUser.objects.create_user(
+            username='prop', email='prop@example.com', password='userpass',
+            first_name='Prop', last_name='Dos', telefono='3001111111',
+            role=CustomUser.PROPIETARIO, is_active=True
+        )
+        self.admin_token = Token.objects.create(user=self.admin)
+        self.resident_token = Token.objects.create(user=self.resident)
+        self.gym = Facility.objects.create(name='Gimnasio', is_reserved=True)
+        self.start = timezone.now().replace(microsecond=0) + timezone.timedelta(days=1)
+        self.replicate()
+        cache.clear()
+
+    def replicate(self):
+        """Copia el estado actual de la principal al archivo de la réplica."""
+        replica = connections[REPLICA]
+        replica.close()
+        primary = connections['default']
+        primary.ensure_connection()
+        target = sqlite3.connect(replica.settings_dict['NAME'])
+        primary.connection.backup(target)
+        target.close()
+
+    def reservation_ids(self, token):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        response = self.client.get(reverse('reservations-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [row['id'] for row in response.data['results']]
+
+    def book(self, token, hours_from):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        response = self.client.post(reverse('reservations-list'), {
+            'facility': self.gym.id,
+            'start_datetime': (self.start + timezone.timedelta(hours=hours_from)).isoformat(),
+            'end_datetime': (self.start + timezone.timedelta(hours=hours_from + 1)).isoformat(),
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.data['id']
+
+    def test_safe_requests_read_from_the_replica(self):
+        Reservation.objects.create(facility=self.gym, user=self.resident,
+                                   start_datetime=self.start,
+                                   end_datetime=self.start + timezone.timedelta(hours=1))
+        with replication():
+            # la réplica todavía no tiene la reserva
+            self.assertEqual(self.reservation_ids(self.admin_token), [])
+        self.assertEqual(len(self.reservation_ids(self.admin_token)), 1)
+
+    def test_writer_is_pinned_to_the_primary(self):
+        with replication():
+            reservation_id = self.book(self.resident_token, 0)
+            # quien escribió lee lo que escribió...
+            self.assertEqual(self.reservation_ids(self.resident_token), [reservation_id])
+            # ...y los demás leen de la réplica hasta que se replique
+            self.assertEqual(self.reservation_ids(self.admin_token), [])
+
+    def test_pin_expires(self):
+        with replication(pin_seconds=0):
+            self.book(self.resident_token, 0)
+            self.assertEqual(self.reservation_ids(self.resident_token), [])
+
+    def test_sync_reads_from_the_primary(self):
+        reservation = Reservation.objects.create(
+            facility=self.gym, user=self.resident, start_datetime=self.start,
+            end_datetime=self.start + timezone.timedelta(hours=1)
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.resident_token.key}')
+        with replication():
+            # el cursor devuelto no debe saltarse lo que la réplica no tiene
+            response = self.client.get(reverse('sync'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row['id'] for row in response.data['changes']['reservations']],
+                         [reservation.id])
+
+    def login(self, email, password):
+        self.client.credentials()
+        response = self.client.post(reverse('api_token_auth'),
+                                    {'username': email, 'password': password})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {response.data['token']}")
+        return self.client.get(reverse('user-me'))
+
+    def test_issued_token_is_pinned_to_the_primary(self):
+        self.resident_token.delete()
+        self.replicate()
+        with replication():
+            # el token se crea en el login: la réplica todavía no lo tiene
+            response = self.login('prop@example.com', 'userpass')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.data['email'], 'prop@example.com')
+
+    def test_registered_user_reads_its_own_account(self):
+        with replication():
+            response = self.client.post(reverse('user-list'), {
+                'email': 'nuevo@example.com', 'first_name': 'Nuevo', 'last_name': 'Tres',
+                'telefono': '3002222222', 'role': CustomUser.PROPIETARIO,
+                'password': 'clave1234',
+            })
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.admin_token.key}')
+            response = self.client.post(reverse('user-approve', args=[response.data['id']]))
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            # ni el usuario ni su token están aún en la réplica
+            response = self.login('nuevo@example.com', 'clave1234')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.data['email'], 'nuevo@example.com')
+
+    def test_writes_and_reads_outside_requests_use_the_primary(self):
+        router = ReplicaRouter()
+        with replication():
+            self.assertEqual(router.db_for_read(Reservation), 'default')
+            with read_from_replicas():
+                self.assertEqual(router.db_for_read(Reservation), REPLICA)
+                self.assertEqual(router.db_for_write(Reservation), 'default')
+                # una instancia leída de la réplica se guarda en la principal
+                facility = Facility.objects.get(pk=self.gym.pk)
+                self.assertEqual(facility._state.db, REPLICA)
+                facility.name = 'Sala de pesas'
+                facility.save()
+            self.assertEqual(Facility.objects.get(pk=self.gym.pk).name, 'Sala de pesas')
+            self.assertFalse(router.allow_migrate(REPLICA, 'api'))
+            self.assertIsNone(router.allow_migrate('default', 'api'))
+
+    def test_search_runs_on_the_queryset_database(self):
+        self.gym.name = 'Sala de pesas'
+        self.gym.save()
+        on_replica = Facility.objects.using(REPLICA).values('pk')
+        # la réplica todavía indexa el nombre anterior
+        self.assertEqual(search('facility', 'gimnasio', within=on_replica), [self.gym.id])
+        self.assertEqual(search('facility', 'pesas', within=on_replica), [])
+        self.assertEqual(search('facility', 'pesas'), [self.gym.id])
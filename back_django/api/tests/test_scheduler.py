@@ -0,0 +1,81 @@
+import json
+import tempfile
+from datetime import date
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from api.intervals import IntervalIndex
+from api.models import CustomUser, Tower, ShiftAssignment, LeaveRequest, OutboxEmail
+from api.scheduler import Slot, schedule
+from helpers import make_admin, make_employee, on
+
+
+class ScheduleTests(SimpleTestCase):
+    def test_balances_hours_and_skips_busy_employees(self):
+        slots = [Slot('aseo', 1, None, on(2 + d, 6), on(2 + d, 14), 1) for d in range(4)]
+        busy = {1: IntervalIndex([(on(2, 0), on(2, 12))])}
+        leaves = {2: IntervalIndex([(on(3, 0), on(4, 0))])}
+        assignments, unfilled = schedule(slots, {'aseo': [1, 2]}, busy, leaves)
+        self.assertEqual([(pk, slot.start.day) for pk, slot in assignments],
+                         [(2, 2), (1, 3), (1, 4), (2, 5)])
+        self.assertEqual(unfilled, [])
+
+    def test_reports_unfilled_coverage(self):
+        slots = [Slot('seguridad', 1, None, on(2, 6), on(2, 14), 3)]
+        assignments, unfilled = schedule(slots, {'seguridad': [1, 2]}, {}, {})
+        self.assertEqual(len(assignments), 2)
+        self.assertEqual(unfilled, [(slots[0], 1)])
+
+
+class AutoscheduleTests(APITestCase):
+    def setUp(self):
+        self.admin = make_admin()
+        self.client.force_authenticate(self.admin)
+
+        self.guards = [make_employee(), make_employee()]
+        self.inactive = make_employee(is_active=False)
+        self.cleaner = make_employee(CustomUser.LIMPIEZA)
+        self.tower = Tower.objects.create(name='Torre A', num_floors=10)
+        LeaveRequest.objects.create(employee=self.guards[0], type='permiso',
+                                    start_date=date(2025, 6, 3), end_date=date(2025, 6, 3),
+                                    reason='x', document='leave_docs/x.txt', status='aprobada')
+        self.url = reverse('shift-autoschedule')
+        # lunes 2 a miércoles 4 de junio de 2025
+        self.payload = {
+            'start_date': '2025-06-02', 'end_date': '2025-06-04',
+            'blocks': [{'area': 'seguridad', 'tower': self.tower.id, 'weekdays': [0, 1, 2],
+                        'start': '06:00', 'end': '14:00', 'required': 1}],
+        }
+
+    def test_autoschedule_assigns_eligible_employees(self):
+        response = self.client.post(self.url, self.payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 3)
+        self.assertEqual(response.data['unfilled'], [])
+        assigned = dict(ShiftAssignment.objects.values_list('start_datetime__day', 'employee'))
+        # el guarda con permiso el día 3 no queda asignado ese día
+        self.assertEqual(assigned[3], self.guards[1].id)
+        self.assertEqual(set(assigned.values()), {g.id for g in self.guards})
+        self.assertEqual(OutboxEmail.objects.count(), 2)
+
+    def test_dry_run_does_not_save(self):
+        self.payload['dry_run'] = True
+        self.payload['blocks'][0]['required'] = 3
+        response = self.client.post(self.url, self.payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['shifts']), 5)
+        self.assertEqual([u['missing'] for u in response.data['unfilled']], [1, 2, 1])
+        self.assertFalse(ShiftAssignment.objects.exists())
+
+    def test_schedule_shifts_command(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as fh:
+            json.dump({'blocks': self.payload['blocks']}, fh)
+        out = StringIO()
+        call_command('schedule_shifts', fh.name, start='2025-06-02', end='2025-06-04', stdout=out)
+        self.assertIn('Creados 3 turnos', out.getvalue())
+        self.assertEqual(ShiftAssignment.objects.count(), 3)
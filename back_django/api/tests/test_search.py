@@ -0,0 +1,144 @@
+from io import StringIO
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from api.models import (CustomUser, Facility, Reservation, ShiftAssignment, LeaveRequest,
+                        SearchDocument)
+from api.search import SEARCH_MAX_RESULTS, ranked, rebuild, search
+
+
+class FullTextSearchTests(APITestCase):
+    def setUp(self):
+        self.admin = CustomUser.objects.create_superuser(
+            username='admin', email='admin@example.com', password='adminpass',
+            first_name='Admin', last_name='Uno', telefono='3000000000', role=CustomUser.ADMIN
+        )
+        self.client.force_authenticate(self.admin)
+        self.jose = CustomUser.objects.create_user(
+            username='jose', email='jperez@correo.com', password='pass',
+            first_name='José', last_name='Pérez', telefono='3001111111',
+            role=CustomUser.EMPLEADO, subrole=CustomUser.SEGURIDAD
+        )
+        self.daniela = CustomUser.objects.create_user(
+            username='daniela', email='dani@correo.com', password='pass',
+            first_name='Daniela', last_name='Gómez', telefono='3002222222',
+            role=CustomUser.PROPIETARIO
+        )
+        self.gym = Facility.objects.create(name='Gimnasio', is_reserved=True)
+        self.pool = Facility.objects.create(name='Piscina', is_reserved=True)
+        now = timezone.now()
+        self.gym_reservation = Reservation.objects.create(
+            facility=self.gym, user=self.daniela,
+            start_datetime=now, end_datetime=now + timezone.timedelta(hours=1)
+        )
+        self.pool_reservation = Reservation.objects.create(
+            facility=self.pool, user=self.jose,
+            start_datetime=now, end_datetime=now + timezone.timedelta(hours=1)
+        )
+
+    def _ids(self, url, **params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [row['id'] for row in response.data['results']]
+
+    def test_users_by_accentless_prefix_and_email(self):
+        url = reverse('user-list')
+        self.assertEqual(self._ids(url, search='jose perez'), [self.jose.id])
+        self.assertEqual(self._ids(url, search='Dani'), [self.daniela.id])
+        self.assertEqual(self._ids(url, search='correo'), [self.jose.id, self.daniela.id])
+        self.assertEqual(self._ids(url, search='nadie'), [])
+        # sin palabras no se filtra
+        self.assertEqual(len(self._ids(url, search='¿?')), 3)
+
+    def test_reservations_by_user_name_or_facility(self):
+        url = reverse('reservations-list')
+        self.assertEqual(self._ids(url, search='gimna'), [self.gym_reservation.id])
+        self.assertEqual(self._ids(url, search='Gómez'), [self.gym_reservation.id])
+        self.assertEqual(self._ids(url, search='jose'), [self.pool_reservation.id])
+        # el orden pedido explícitamente se respeta
+        both = self._ids(url, search='correo', ordering='-created_at')
+        self.assertEqual(both, [self.pool_reservation.id, self.gym_reservation.id])
+
+    def test_leaves_by_reason_and_shifts_by_employee(self):
+        today = timezone.localdate()
+        leave = LeaveRequest.objects.create(
+            employee=self.jose, type='permiso', start_date=today, end_date=today,
+            reason='Cita médica odontológica', document=SimpleUploadedFile('req.txt', b'data')
+        )
+        shift = ShiftAssignment.objects.create(
+            employee=self.jose, area='seguridad', facility=self.gym,
+            start_datetime=timezone.now(), end_datetime=timezone.now() + timezone.timedelta(hours=8)
+        )
+        self.assertEqual(self._ids(reverse('leave-list'), search='medica'), [leave.id])
+        self.assertEqual(self._ids(reverse('leave-list'), search='perez'), [leave.id])
+        self.assertEqual(self._ids(reverse('shift-list'), search='jperez'), [shift.id])
+
+    def test_leaves_by_type_and_shifts_by_area(self):
+        today = timezone.localdate()
+        leave = LeaveRequest.objects.create(
+            employee=self.jose, type='incapacidad', start_date=today, end_date=today,
+            reason='Reposo', document=SimpleUploadedFile('req.txt', b'data')
+        )
+        shift = ShiftAssignment.objects.create(
+            employee=self.jose, area='aseo', facility=self.gym,
+            start_datetime=timezone.now(), end_datetime=timezone.now() + timezone.timedelta(hours=8)
+        )
+        # columnas cortas sin documento propio, como en el ?search= anterior
+        self.assertEqual(self._ids(reverse('leave-list'), search='incapacidad'), [leave.id])
+        self.assertEqual(self._ids(reverse('leave-list'), search='permiso'), [])
+        self.assertEqual(self._ids(reverse('shift-list'), search='ase'), [shift.id])
+        # y las palabras de documentos siguen funcionando
+        self.assertEqual(self._ids(reverse('leave-list'), search='reposo'), [leave.id])
+
+    def test_signals_keep_the_index_in_sync(self):
+        self.gym.name = 'Sala de pesas'
+        self.gym.save()
+        self.assertEqual(search('facility', 'gimnasio'), [])
+        self.assertEqual(search('facility', 'pesas'), [self.gym.id])
+        pool_id = self.pool.id
+        self.pool.delete()
+        self.assertEqual(search('facility', 'piscina'), [])
+        self.assertFalse(SearchDocument.objects.filter(kind='facility', object_id=pool_id).exists())
+        # guardar solo last_login no reindexa
+        SearchDocument.objects.filter(kind='user', object_id=self.jose.id).delete()
+        self.jose.last_login = timezone.now()
+        self.jose.save(update_fields=['last_login'])
+        self.assertEqual(search('user', 'jose'), [])
+
+    def test_rebuild_command(self):
+        SearchDocument.objects.all().delete()
+        out = StringIO()
+        call_command('rebuild_search_index', stdout=out)
+        self.assertIn('user: 3', out.getvalue())
+        self.assertEqual(search('user', 'daniela'), [self.daniela.id])
+
+    def test_admin_changelist_uses_the_index(self):
+        self.admin.is_active = True
+        self.admin.save()
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('admin:api_customuser_changelist'), {'q': 'perez'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([u.id for u in response.context['cl'].result_list], [self.jose.id])
+
+    def test_matches_beyond_the_ranking_limit_are_kept(self):
+        extra = SEARCH_MAX_RESULTS + 50
+        CustomUser.objects.bulk_create([
+            CustomUser(username=f'ana{i}', email=f'ana{i}@correo.com', first_name='Ana',
+                       last_name=f'Ruiz {i}', telefono='3009999999', role=CustomUser.PROPIETARIO)
+            for i in range(extra)
+        ])
+        rebuild(['user'])
+        everyone = CustomUser.objects.all()
+        self.assertEqual(ranked(everyone, (('user', 'pk'),), 'ana').count(), extra)
+        last = everyone.order_by('-pk').first()
+        # un queryset restringido (p. ej. por dueño) encuentra su fila aunque
+        # no esté entre las primeras del índice completo
+        only_last = ranked(everyone.filter(pk=last.pk), (('user', 'pk'),), 'ana')
+        self.assertEqual(list(only_last), [last])
+        response = self.client.get(reverse('user-list'), {'search': 'ana', 'page_size': 5})
+        self.assertEqual(response.data['count'], extra)
@@ -0,0 +1,40 @@
+import json
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from api.intervals import IntervalIndex
+from api.models import CustomUser, Reservation, ShiftAssignment
+
+
+class SeedCommandTests(TestCase):
+    def seed(self, **options):
+        call_command('seed_domus', towers=1, apartments_per_tower=4, owners=5, employees=3,
+                     facilities=2, reservations=30, shift_days=14, leaves=4,
+                     stdout=StringIO(), **options)
+
+    def test_seed_creates_consistent_data(self):
+        self.seed()
+        self.assertTrue(CustomUser.objects.filter(email='admin@seed.domus.local', is_staff=True).exists())
+        self.assertEqual(Reservation.objects.count(), 30)
+        # Ningún empleado tiene turnos solapados
+        for employee in CustomUser.objects.filter(role=CustomUser.EMPLEADO):
+            shifts = ShiftAssignment.objects.filter(employee=employee)
+            index = IntervalIndex()
+            for shift in shifts:
+                self.assertFalse(index.overlaps(shift.start_datetime, shift.end_datetime))
+                index.add(shift.start_datetime, shift.end_datetime)
+        with self.assertRaises(CommandError):
+            self.seed()
+
+    def test_benchmark_reports_every_scenario(self):
+        self.seed()
+        out = StringIO()
+        call_command('benchmark_api', iterations=2, warmup=0, output='-',
+                     only=['facilities', 'reservations-admin'], stdout=out)
+        report = json.loads(out.getvalue()[out.getvalue().index('{'):])
+        self.assertEqual(set(report['results']), {'facilities', 'reservations-admin'})
+        self.assertEqual(report['meta']['dataset']['reservations'], 30)
+        self.assertGreater(report['results']['reservations-admin']['queries'], 0)
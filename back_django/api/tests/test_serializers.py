@@ -2,7 +2,7 @@ from django.test import TestCase
 from django.utils import timezone
 from rest_framework.exceptions import ValidationError
 from api.serializers import ReservationSerializer, UserSerializer
-from api.models import Facility, CustomUser
+from api.models import Facility, CustomUser, Reservation
 
 class SerializerTests(TestCase):
     def setUp(self):
@@ -44,6 +44,37 @@ class SerializerTests(TestCase):
         self.assertFalse(serializer.is_valid())
         self.assertIn('non_field_errors', serializer.errors)
 
+    def test_reservation_serializer_rechecks_overlap_on_save(self):
+        # Otra reserva entra entre la validación y el guardado: book() debe rechazarla
+        now = timezone.now()
+        start, end = now + timezone.timedelta(hours=1), now + timezone.timedelta(hours=2)
+        data = {
+            'facility': self.facility.id,
+            'start_datetime': start.isoformat(),
+            'end_datetime': end.isoformat()
+        }
+        serializer = ReservationSerializer(data=data, context={'request': None})
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        Reservation.objects.create(facility=self.facility, user=self.user,
+                                   start_datetime=start, end_datetime=end)
+        with self.assertRaises(ValidationError):
+            serializer.save(user=self.user)
+        self.assertEqual(Reservation.objects.count(), 1)
+
+    def test_reservation_serializer_update_keeps_own_slot(self):
+        now = timezone.now()
+        reservation = Reservation.objects.create(
+            facility=self.facility, user=self.user,
+            start_datetime=now, end_datetime=now + timezone.timedelta(hours=1)
+        )
+        data = {'end_datetime': (now + timezone.timedelta(hours=2)).isoformat()}
+        serializer = ReservationSerializer(reservation, data=data, partial=True,
+                                           context={'request': None})
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        serializer.save()
+        reservation.refresh_from_db()
+        self.assertEqual(reservation.end_datetime, now + timezone.timedelta(hours=2))
+
     def test_user_serializer_employee_requires_subrole(self):
         # Empleado sin subrol debe fallar
         data = {
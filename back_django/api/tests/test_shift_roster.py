@@ -0,0 +1,79 @@
+from datetime import date
+
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from api.models import Tower, ShiftAssignment, LeaveRequest, OutboxEmail
+from helpers import make_admin, make_employee, on
+
+
+class ShiftRosterTests(APITestCase):
+    def setUp(self):
+        self.admin = make_admin()
+        self.client.force_authenticate(self.admin)
+        self.employees = [make_employee() for _ in range(3)]
+        self.tower = Tower.objects.create(name='Torre A', num_floors=10)
+        self.url = reverse('shift-roster')
+
+    def payload(self, **overrides):
+        # Semana del lunes 2 al domingo 8 de junio de 2025
+        payload = {
+            'start_date': '2025-06-02', 'end_date': '2025-06-08',
+            'area': 'seguridad', 'tower': self.tower.id,
+            'blocks': [
+                {'weekdays': [0, 1, 2, 3, 4], 'start': '06:00', 'end': '14:00',
+                 'employees': [self.employees[0].id, self.employees[1].id]},
+                {'weekdays': [5, 6], 'start': '22:00', 'end': '06:00',
+                 'employees': [self.employees[2].id]},
+            ],
+        }
+        payload.update(overrides)
+        return payload
+
+    def test_roster_expands_template_in_constant_queries(self):
+        # torre, empleados, turnos, permisos, inserción, correos de empleados,
+        # correos en cola y dos savepoints con su liberación: no depende del
+        # número de turnos generados
+        with self.assertNumQueries(11):
+            response = self.client.post(self.url, self.payload(), format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 12)
+        self.assertEqual(response.data['conflicts'], [])
+        night = ShiftAssignment.objects.get(employee=self.employees[2], start_datetime=on(7, 22))
+        self.assertEqual(night.end_datetime, on(8, 6))
+        self.assertEqual(OutboxEmail.objects.count(), 3)
+
+    def test_roster_skips_overlaps_and_approved_leaves(self):
+        ShiftAssignment.objects.create(employee=self.employees[0], area='seguridad',
+                                       tower=self.tower, start_datetime=on(3, 12),
+                                       end_datetime=on(3, 20))
+        LeaveRequest.objects.create(employee=self.employees[1], type='permiso',
+                                    start_date=date(2025, 6, 4), end_date=date(2025, 6, 5),
+                                    reason='x', document='leave_docs/x.txt', status='aprobada')
+        LeaveRequest.objects.create(employee=self.employees[1], type='permiso',
+                                    start_date=date(2025, 6, 6), end_date=date(2025, 6, 6),
+                                    reason='x', document='leave_docs/x.txt', status='pendiente')
+        response = self.client.post(self.url, self.payload(), format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 9)
+        reasons = sorted((c['employee'], c['start_datetime'].day, c['reason'])
+                         for c in response.data['conflicts'])
+        self.assertEqual(reasons, [
+            (self.employees[0].id, 3, 'turno'),
+            (self.employees[1].id, 4, 'permiso'),
+            (self.employees[1].id, 5, 'permiso'),
+        ])
+
+    def test_roster_rejects_invalid_template(self):
+        response = self.client.post(self.url, self.payload(facility=1), format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        blocks = [{'weekdays': [0], 'start': '06:00', 'end': '14:00', 'employees': [self.admin.id]}]
+        response = self.client.post(self.url, self.payload(blocks=blocks), format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(ShiftAssignment.objects.exists())
+
+    def test_roster_is_admin_only(self):
+        self.client.force_authenticate(self.employees[0])
+        response = self.client.post(self.url, self.payload(), format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,46 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connections
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.test import TestCase
+
+
+class SQLiteProductionProfileTests(TestCase):
+    def test_connection_applies_pragmas_and_immediate_transactions(self):
+        with tempfile.TemporaryDirectory() as directory:
+            connection = DatabaseWrapper({
+                **connections['default'].settings_dict,
+                'NAME': os.path.join(directory, 'profile.sqlite3'),
+                'OPTIONS': settings.SQLITE_PRODUCTION_OPTIONS,
+            }, alias='sqlite_profile')
+            try:
+                with connection.cursor() as cursor:
+                    pragmas = {}
+                    for name in ('journal_mode', 'synchronous', 'busy_timeout', 'temp_store'):
+                        cursor.execute(f'PRAGMA {name}')
+                        pragmas[name] = cursor.fetchone()[0]
+                self.assertEqual(pragmas, {
+                    'journal_mode': 'wal',
+                    'synchronous': 1,  # NORMAL
+                    'busy_timeout': settings.SQLITE_PRODUCTION_OPTIONS['timeout'] * 1000,
+                    'temp_store': 2,  # MEMORY
+                })
+                self.assertEqual(connection.transaction_mode, 'IMMEDIATE')
+            finally:
+                connection.close()
+
+    def test_benchmark_reports_each_profile_and_writer_count(self):
+        out = StringIO()
+        call_command('benchmark_sqlite_writes', '--writers', '1', '2',
+                     '--transactions', '10', '--output', '-', stdout=out)
+        rows = json.loads(out.getvalue())
+        self.assertEqual([(r['profile'], r['writers']) for r in rows], [
+            ('default', 1), ('default', 2), ('production', 1), ('production', 2)
+        ])
+        production = [r for r in rows if r['profile'] == 'production']
+        self.assertEqual([(r['committed'], r['errors']) for r in production], [(10, 0), (20, 0)])
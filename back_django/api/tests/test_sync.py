@@ -0,0 +1,147 @@
+from io import StringIO
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from api.models import (CustomUser, Facility, Reservation, ShiftAssignment, LeaveRequest,
+                        Tombstone)
+from api.sync import SYNC_TOMBSTONE_RETENTION
+
+
+class SyncTests(APITestCase):
+    def setUp(self):
+        self.admin = CustomUser.objects.create_superuser(
+            username='admin', email='admin@example.com', password='adminpass',
+            first_name='Admin', last_name='Uno', telefono='3000000000', role=CustomUser.ADMIN
+        )
+        self.employee = CustomUser.objects.create_user(
+            username='emp', email='emp@example.com', password='emppass',
+            first_name='Emp', last_name='Tres', telefono='3002222222',
+            role=CustomUser.EMPLEADO, subrole=CustomUser.SEGURIDAD, is_active=True
+        )
+        self.other = CustomUser.objects.create_user(
+            username='otro', email='otro@example.com', password='otropass',
+            first_name='Otro', last_name='Cuatro', telefono='3003333333',
+            role=CustomUser.EMPLEADO, subrole=CustomUser.SEGURIDAD, is_active=True
+        )
+        self.facility = Facility.objects.create(name='Gimnasio', is_reserved=True)
+        now = timezone.now()
+        self.reservations = [
+            Reservation.objects.create(
+                facility=self.facility, user=user,
+                start_datetime=now + timezone.timedelta(hours=2 * i),
+                end_datetime=now + timezone.timedelta(hours=2 * i + 1)
+            )
+            for i, user in enumerate([self.employee, self.employee, self.other])
+        ]
+        self.shift = ShiftAssignment.objects.create(
+            employee=self.employee, area='seguridad', facility=self.facility,
+            start_datetime=now + timezone.timedelta(days=3),
+            end_datetime=now + timezone.timedelta(days=3, hours=8)
+        )
+        self.url = reverse('sync')
+
+    def _sync(self, since=None):
+        response = self.client.get(self.url, {'since': since} if since else {})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def _age_everything(self):
+        # simula que el cliente sincronizó hace un rato: lo existente ya es viejo
+        past = timezone.now() - timezone.timedelta(minutes=10)
+        for model in (Reservation, ShiftAssignment, LeaveRequest, Facility, CustomUser):
+            model.objects.update(updated_at=past)
+        Tombstone.objects.update(deleted_at=past)
+        return (past + timezone.timedelta(minutes=1)).isoformat()
+
+    def test_initial_sync_is_scoped_to_the_user(self):
+        self.client.force_authenticate(self.employee)
+        data = self._sync()
+        self.assertTrue(data['reset'])
+        self.assertEqual(sorted(r['id'] for r in data['changes']['reservations']),
+                         sorted(r.id for r in self.reservations[:2]))
+        self.assertEqual([s['id'] for s in data['changes']['shifts']], [self.shift.id])
+        self.assertEqual([f['id'] for f in data['changes']['facilities']], [self.facility.id])
+        self.client.force_authenticate(self.admin)
+        self.assertEqual(len(self._sync()['changes']['reservations']), 3)
+
+    def test_returning_client_gets_only_changes_and_deletes(self):
+        self.client.force_authenticate(self.employee)
+        cursor = self._age_everything()
+        changed, removed = self.reservations[0], self.reservations[1].id
+        changed.status = 'aprobada'
+        changed.save()
+        self.reservations[1].delete()
+        self.reservations[2].delete()  # de otro usuario: no se informa
+        # token ya autenticado: una consulta por modelo y una de lápidas
+        with self.assertNumQueries(5):
+            data = self._sync(cursor)
+        self.assertFalse(data['reset'])
+        self.assertEqual([r['id'] for r in data['changes']['reservations']], [changed.id])
+        self.assertEqual(data['changes']['reservations'][0]['status'], 'aprobada')
+        self.assertEqual(data['changes']['shifts'], [])
+        self.assertEqual(data['changes']['facilities'], [])
+        self.assertEqual(data['deleted']['reservations'], [removed])
+        # cursor en UTC, seguro para la URL
+        self.assertTrue(data['cursor'].endswith('Z'))
+
+    def test_related_rename_and_set_null_are_changes(self):
+        self.client.force_authenticate(self.employee)
+        cursor = self._age_everything()
+        self.facility.name = 'Gimnasio Norte'
+        self.facility.save()
+        data = self._sync(cursor)
+        self.assertEqual(len(data['changes']['reservations']), 2)
+        self.assertEqual(data['changes']['reservations'][0]['facility_name'], 'Gimnasio Norte')
+
+        cursor = self._age_everything()
+        facility_id = self.facility.id
+        self.facility.delete()
+        data = self._sync(cursor)
+        # las reservas caen en cascada; el turno queda sin instalación
+        self.assertEqual(sorted(data['deleted']['reservations']),
+                         sorted(r.id for r in self.reservations[:2]))
+        self.assertEqual(data['deleted']['facilities'], [facility_id])
+        self.assertEqual(data['changes']['shifts'][0]['facility'], None)
+
+    def test_reassigned_shift_leaves_previous_owner(self):
+        today = timezone.localdate()
+        leave = LeaveRequest.objects.create(
+            employee=self.employee, type='permiso', start_date=today + timezone.timedelta(days=3),
+            end_date=today + timezone.timedelta(days=4), reason='Motivo',
+            document=SimpleUploadedFile('req.txt', b'data')
+        )
+        cursor = self._age_everything()
+        leave.approve(self.admin, {self.shift.id: self.other.id})
+        self.client.force_authenticate(self.employee)
+        data = self._sync(cursor)
+        self.assertEqual(data['deleted']['shifts'], [self.shift.id])
+        self.assertEqual([row['id'] for row in data['changes']['leaves']], [leave.id])
+        self.client.force_authenticate(self.other)
+        data = self._sync(cursor)
+        self.assertEqual([s['id'] for s in data['changes']['shifts']], [self.shift.id])
+        self.assertEqual(data['deleted']['shifts'], [])
+
+    def test_stale_cursor_resets_and_invalid_cursor_is_400(self):
+        self.client.force_authenticate(self.employee)
+        stale = timezone.now() - SYNC_TOMBSTONE_RETENTION - timezone.timedelta(days=1)
+        data = self._sync(stale.isoformat())
+        self.assertTrue(data['reset'])
+        self.assertEqual(len(data['changes']['reservations']), 2)
+        response = self.client.get(self.url, {'since': 'ayer'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_prune_tombstones(self):
+        kept = self.reservations[1].id
+        self.reservations[2].delete()
+        Tombstone.objects.update(deleted_at=timezone.now() - SYNC_TOMBSTONE_RETENTION * 2)
+        self.reservations[1].delete()
+        out = StringIO()
+        call_command('prune_tombstones', stdout=out)
+        self.assertIn('1', out.getvalue())
+        self.assertEqual(list(Tombstone.objects.values_list('object_id', flat=True)),
+                         [kept])
@@ -1,9 +1,11 @@
+from datetime import datetime, timezone as dt_timezone
+
 from django.urls import reverse
 from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
 from rest_framework.authtoken.models import Token
 
-from api.models import CustomUser, Facility
+from api.models import CustomUser, Facility, ShiftAssignment
 
 class ViewTests(APITestCase):
     def setUp(self):
@@ -77,3 +79,27 @@ class ViewTests(APITestCase):
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['email'], self.user.email)
+
+    def test_shift_date_filter_uses_whole_days(self):
+        # Turnos que empiezan el 2 y terminan a más tardar el 3 (inclusive)
+        def at(day, hour):
+            return datetime(2025, 6, day, hour, tzinfo=dt_timezone.utc)
+        facility = Facility.objects.create(name='Lobby', is_reserved=False)
+        inside = ShiftAssignment.objects.create(
+            employee=self.user, area='seguridad', facility=facility,
+            start_datetime=at(2, 0), end_datetime=at(3, 23)
+        )
+        ShiftAssignment.objects.create(
+            employee=self.user, area='seguridad', facility=facility,
+            start_datetime=at(3, 22), end_datetime=at(4, 6)
+        )
+        ShiftAssignment.objects.create(
+            employee=self.user, area='seguridad', facility=facility,
+            start_datetime=at(1, 20), end_datetime=at(2, 4)
+        )
+        url = reverse('shift-list')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.admin_token.key}')
+        response = self.client.get(url, {'start': '2025-06-02', 'end': '2025-06-03'})
+        self.assertEqual([row['id'] for row in response.data['results']], [inside.id])
+        response = self.client.get(url, {'start': '2025-06-02', 'end': 'mañana'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -4,7 +4,9 @@ from rest_framework.routers import DefaultRouter
 from rest_framework.authtoken import views as drf_token_views
 from .views import (
             UserViewSet, TowerViewSet, ApartmentViewSet, FacilityViewSet, ParkingSpotViewSet,
-            ShiftAssignmentViewSet, LeaveRequestViewSet, ReservationViewSet
+            ShiftAssignmentViewSet, LeaveRequestViewSet, ReservationViewSet,
+            ArchivedReservationViewSet, ArchivedShiftAssignmentViewSet,
+            ArchivedLeaveRequestViewSet, CacheStatsView, BootstrapView, SyncView, calendar_feed
             )
 
 router = DefaultRouter()
@@ -16,9 +18,22 @@ router.register(r'parkings', ParkingSpotViewSet, basename='parking')
 router.register(r'shifts', ShiftAssignmentViewSet, basename='shift')
 router.register(r'leaves', LeaveRequestViewSet, basename='leave')
 router.register(r'reservations', ReservationViewSet, basename='reservations')
+# histórico de solo lectura (ver `archive_history`)
+router.register(r'archive/reservations', ArchivedReservationViewSet,
+                basename='archived-reservation')
+router.register(r'archive/shifts', ArchivedShiftAssignmentViewSet, basename='archived-shift')
+router.register(r'archive/leaves', ArchivedLeaveRequestViewSet, basename='archived-leave')
 
 urlpatterns = [
   path('api/', include(router.urls)),
+  path('api/cache-stats/', CacheStatsView.as_view(), name='cache_stats'),
+  path('api/bootstrap/', BootstrapView.as_view(), name='bootstrap'),
+  path('api/sync/', SyncView.as_view(), name='sync'),
+  # Feeds .ics para apps de calendario (autenticados por el token de la URL)
+  path('api/calendar/<str:token>/shifts.ics', calendar_feed, {'kind': 'shifts'},
+       name='calendar_feed_shifts'),
+  path('api/calendar/<str:token>/reservations.ics', calendar_feed, {'kind': 'reservations'},
+       name='calendar_feed_reservations'),
   path('api-token-auth/', drf_token_views.obtain_auth_token, name='api_token_auth'),  # Token
   path('api-auth/', include('rest_framework.urls'), name='rest_framework'),  # Autenticación API
   # path para login/token, etc.
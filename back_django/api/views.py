@@ -1,50 +1,247 @@
 """" Modulos para las vistas de la API """
+from datetime import datetime, time, timedelta
 from rest_framework import viewsets, filters, status
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAdminUser, IsAuthenticated, AllowAny
 from rest_framework.response import Response
-from rest_framework.exceptions import PermissionDenied
+from rest_framework.views import APIView
+from rest_framework.exceptions import PermissionDenied, ValidationError
 from django.contrib.auth import get_user_model
-from django.core.mail import send_mail
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from django.db.models import Count, F, Max, Value
+from django.db.models.functions import Coalesce, Concat
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime, parse_time
+from django.http import Http404, StreamingHttpResponse
+from django.urls import reverse
+from django.views.decorators.http import condition, require_safe
 from django_filters.rest_framework import DjangoFilterBackend
 from .models import (Tower, Apartment, Facility, ParkingSpot,
-                    ShiftAssignment, LeaveRequest, Reservation)
+                    ShiftAssignment, LeaveRequest, Reservation, OutboxEmail, CalendarFeed,
+                    Tombstone, ArchivedReservation, ArchivedShiftAssignment,
+                    ArchivedLeaveRequest)
 from .serializers import (TowerSerializer, ApartmentSerializer, FacilitySerializer,
                         ParkingSpotSerializer, ShiftAssignmentSerializer, LeaveRequestSerializer,
-                        UserSerializer, ReservationSerializer)
+                        UserSerializer, ReservationSerializer, ReservationBulkSerializer,
+                        BulkReviewSerializer, ShiftRosterSerializer, ShiftScheduleSerializer,
+                        ArchivedReservationSerializer, ArchivedShiftAssignmentSerializer,
+                        ArchivedLeaveRequestSerializer)
+from .intervals import free_intervals, free_slots, local_day_bounds
+from .authentication import token_cache
+from .catalog import CachedCatalogMixin, catalog_cache
+from .conditional import ConditionalGetMixin, conditional, make_etag
+from .pagination import OptionalCursorPagination
+from .replicas import read_from_primary
+from .scheduler import plan_shifts, replacement_plan, shift_notifications
+from .coverage import coverage_report
+from .search import FullTextSearchFilter
+from .sync import changes_since
+from . import ical
 
 # Constants
 NO_REPLY_EMAIL = 'no-reply@domus.com'
+AVAILABILITY_MAX_DAYS = 31
+AVAILABILITY_DEFAULT_SLOT = 60  # minutos
+AVAILABILITY_MIN_SLOT = 5  # minutos
+COVERAGE_MAX_DAYS = 366
+COVERAGE_MAX_WINDOWS = 500  # ventanas por ubicación y área
+CALENDAR_MAX_DAYS = 42  # seis semanas: vista mensual completa
+CALENDAR_FEEDS = ('shifts', 'reservations')
+CALENDAR_FEED_CHUNK = 1000  # filas por lectura del iterador
+BOOTSTRAP_RESERVATIONS = 20  # reservas incluidas en el arranque de la app
 
 # Create your views here.
 CustomUser = get_user_model()
 
-class ReservationViewSet(viewsets.ModelViewSet):
+def parse_datetime_param(value):
+    """
+    Interpreta un parámetro de consulta como fecha-hora ISO o fecha (medianoche).
+    Los valores sin zona horaria se asumen en la zona del proyecto.
+    Devuelve None si el valor no es válido.
+    """
+    if not value:
+        return None
+    try:
+        parsed = parse_datetime(value)
+        if parsed is None:
+            day = parse_date(value)
+            if day is None:
+                return None
+            parsed = datetime.combine(day, time.min)
+    except ValueError:
+        return None
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+def parse_date_param(name, value):
+    """
+    Interpreta un parámetro de consulta como fecha ISO (AAAA-MM-DD).
+    Lanza ValidationError (400) si el valor no es una fecha válida.
+    """
+    try:
+        parsed = parse_date(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ValidationError({name: 'Fecha inválida; use el formato AAAA-MM-DD.'})
+    return parsed
+
+def calendar_window(request):
+    """
+    Días [start, end] de una vista de calendario (?start=AAAA-MM-DD&end=AAAA-MM-DD)
+    y sus límites semiabiertos en la zona del proyecto.
+    Lanza ValidationError (400) si faltan o superan CALENDAR_MAX_DAYS días.
+    """
+    params = request.query_params
+    if not params.get('start') or not params.get('end'):
+        raise ValidationError({'detail': 'Parámetros "start" y "end" obligatorios.'})
+    first_day = parse_date_param('start', params['start'])
+    last_day = parse_date_param('end', params['end'])
+    if first_day > last_day:
+        raise ValidationError(
+            {'detail': 'La fecha de inicio debe ser anterior o igual a la fecha de fin.'}
+        )
+    if (last_day - first_day).days + 1 > CALENDAR_MAX_DAYS:
+        raise ValidationError({'detail': f'El rango no puede superar {CALENDAR_MAX_DAYS} días.'})
+    return first_day, last_day, *local_day_bounds(first_day, last_day)
+
+def calendar_days(first_day, last_day, rows):
+    """
+    Agrupa filas (diccionarios con 'start_datetime') por día local de inicio.
+    Incluye todos los días del rango, también los vacíos.
+    """
+    days = {
+        (first_day + timedelta(days=offset)).isoformat(): []
+        for offset in range((last_day - first_day).days + 1)
+    }
+    for row in rows:
+        days[timezone.localdate(row['start_datetime']).isoformat()].append(row)
+    return days
+
+def admin_emails():
+    """Correos de todos los administradores."""
+    return list(CustomUser.objects.filter(role=CustomUser.ADMIN).values_list('email', flat=True))
+
+def overlap_conflict(exc):
+    """
+    Respuesta 409 para un solape que la base rechazó al guardar (otra
+    petición se adelantó); nada del lote quedó guardado.
+    """
+    return Response({'detail': ' '.join(exc.messages)}, status=status.HTTP_409_CONFLICT)
+
+def reservation_review_email(reservation):
+    """Correo al usuario con la decisión sobre su reserva."""
+    decision = reservation.status
+    return (
+        'Reserva ' + ('aprobada' if decision == 'aprobada' else 'rechazada'),
+        f"Tu reserva de {reservation.facility.name} del {reservation.start_datetime} "
+        f"al {reservation.end_datetime} ha sido {decision}.",
+        NO_REPLY_EMAIL,
+        [reservation.user.email],
+    )
+
+class ReservationViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     Vista para gestionar reservas.
     """
     serializer_class = ReservationSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [filters.OrderingFilter, filters.SearchFilter]
+    pagination_class = OptionalCursorPagination
+    cursor_ordering = ('-start_datetime', '-id')
+    etag_related = ('facility', 'user')  # facility_name y user_name
+    filter_backends = [filters.OrderingFilter, FullTextSearchFilter]
     ordering_fields = ['start_datetime', 'created_at']
-    search_fields = ['facility__name', 'user__get_full_name']
+    search_documents = (('user', 'user'), ('facility', 'facility'))
 
     def get_queryset(self):
         user = self.request.user
+        # facility y user se serializan por fila (facility_name, user_name)
+        qs = Reservation.objects.select_related('facility', 'user')
         if user.role == CustomUser.ADMIN:
-            return Reservation.objects.all()
-        return Reservation.objects.filter(user=user)
+            return qs
+        return qs.filter(user=user)
 
+    @transaction.atomic
     def perform_create(self, serializer):
         instance = serializer.save(user=self.request.user)
         # Notificar al admin
-        send_mail(
+        OutboxEmail.objects.queue([(
             'Nueva Solicitud de Reserva',
             f"Usuario {instance.user.get_full_name()} solicita reserva de {instance.facility.name} "
             f"de {instance.start_datetime} a {instance.end_datetime}.",
             NO_REPLY_EMAIL,
-            [admin.email for admin in CustomUser.objects.filter(role='admin')],
-            fail_silently=True
+            admin_emails()
+        )])
+
+    @action(detail=False, methods=['get'])
+    def calendar(self, request):
+        """
+        Reservas de una semana o un mes agrupadas por día local de inicio.
+        query: ?start=AAAA-MM-DD&end=AAAA-MM-DD[&facility=][&status=]
+        Una sola consulta por rango de inicio, sin paginación.
+        """
+        first_day, last_day, start, end = calendar_window(request)
+        qs = Reservation.objects.filter(start_datetime__gte=start, start_datetime__lt=end)
+        if request.user.role != CustomUser.ADMIN:
+            qs = qs.filter(user=request.user)
+        facility = request.query_params.get('facility')
+        if facility:
+            if not facility.isdigit():
+                raise ValidationError({'facility': 'Debe ser un id numérico.'})
+            qs = qs.filter(facility=facility)
+        if request.query_params.get('status'):
+            qs = qs.filter(status=request.query_params['status'])
+        rows = qs.order_by('start_datetime', 'id').values(
+            'id', 'facility', 'start_datetime', 'end_datetime', 'status', 'user',
+            facility_name=F('facility__name'),
+        )
+        return Response({'start': first_day, 'end': last_day,
+                         'days': calendar_days(first_day, last_day, rows)})
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        Crea varias reservas de una instalación en una sola petición.
+        body: { "facility": id, "ranges": [{"start_datetime", "end_datetime"}, ...] }
+        ó { "facility": id, "recurrence": {"start_datetime", "end_datetime",
+        "freq": "weekly"|"daily", "interval": 1, "count": n | "until": fecha} }
+        Devuelve el resultado por ocurrencia: creada o en conflicto.
+        """
+        serializer = ReservationBulkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        facility = serializer.validated_data['facility']
+        with transaction.atomic():
+            results = Reservation.objects.book_many(
+                facility, request.user, serializer.validated_data['occurrences']
+            )
+            created = [r for _, _, r in results if r is not None]
+            if created:
+                # Notificar al admin con un único correo para todo el lote
+                OutboxEmail.objects.queue([(
+                    'Nueva Solicitud de Reserva',
+                    f"Usuario {request.user.get_full_name()} solicita {len(created)} reservas "
+                    f"de {facility.name}: "
+                    + ", ".join(f"{r.start_datetime} a {r.end_datetime}" for r in created) + ".",
+                    NO_REPLY_EMAIL,
+                    admin_emails()
+                )])
+        return Response(
+            {
+                'created': len(created),
+                'conflicts': len(results) - len(created),
+                'results': [
+                    {
+                        'start_datetime': start,
+                        'end_datetime': end,
+                        'status': 'creada' if r is not None else 'conflicto',
+                        'id': r.id if r is not None else None,
+                    }
+                    for start, end, r in results
+                ],
+            },
+            status=status.HTTP_201_CREATED if created else status.HTTP_409_CONFLICT
         )
 
     @action(detail=True, methods=['post'], permission_classes=[IsAdminUser])
@@ -55,20 +252,31 @@ class ReservationViewSet(viewsets.ModelViewSet):
         reservation = self.get_object()
         decision = request.data.get('decision')  # 'aprobada' o 'rechazada'
         reservation.status = decision
-        reservation.save()
-        # notificar al usuario
-        subject = 'Reserva ' + ('aprobada' if decision=='aprobada' else 'rechazada')
-        send_mail(
-            subject,
-            f"Tu reserva de {reservation.facility.name} del {reservation.start_datetime} "
-            f"al {reservation.end_datetime} ha sido {decision}.",
-            NO_REPLY_EMAIL,
-            [reservation.user.email],
-            fail_silently=True
-        )
+        with transaction.atomic():
+            reservation.save()
+            # notificar al usuario
+            OutboxEmail.objects.queue([reservation_review_email(reservation)])
         return Response({'status': reservation.status})
 
-class TowerViewSet(viewsets.ModelViewSet):
+    @action(detail=False, methods=['post'], url_path='bulk-review',
+            permission_classes=[IsAdminUser])
+    def bulk_review(self, request):
+        """
+        Aprueba o rechaza varias reservas pendientes. Solo administradores.
+        body: { "ids": [1, 2, ...], "decision": "aprobada" | "rechazada" }
+        """
+        serializer = BulkReviewSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        decision = serializer.validated_data['decision']
+        with transaction.atomic():
+            reviewed = Reservation.objects.filter(
+                pk__in=serializer.validated_data['ids']
+            ).review_many(decision)
+            # notificar a los usuarios con un único INSERT en el outbox
+            OutboxEmail.objects.queue([reservation_review_email(r) for r in reviewed])
+        return Response({'status': decision, 'reviewed': [r.id for r in reviewed]})
+
+class TowerViewSet(CachedCatalogMixin, viewsets.ModelViewSet):
     """
     Vista para gestionar torres.
     """
@@ -76,7 +284,7 @@ class TowerViewSet(viewsets.ModelViewSet):
     serializer_class = TowerSerializer
     permission_classes = [IsAdminUser]
 
-class ApartmentViewSet(viewsets.ModelViewSet):
+class ApartmentViewSet(CachedCatalogMixin, viewsets.ModelViewSet):
     """
     Vista para gestionar apartamentos.
     """
@@ -84,7 +292,7 @@ class ApartmentViewSet(viewsets.ModelViewSet):
     serializer_class = ApartmentSerializer
     permission_classes = [IsAdminUser]
 
-class FacilityViewSet(viewsets.ModelViewSet):
+class FacilityViewSet(CachedCatalogMixin, viewsets.ModelViewSet):
     """
     Vista para gestionar instalaciones.
     - GET (list/retrieve): cualquier usuario autenticado.
@@ -102,7 +310,59 @@ class FacilityViewSet(viewsets.ModelViewSet):
             perms = [IsAuthenticated]
         return [p() for p in perms]
 
-class ParkingSpotViewSet(viewsets.ModelViewSet):
+    @action(detail=True, methods=['get'])
+    def availability(self, request, pk=None):
+        """
+        Horarios libres de la instalación en una ventana de tiempo.
+        query: ?from=<fecha|fecha-hora>&to=<fecha|fecha-hora>&slot=<minutos>
+        Carga las reservas de la ventana en una sola consulta y calcula los
+        huecos libres con un barrido sobre los intervalos ocupados.
+        """
+        facility = self.get_object()
+        start = parse_datetime_param(request.query_params.get('from'))
+        end = parse_datetime_param(request.query_params.get('to'))
+        if start is None or end is None:
+            return Response(
+                {'detail': 'Parámetros "from" y "to" obligatorios (fecha o fecha-hora ISO).'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if start >= end:
+            return Response(
+                {'detail': 'La fecha de inicio debe ser anterior a la fecha de fin.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if end - start > timedelta(days=AVAILABILITY_MAX_DAYS):
+            return Response(
+                {'detail': f'La ventana no puede superar {AVAILABILITY_MAX_DAYS} días.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            slot_minutes = int(request.query_params.get('slot', AVAILABILITY_DEFAULT_SLOT))
+        except ValueError:
+            slot_minutes = 0
+        if slot_minutes < AVAILABILITY_MIN_SLOT:
+            return Response(
+                {'detail': f'"slot" debe ser un entero de al menos {AVAILABILITY_MIN_SLOT} minutos.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        busy = list(
+            Reservation.objects.blocking().overlapping(start, end)
+            .filter(facility=facility)
+            .values_list('start_datetime', 'end_datetime')
+        )
+        free = free_intervals(busy, start, end)
+        slots = free_slots(free, start, timedelta(minutes=slot_minutes))
+        return Response({
+            'facility': facility.id,
+            'from': start,
+            'to': end,
+            'slot': slot_minutes,
+            'free': [{'start': s, 'end': e} for s, e in free],
+            'slots': [{'start': s, 'end': e} for s, e in slots],
+        })
+
+class ParkingSpotViewSet(CachedCatalogMixin, viewsets.ModelViewSet):
     """
     Vista para gestionar estacionamientos.
     """
@@ -110,17 +370,20 @@ class ParkingSpotViewSet(viewsets.ModelViewSet):
     serializer_class = ParkingSpotSerializer
     permission_classes = [IsAdminUser]
 
-class ShiftAssignmentViewSet(viewsets.ModelViewSet):
+class ShiftAssignmentViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     Vista para gestionar asignaciones de turnos.
     """
     queryset = ShiftAssignment.objects.all()
     serializer_class = ShiftAssignmentSerializer
     permission_classes = [IsAdminUser]
+    pagination_class = OptionalCursorPagination
+    cursor_ordering = ('-start_datetime', '-id')
 
-    filter_backends = [filters.OrderingFilter, filters.SearchFilter]
+    filter_backends = [filters.OrderingFilter, FullTextSearchFilter]
     ordering_fields = ['start_datetime', 'area']
-    search_fields = ['employee__email', 'area']
+    search_documents = (('user', 'employee'),)
+    search_fields = ('area',)
 
     def get_queryset(self):
         user = self.request.user
@@ -135,36 +398,228 @@ class ShiftAssignmentViewSet(viewsets.ModelViewSet):
         emp = self.request.query_params.get('employee')
         if area:
             qs = qs.filter(area=area)
-        if start and end:
+        if start and end and self.action != 'calendar':
+            start_day, end_day = parse_date_param('start', start), parse_date_param('end', end)
+            # rango semiabierto en la zona del proyecto: usa el índice por fechas
+            range_start, range_end = local_day_bounds(start_day, end_day)
             qs = qs.filter(
-                start_datetime__date__gte=start,
-                end_datetime__date__lte=end
+                start_datetime__gte=range_start,
+                end_datetime__lt=range_end
             )
         if emp:
             qs = qs.filter(employee__id=emp)
         return qs
 
+    @transaction.atomic
     def perform_create(self, serializer):
         instance = serializer.save()
         # Notificar al empleado por correo
-        send_mail(
+        OutboxEmail.objects.queue([(
             'Nuevo turno asignado',
             f"Se ha asignado un nuevo turno de {instance.start_datetime} a {instance.end_datetime} "
             f"en el área de {instance.area}.",
             NO_REPLY_EMAIL,
-            [instance.employee.email],
-            fail_silently=True
+            [instance.employee.email]
+        )])
+
+    @transaction.atomic
+    def perform_update(self, serializer):
+        previous = serializer.instance.employee_id
+        instance = serializer.save()
+        if instance.employee_id != previous:
+            # el turno desaparece de la copia local del empleado anterior
+            Tombstone.objects.record(ShiftAssignment, [(instance.pk, previous)])
+
+    @action(detail=False, methods=['get'])
+    def calendar(self, request):
+        """
+        Turnos de una semana o un mes agrupados por día local de inicio.
+        query: ?start=AAAA-MM-DD&end=AAAA-MM-DD[&area=][&employee=]
+        Una sola consulta por rango de inicio, sin paginación.
+        """
+        first_day, last_day, start, end = calendar_window(request)
+        qs = self.get_queryset().filter(start_datetime__gte=start, start_datetime__lt=end)
+        rows = qs.order_by('start_datetime', 'id').values(
+            'id', 'employee', 'area', 'tower', 'facility', 'start_datetime', 'end_datetime',
+            employee_name=Concat('employee__first_name', Value(' '), 'employee__last_name'),
+            location=Coalesce('tower__name', 'facility__name'),
+        )
+        return Response({'start': first_day, 'end': last_day,
+                         'days': calendar_days(first_day, last_day, rows)})
+
+    @action(detail=False, methods=['post'])
+    def roster(self, request):
+        """
+        Genera los turnos de un rango de fechas a partir de una plantilla semanal.
+        body: { "start_date", "end_date", "area", "tower": id | "facility": id,
+        "blocks": [{"weekdays": [0, ...], "start": "06:00", "end": "14:00",
+        "employees": [id, ...]}, ...] }
+        Los turnos que se cruzan con otro turno o con un permiso aprobado del
+        empleado no se crean y se devuelven como conflictos.
+        """
+        serializer = ShiftRosterSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            with transaction.atomic():
+                results = ShiftAssignment.objects.assign_many(serializer.validated_data['shifts'])
+                created = [shift for shift, conflict in results if conflict is None]
+                # Un único correo por empleado con el resumen de sus turnos
+                OutboxEmail.objects.queue(shift_notifications(created, NO_REPLY_EMAIL))
+        except DjangoValidationError as exc:
+            return overlap_conflict(exc)
+        conflicts = [
+            {
+                'employee': shift.employee_id,
+                'start_datetime': shift.start_datetime,
+                'end_datetime': shift.end_datetime,
+                'reason': conflict,
+            }
+            for shift, conflict in results if conflict is not None
+        ]
+        return Response(
+            {
+                'created': len(created),
+                'conflicts': conflicts,
+            },
+            status=status.HTTP_201_CREATED if created else status.HTTP_409_CONFLICT
+        )
+
+    @action(detail=False, methods=['post'])
+    def autoschedule(self, request):
+        """
+        Programa turnos automáticamente para cubrir los bloques requeridos.
+        body: { "start_date", "end_date", "dry_run": false,
+        "blocks": [{"area", "tower": id | "facility": id, "weekdays": [0, ...],
+        "start": "06:00", "end": "14:00", "required": n}, ...] }
+        Solo se asignan empleados activos del subrol del área, sin permiso
+        aprobado ni otro turno en el horario, equilibrando sus horas.
+        """
+        serializer = ShiftScheduleSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        try:
+            with transaction.atomic():
+                shifts, unfilled = plan_shifts(data['start_date'], data['end_date'], data['blocks'])
+                if not data['dry_run']:
+                    results = ShiftAssignment.objects.assign_many(shifts)
+                    shifts = [shift for shift, conflict in results if conflict is None]
+                    OutboxEmail.objects.queue(shift_notifications(shifts, NO_REPLY_EMAIL))
+        except DjangoValidationError as exc:
+            return overlap_conflict(exc)
+        hours = {}
+        for shift in shifts:
+            hours[shift.employee_id] = hours.get(shift.employee_id, 0) + (
+                (shift.end_datetime - shift.start_datetime).total_seconds() / 3600
+            )
+        return Response(
+            {
+                'dry_run': data['dry_run'],
+                'created': 0 if data['dry_run'] else len(shifts),
+                'shifts': [
+                    {
+                        'id': shift.id,
+                        'employee': shift.employee_id,
+                        'area': shift.area,
+                        'tower': shift.tower_id,
+                        'facility': shift.facility_id,
+                        'start_datetime': shift.start_datetime,
+                        'end_datetime': shift.end_datetime,
+                    }
+                    for shift in shifts
+                ],
+                'hours': hours,
+                'unfilled': [
+                    {
+                        'area': slot.area,
+                        'tower': slot.tower_id,
+                        'facility': slot.facility_id,
+                        'start_datetime': slot.start,
+                        'end_datetime': slot.end,
+                        'missing': missing,
+                    }
+                    for slot, missing in unfilled
+                ],
+            },
+            status=status.HTTP_200_OK if data['dry_run'] else status.HTTP_201_CREATED
+        )
+
+    @action(detail=False, methods=['get'])
+    def coverage(self, request):
+        """
+        Huecos de cobertura y ventanas con personal insuficiente por torre o
+        instalación y área.
+        query: ?start=AAAA-MM-DD&end=AAAA-MM-DD[&area=][&tower=|&facility=]
+        [&min_staff=1][&daily_start=HH:MM&daily_end=HH:MM]
+        Con daily_start/daily_end solo se analiza esa franja de cada día
+        (p. ej. 22:00 a 06:00 cruza la medianoche).
+        """
+        params = request.query_params
+        if not params.get('start') or not params.get('end'):
+            raise ValidationError({'detail': 'Parámetros "start" y "end" obligatorios.'})
+        first_day = parse_date_param('start', params['start'])
+        last_day = parse_date_param('end', params['end'])
+        if first_day > last_day:
+            raise ValidationError(
+                {'detail': 'La fecha de inicio debe ser anterior o igual a la fecha de fin.'}
+            )
+        if (last_day - first_day).days + 1 > COVERAGE_MAX_DAYS:
+            raise ValidationError({'detail': f'El rango no puede superar {COVERAGE_MAX_DAYS} días.'})
+        areas = [area for area, _ in ShiftAssignment.AREA_CHOICES]
+        if params.get('area'):
+            if params['area'] not in areas:
+                raise ValidationError({'area': 'Área no válida.'})
+            areas = [params['area']]
+        try:
+            min_staff = int(params.get('min_staff', 1))
+        except ValueError:
+            min_staff = 0
+        if min_staff < 1:
+            raise ValidationError({'min_staff': 'Debe ser un entero mayor o igual a 1.'})
+        try:
+            daily_start = parse_time(params['daily_start']) if params.get('daily_start') else None
+            daily_end = parse_time(params['daily_end']) if params.get('daily_end') else None
+        except ValueError:
+            # bien formada pero fuera de rango, p. ej. 25:00
+            daily_start = daily_end = None
+        if (params.get('daily_start') or params.get('daily_end')) and (
+                daily_start is None or daily_end is None):
+            raise ValidationError(
+                {'detail': '"daily_start" y "daily_end" van juntos, en formato HH:MM.'}
+            )
+
+        towers, facilities = Tower.objects.all(), Facility.objects.all()
+        if params.get('tower') or params.get('facility'):
+            for name in ('tower', 'facility'):
+                if params.get(name) and not params[name].isdigit():
+                    raise ValidationError({name: 'Debe ser un id numérico.'})
+            towers = towers.filter(pk=params['tower']) if params.get('tower') else towers.none()
+            facilities = (facilities.filter(pk=params['facility'])
+                          if params.get('facility') else facilities.none())
+        locations = (
+            [('tower', pk, name) for pk, name in towers.order_by('pk').values_list('pk', 'name')]
+            + [('facility', pk, name)
+               for pk, name in facilities.order_by('pk').values_list('pk', 'name')]
         )
+        return Response({
+            'start': first_day,
+            'end': last_day,
+            'min_staff': min_staff,
+            'daily_start': daily_start,
+            'daily_end': daily_end,
+            'results': coverage_report(first_day, last_day, locations, areas, min_staff,
+                                       daily_start, daily_end, COVERAGE_MAX_WINDOWS),
+        })
 
     def get_permissions(self):
         # Sólo admin crea/modifica/borra
-        if self.action in ['create', 'update', 'partial_update', 'destroy']:
+        if self.action in ['create', 'update', 'partial_update', 'destroy', 'roster',
+                           'autoschedule', 'coverage']:
             perms = [IsAdminUser]
         else:
             perms = [IsAuthenticated]
         return [p() for p in perms]
 
-class LeaveRequestViewSet(viewsets.ModelViewSet):
+class LeaveRequestViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     Vista para gestionar solicitudes de permisos/incapacidades.
     - EMPLEADO: GET (list/retrieve) de sus propias solicitudes, POST para crear,
@@ -172,12 +627,15 @@ class LeaveRequestViewSet(viewsets.ModelViewSet):
     - ADMIN: CRUD completo + action 'review' para aprobar/rechazar.
     """
     serializer_class = LeaveRequestSerializer
-    queryset = LeaveRequest.objects.all().order_by('-created_at')
-    ordering = ['-created_at']
-    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, filters.SearchFilter]
+    queryset = LeaveRequest.objects.all().order_by('-created_at', '-id')
+    ordering = ['-created_at', '-id']
+    pagination_class = OptionalCursorPagination
+    cursor_ordering = ('-created_at', '-id')
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, FullTextSearchFilter]
     filterset_fields = ['status', 'type', 'start_date', 'end_date']
     ordering_fields = ['created_at', 'start_date']
-    search_fields = ['employee__first_name', 'employee__last_name', 'type']
+    search_documents = (('leave', 'pk'), ('user', 'employee'))
+    search_fields = ('type',)
 
     def get_queryset(self):
         qs = super().get_queryset()
@@ -186,8 +644,8 @@ class LeaveRequestViewSet(viewsets.ModelViewSet):
         return qs
 
     def get_permissions(self):
-        # review solo admin
-        if self.action == 'review':
+        # review e impacto solo admin
+        if self.action in ('review', 'bulk_review', 'impact'):
             perms = [IsAdminUser]
         # crear, listar y ver detalles → cualquier autenticado
         elif self.action in ['create', 'list', 'retrieve']:
@@ -233,8 +691,22 @@ class LeaveRequestViewSet(viewsets.ModelViewSet):
         """
         leave = self.get_object()
         decision = request.data.get('decision')
+        reassigned = []
         if decision == 'aprobada':
-            leave.approve(request.user)
+            try:
+                with transaction.atomic():
+                    replacements = {}
+                    if request.data.get('reassign') in (True, 'true', '1'):
+                        shifts = list(ShiftAssignment.objects.filter(leave.covered_shifts_q()))
+                        for shift, _, suggested in replacement_plan(shifts, leave.employee):
+                            if suggested is not None:
+                                replacements[shift.pk] = suggested
+                                shift.employee_id = suggested
+                                reassigned.append(shift)
+                    leave.approve(request.user, replacements)
+                    OutboxEmail.objects.queue(shift_notifications(reassigned, NO_REPLY_EMAIL))
+            except DjangoValidationError as exc:
+                return overlap_conflict(exc)
         elif decision == 'rechazada':
             leave.reject(request.user)
         else:
@@ -242,43 +714,98 @@ class LeaveRequestViewSet(viewsets.ModelViewSet):
                 {'detail': 'Decision inválida; use "aprobada" o "rechazada".'},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        return Response({'status': leave.status}, status=status.HTTP_200_OK)
+        return Response(
+            {
+                'status': leave.status,
+                'reassigned': {shift.pk: shift.employee_id for shift in reassigned},
+            },
+            status=status.HTTP_200_OK
+        )
 
-class UserViewSet(viewsets.ModelViewSet):
+    @action(detail=True, methods=['get'])
+    def impact(self, request, pk=None):
+        """
+        Turnos que se borrarían al aprobar la solicitud y, para cada uno, los
+        empleados del mismo subrol disponibles ordenados por horas trabajadas,
+        junto con el reemplazo sugerido que usaría review con "reassign".
+        """
+        leave = self.get_object()
+        shifts = list(ShiftAssignment.objects.filter(leave.covered_shifts_q())
+                      .order_by('start_datetime'))
+        plan = replacement_plan(shifts, leave.employee)
+        return Response({
+            'leave': leave.id,
+            'employee': leave.employee_id,
+            'shifts': [
+                {
+                    'id': shift.id,
+                    'area': shift.area,
+                    'tower': shift.tower_id,
+                    'facility': shift.facility_id,
+                    'start_datetime': shift.start_datetime,
+                    'end_datetime': shift.end_datetime,
+                    'candidates': [
+                        {'id': pk, 'name': name, 'hours': hours}
+                        for pk, name, hours in ranked
+                    ],
+                    'suggested': suggested,
+                }
+                for shift, ranked, suggested in plan
+            ],
+        })
+
+    @action(detail=False, methods=['post'], url_path='bulk-review',
+            permission_classes=[IsAdminUser])
+    def bulk_review(self, request):
+        """
+        Admin aprueba o rechaza varias solicitudes pendientes.
+        body: { "ids": [1, 2, ...], "decision": "aprobada" | "rechazada" }
+        """
+        serializer = BulkReviewSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        decision = serializer.validated_data['decision']
+        reviewed = LeaveRequest.objects.filter(
+            pk__in=serializer.validated_data['ids']
+        ).review_many(decision, request.user)
+        return Response(
+            {'status': decision, 'reviewed': [leave.id for leave in reviewed]},
+            status=status.HTTP_200_OK
+        )
+
+class UserViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     ViewSet para gestionar usuarios. Solo accesible por administradores.
     """
     queryset = CustomUser.objects.all().order_by('id')
     serializer_class = UserSerializer
-    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, filters.SearchFilter]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, FullTextSearchFilter]
     filterset_fields = ['role', 'registration_status']
-    search_fields = ['first_name', 'last_name', 'email']
+    search_documents = (('user', 'pk'),)
 
     def get_permissions(self):
         if self.action == 'create':
             return [AllowAny()]
         if self.action in ('approve', 'reject'):
             return [IsAdminUser()]
-        if self.action == 'me':
+        if self.action in ('me', 'calendar_feed'):
             return [IsAuthenticated()]
         # list, retrieve, update, destroy → admin
         return [IsAdminUser()]
 
+    @transaction.atomic
     def perform_create(self, serializer):
         """
         Al crearse un usuario (estado PENDIENTE e is_active=False),
         notificamos por email a todos los administradores.
         """
         user = serializer.save()
-        admins = CustomUser.objects.filter(role=CustomUser.ADMIN)
-        send_mail(
+        OutboxEmail.objects.queue([(
             'Nueva solicitud de registro',
             f'El usuario {user.get_full_name()} ({user.email}) '
             f'ha solicitado acceso y está pendiente de aprobación.',
             NO_REPLY_EMAIL,
-            [a.email for a in admins],
-            fail_silently=True,
-        )
+            admin_emails()
+        )])
 
     def get_queryset(self):
         qs = super().get_queryset()
@@ -287,9 +814,24 @@ class UserViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['get'], url_path='me')
     def me(self, request):
-        """Devuelve datos del propio usuario."""
-        serializer = self.get_serializer(request.user)
-        return Response(serializer.data)
+        """Devuelve datos del propio usuario (304 si no cambió)."""
+        user = request.user
+        etag = make_etag('user', 'me', user.pk, user.updated_at.isoformat())
+        return conditional(request, etag, lambda: Response(self.get_serializer(user).data))
+
+    @action(detail=False, methods=['get', 'post'], url_path='me/calendar-feed')
+    def calendar_feed(self, request):
+        """
+        URLs de los feeds .ics del propio usuario (turnos y reservas).
+        POST genera un token nuevo e invalida las URLs anteriores.
+        """
+        feed, created = CalendarFeed.objects.get_or_create(user=request.user)
+        if request.method == 'POST' and not created:
+            feed.rotate()
+        return Response({
+            kind: request.build_absolute_uri(reverse(f'calendar_feed_{kind}', args=[feed.token]))
+            for kind in CALENDAR_FEEDS
+        })
 
     @action(detail=True, methods=['post'], url_path='approve')
     def approve(self, request, pk=None):
@@ -299,8 +841,206 @@ class UserViewSet(viewsets.ModelViewSet):
         return Response({'registration_status': user.registration_status})
 
     @action(detail=True, methods=['post'], url_path='reject')
-    def reject(self):
+    def reject(self, request, pk=None):
         """Admin rechaza registro pendiente."""
         user = self.get_object()
         user.reject()
         return Response({'registration_status': user.registration_status})
+
+class ArchiveViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Consulta de solo lectura del histórico (ver ``archive_history``).
+    El admin ve todo; los demás, solo las filas de ``owner_field``.
+    """
+    permission_classes = [IsAuthenticated]
+    pagination_class = OptionalCursorPagination
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    owner_field = None
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+        if self.request.user.role != CustomUser.ADMIN:
+            qs = qs.filter(**{self.owner_field: self.request.user})
+        return qs
+
+class ArchivedReservationViewSet(ArchiveViewSet):
+    """
+    Reservas del histórico.
+    """
+    queryset = (ArchivedReservation.objects.select_related('facility', 'user')
+                .order_by('-start_datetime', '-id'))
+    serializer_class = ArchivedReservationSerializer
+    cursor_ordering = ('-start_datetime', '-id')
+    etag_related = ('facility', 'user')
+    filterset_fields = ['facility', 'status']
+    ordering_fields = ['start_datetime', 'created_at']
+    owner_field = 'user'
+
+class ArchivedShiftAssignmentViewSet(ArchiveViewSet):
+    """
+    Turnos del histórico.
+    """
+    queryset = ArchivedShiftAssignment.objects.order_by('-start_datetime', '-id')
+    serializer_class = ArchivedShiftAssignmentSerializer
+    cursor_ordering = ('-start_datetime', '-id')
+    filterset_fields = ['employee', 'area', 'tower', 'facility']
+    ordering_fields = ['start_datetime', 'area']
+    owner_field = 'employee'
+
+class ArchivedLeaveRequestViewSet(ArchiveViewSet):
+    """
+    Solicitudes de permiso del histórico.
+    """
+    queryset = ArchivedLeaveRequest.objects.order_by('-start_date', '-id')
+    serializer_class = ArchivedLeaveRequestSerializer
+    cursor_ordering = ('-start_date', '-id')
+    filterset_fields = ['employee', 'status', 'type']
+    ordering_fields = ['start_date', 'created_at']
+    owner_field = 'employee'
+
+class CacheStatsView(APIView):
+    """
+    Estadísticas de las cachés del proceso (aciertos y fallos contados por
+    este worker). Solo administradores.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        """Devuelve tamaño, aciertos y fallos de cada caché."""
+        return Response({'token_auth': token_cache.stats(), 'catalog': catalog_cache.stats()})
+
+
+class BootstrapView(APIView):
+    """
+    Datos de la pantalla de inicio en una sola petición, según el rol:
+    - todos: perfil (``user``), instalaciones y reservas.
+    - admin y empleados: además turnos de hoy.
+    - admin (is_staff, como en TowerViewSet): además torres.
+    Las reservas son las próximas propias; para el admin, las pendientes de
+    revisar. Torres e instalaciones salen de ``catalog_cache``.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        user = request.user
+        staff = user.role in (CustomUser.ADMIN, CustomUser.EMPLEADO)
+        data = {
+            'user': UserSerializer(user).data,
+            'facilities': catalog_cache.cached(Facility, 'bootstrap', lambda: list(
+                FacilitySerializer(Facility.objects.order_by('name'), many=True).data)),
+        }
+        reservations = Reservation.objects.select_related('facility', 'user')
+        if user.role == CustomUser.ADMIN:
+            reservations = reservations.filter(status='pendiente')
+        else:
+            reservations = reservations.filter(user=user, end_datetime__gt=timezone.now())
+        data['reservations'] = ReservationSerializer(
+            reservations.order_by('start_datetime', 'id')[:BOOTSTRAP_RESERVATIONS], many=True
+        ).data
+        if user.is_staff:
+            data['towers'] = catalog_cache.cached(Tower, 'bootstrap', lambda: list(
+                TowerSerializer(Tower.objects.order_by('name'), many=True).data))
+        if staff:
+            today = timezone.localdate()
+            shifts = ShiftAssignment.objects.overlapping(*local_day_bounds(today, today))
+            if user.role != CustomUser.ADMIN:
+                shifts = shifts.filter(employee=user)
+            data['shifts'] = ShiftAssignmentSerializer(
+                shifts.order_by('start_datetime', 'id'), many=True
+            ).data
+        return Response(data)
+
+
+class SyncView(APIView):
+    """
+    Sincronización incremental de reservas, turnos, permisos e
+    instalaciones para clientes con copia local.
+    query: ?since=<cursor de la respuesta anterior> (sin since: copia completa)
+    Devuelve {cursor, reset, changes: {modelo: [filas]}, deleted: {modelo: [ids]}}.
+    Con reset=true el cliente reemplaza su copia local; si no, borra los
+    ids de deleted y aplica changes como upserts.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        since = request.query_params.get('since')
+        if since:
+            since = parse_datetime_param(since)
+            if since is None:
+                raise ValidationError({'detail': 'since debe ser un cursor de sincronización válido.'})
+        # el cursor es la hora actual: una réplica atrasada perdería las
+        # filas que aún no recibió, así que se lee de la principal
+        with read_from_primary():
+            return Response(changes_since(request.user, since or None, {'request': request}))
+
+
+def feed_state(request, token, kind):
+    """
+    Feed del token y versión de sus filas (cantidad y última modificación),
+    calculados una vez por petición para ETag, Last-Modified y la respuesta.
+    La última modificación incluye la de las torres e instalaciones, cuyo
+    nombre va en LOCATION y SUMMARY, como ``etag_related`` en las vistas.
+    """
+    if not hasattr(request, '_calendar_feed'):
+        feed = (CalendarFeed.objects.select_related('user')
+                .filter(token=token, user__is_active=True).first())
+        if feed is None:
+            raise Http404
+        if kind == 'shifts':
+            qs, related = ShiftAssignment.objects.filter(employee=feed.user), ('tower', 'facility')
+        else:
+            qs, related = Reservation.objects.filter(user=feed.user), ('facility',)
+        version = qs.aggregate(
+            count=Count('id'), last=Max('updated_at'),
+            **{name: Max(f'{name}__updated_at') for name in related}
+        )
+        count = version.pop('count')
+        stamps = [stamp for stamp in version.values() if stamp is not None]
+        request._calendar_feed = (feed, qs, count, max(stamps, default=feed.created_at))
+    return request._calendar_feed
+
+def feed_etag(request, token, kind):
+    _, _, count, last = feed_state(request, token, kind)
+    return f'{kind}-{count}-{last.timestamp()}'
+
+def feed_last_modified(request, token, kind):
+    return feed_state(request, token, kind)[3]
+
+def shift_events(qs):
+    for pk, area, start, end, stamp, tower, facility in qs.values_list(
+        'id', 'area', 'start_datetime', 'end_datetime', 'updated_at',
+        'tower__name', 'facility__name'
+    ).iterator(chunk_size=CALENDAR_FEED_CHUNK):
+        yield {
+            'uid': f'shift-{pk}@domus', 'start': start, 'end': end, 'stamp': stamp,
+            'summary': f'Turno de {area}', 'location': tower or facility,
+        }
+
+def reservation_events(qs):
+    for pk, state, start, end, stamp, facility in qs.values_list(
+        'id', 'status', 'start_datetime', 'end_datetime', 'updated_at', 'facility__name'
+    ).iterator(chunk_size=CALENDAR_FEED_CHUNK):
+        yield {
+            'uid': f'reservation-{pk}@domus', 'start': start, 'end': end, 'stamp': stamp,
+            'summary': f'Reserva: {facility}', 'location': facility,
+            'description': f'Estado: {state}', 'status': ical.RESERVATION_STATUS.get(state),
+        }
+
+@require_safe
+@condition(etag_func=feed_etag, last_modified_func=feed_last_modified)
+def calendar_feed(request, token, kind):
+    """
+    Feed iCalendar de turnos o reservas de un usuario, autenticado por el
+    token de la URL. Se transmite desde un iterador de la consulta, y con
+    ETag/Last-Modified los clientes reciben 304 si nada cambió.
+    """
+    feed, qs, _, _ = feed_state(request, token, kind)
+    if kind == 'shifts':
+        name, events = 'Domus - Turnos', shift_events(qs.order_by('start_datetime'))
+    else:
+        name, events = 'Domus - Reservas', reservation_events(qs.order_by('start_datetime'))
+    response = StreamingHttpResponse(ical.calendar(name, events),
+                                     content_type='text/calendar; charset=utf-8')
+    response['Content-Disposition'] = f'inline; filename="{kind}.ics"'
+    response['Cache-Control'] = 'private, no-cache'
+    return response
@@ -12,7 +12,7 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 
 import os
 from pathlib import Path
-from decouple import config
+from decouple import Csv, config
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -54,6 +54,7 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'django.middleware.common.CommonMiddleware',
+    'api.replicas.ReplicaMiddleware',
 
 ]
 
@@ -67,7 +68,7 @@ CORS_ALLOWED_ORIGINS = [
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.SessionAuthentication',
-        'rest_framework.authentication.TokenAuthentication',
+        'api.authentication.CachedTokenAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -77,10 +78,51 @@ REST_FRAMEWORK = {
         'rest_framework.filters.SearchFilter',
         'rest_framework.filters.OrderingFilter',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.StandardPagination',
     'PAGE_SIZE': 10,
 }
 
+# Caché de autenticación por token (por proceso). El TTL acota cuánto tarda
+# un worker en ver un token revocado o un usuario desactivado en otro worker.
+TOKEN_AUTH_CACHE = {
+    'MAX_SIZE': config('TOKEN_AUTH_CACHE_MAX_SIZE', default=1024, cast=int),
+    'TTL': config('TOKEN_AUTH_CACHE_TTL', default=60, cast=int),
+}
+
+# Caché de Django. Por defecto en memoria del proceso; en producción con
+# varios workers conviene una caché compartida (Redis/Memcached) para que la
+# invalidación de un worker la vean los demás.
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND',
+                          default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='domus'),
+    }
+}
+
+# Caché de respuestas de catálogos (torres, apartamentos, instalaciones y
+# parqueaderos), invalidada por señales. Con caché en memoria, el TTL acota
+# cuánto tarda otro worker en ver un cambio.
+CATALOG_CACHE = {
+    'ALIAS': 'default',
+    'TTL': config('CATALOG_CACHE_TTL', default=300, cast=int),
+}
+
+# Sincronización incremental (/api/sync/). Las lápidas más viejas que
+# TOMBSTONE_DAYS se borran con `python manage.py prune_tombstones`.
+SYNC = {
+    'OVERLAP_SECONDS': config('SYNC_OVERLAP_SECONDS', default=5, cast=int),
+    'TOMBSTONE_DAYS': config('SYNC_TOMBSTONE_DAYS', default=90, cast=int),
+}
+
+# Histórico (`python manage.py archive_history`): las reservas, turnos y
+# permisos terminados hace más de HORIZON_DAYS pasan a las tablas de
+# histórico, en lotes de BATCH_SIZE filas por transacción.
+ARCHIVE = {
+    'HORIZON_DAYS': config('ARCHIVE_HORIZON_DAYS', default=365, cast=int),
+    'BATCH_SIZE': config('ARCHIVE_BATCH_SIZE', default=500, cast=int),
+}
+
 ROOT_URLCONF = 'domus.urls'
 
 AUTH_USER_MODEL = 'api.CustomUser'
@@ -93,6 +135,16 @@ EMAIL_HOST_USER = config('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD')
 DEFAULT_FROM_EMAIL = f"Domus <{EMAIL_HOST_USER}>"
 
+# Outbox de correos: los envía el comando `python manage.py send_outbox`
+OUTBOX = {
+    'BATCH_SIZE': config('OUTBOX_BATCH_SIZE', default=100, cast=int),
+    'MAX_ATTEMPTS': config('OUTBOX_MAX_ATTEMPTS', default=5, cast=int),
+    'RETRY_BASE_SECONDS': 60,
+    'RETRY_MAX_SECONDS': 3600,
+    # plazo con el que un worker reserva un lote mientras lo envía
+    'CLAIM_SECONDS': 300,
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
     {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
@@ -122,13 +174,93 @@ WSGI_APPLICATION = 'domus.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
+# Perfil de producción para SQLite (SQLITE_PRODUCTION=True) con varios
+# workers de gunicorn:
+# - WAL: los lectores no bloquean al escritor ni al revés.
+# - synchronous=NORMAL: en WAL no pierde consistencia, solo las últimas
+#   transacciones si se cae el sistema operativo.
+# - mmap y caché de páginas por conexión.
+# - timeout: espera hasta N segundos por el bloqueo en vez de fallar con
+#   "database is locked".
+# - BEGIN IMMEDIATE: cada transacción toma el bloqueo de escritura al
+#   empezar, así dos transacciones que leen y luego escriben se ponen en
+#   fila en vez de fallar al intentar subir de lectura a escritura.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': config('SQLITE_MMAP_SIZE', default=256 * 1024 * 1024, cast=int),
+    # negativo: tamaño en KiB
+    'cache_size': -config('SQLITE_CACHE_KB', default=64 * 1024, cast=int),
+    'temp_store': 'MEMORY',
+}
+
+SQLITE_PRODUCTION_OPTIONS = {
+    'init_command': ';'.join(f'PRAGMA {name}={value}' for name, value in SQLITE_PRAGMAS.items()),
+    'transaction_mode': 'IMMEDIATE',
+    'timeout': config('SQLITE_TIMEOUT', default=20, cast=int),
+}
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': config('SQLITE_PATH', default=str(BASE_DIR / 'db.sqlite3')),
+        'OPTIONS': (SQLITE_PRODUCTION_OPTIONS
+                    if config('SQLITE_PRODUCTION', default=False, cast=bool) else {}),
     }
 }
 
+# PostgreSQL (DB_ENGINE=postgresql) para edificios que superan un archivo
+# SQLite. Requiere psycopg[binary,pool].
+# - Pool en el proceso (POSTGRES_POOL=True): cada petición toma una conexión
+#   abierta del pool y la devuelve al terminar.
+# - Sin pool (p. ej. detrás de pgbouncer): conexiones persistentes por hilo
+#   durante CONN_MAX_AGE segundos. Django no admite ambas cosas a la vez.
+# - Los solapes de reservas y turnos los rechaza la base (migración 0014).
+# Las pruebas crean y borran su propia base (POSTGRES_TEST_DB).
+POSTGRES_POOL = config('POSTGRES_POOL', default=True, cast=bool)
+
+POSTGRES_POOL_OPTIONS = {
+    'min_size': config('POSTGRES_POOL_MIN', default=2, cast=int),
+    'max_size': config('POSTGRES_POOL_MAX', default=10, cast=int),
+    # segundos esperando una conexión libre antes de fallar
+    'timeout': config('POSTGRES_POOL_TIMEOUT', default=10, cast=int),
+}
+
+if config('DB_ENGINE', default='sqlite') == 'postgresql':
+    DATABASES['default'] = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': config('POSTGRES_DB', default='domus'),
+        'USER': config('POSTGRES_USER', default='domus'),
+        'PASSWORD': config('POSTGRES_PASSWORD', default=''),
+        'HOST': config('POSTGRES_HOST', default='localhost'),
+        'PORT': config('POSTGRES_PORT', default='5432'),
+        'CONN_MAX_AGE': 0 if POSTGRES_POOL else config('CONN_MAX_AGE', default=60, cast=int),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {'pool': POSTGRES_POOL_OPTIONS} if POSTGRES_POOL else {},
+        'TEST': {'NAME': config('POSTGRES_TEST_DB', default='test_domus')},
+    }
+
+# Réplicas de lectura (DB_REPLICAS): rutas de archivos SQLite o hosts de
+# PostgreSQL, separados por comas, con la misma configuración que la
+# principal. Las peticiones GET/HEAD/OPTIONS leen de una réplica; tras una
+# escritura, el cliente lee de la principal durante PIN_SECONDS (debe
+# superar el retraso de la replicación). El pin vive en la caché
+# CACHE_ALIAS, que con varios workers debe ser compartida.
+for number, location in enumerate(config('DB_REPLICAS', default='', cast=Csv()), start=1):
+    DATABASES[f'replica{number}'] = {
+        **DATABASES['default'],
+        'HOST' if 'HOST' in DATABASES['default'] else 'NAME': location,
+        'TEST': {'MIRROR': 'default'},
+    }
+
+REPLICATION = {
+    'REPLICAS': [alias for alias in DATABASES if alias != 'default'],
+    'PIN_SECONDS': config('REPLICA_PIN_SECONDS', default=5, cast=int),
+    'CACHE_ALIAS': 'default',
+}
+
+DATABASE_ROUTERS = ['api.replicas.ReplicaRouter']
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
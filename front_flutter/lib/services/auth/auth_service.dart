@@ -106,4 +106,21 @@ class AuthService {
       throw Exception('Error al obtener perfil');
     }
   }
+
+  /// Trae en una sola petición lo que necesita la pantalla de inicio:
+  /// `user`, `facilities`, `reservations`, para admin y empleados los
+  /// `shifts` de hoy y, solo para el admin, `towers`.
+  static Future<Map<String, dynamic>> getBootstrap() async {
+    final token = await _readToken();
+    final uri = Uri.parse('$_baseUrl/api/bootstrap/');
+    final resp = await http
+        .get(uri, headers: {'Authorization': 'Token $token'})
+        .timeout(const Duration(seconds: 10));
+
+    if (resp.statusCode == 200) {
+      return jsonDecode(resp.body) as Map<String, dynamic>;
+    } else {
+      throw Exception('Error al cargar datos de inicio');
+    }
+  }
 }
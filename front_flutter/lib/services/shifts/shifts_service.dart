@@ -33,6 +33,25 @@ class ShiftsService {
     }
   }
 
+  /// Trae los turnos de [start] a [end] (máx. 42 días) en una sola petición,
+  /// agrupados por día: { "AAAA-MM-DD": [turno, ...], ... }.
+  static Future<Map<String, dynamic>> fetchShiftCalendar(DateTime start, DateTime end) async {
+    final token = await _storage.read(key: 'auth_token');
+    if (token == null) throw Exception('No autenticado');
+
+    final from = start.toIso8601String().split('T').first;
+    final to = end.toIso8601String().split('T').first;
+    final uri = Uri.parse('$_baseUrl/api/shifts/calendar/?start=$from&end=$to');
+    final resp = await http.get(uri, headers: {'Authorization': 'Token $token'});
+
+    if (resp.statusCode == 200) {
+      final decoded = jsonDecode(resp.body) as Map<String, dynamic>;
+      return decoded['days'] as Map<String, dynamic>;
+    } else {
+      throw Exception('Error cargando calendario de turnos');
+    }
+  }
+
   /// Trae la lista de empleados (rol=empleado) desde la API.
   static Future<List<dynamic>> fetchEmployees() async {
     final token = await _storage.read(key: 'auth_token');